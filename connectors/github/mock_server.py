@@ -1,5 +1,12 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import asyncio
+import json
+import random
+import time
+from hashlib import sha256
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
 
 app = FastAPI(title="Mock GitHub API")
 
@@ -12,6 +19,93 @@ class CommentPayload(BaseModel):
     body: str
 
 
+class RateLimitConfig(BaseModel):
+    # None disables rate limiting (the default).
+    limit: int | None = None
+    window_seconds: int = 3600
+    # The next N API calls answer 403 with Retry-After, like a secondary rate limit.
+    secondary_limit_hits: int = 0
+    retry_after_seconds: int = 1
+
+
+class LatencyConfig(BaseModel):
+    # Added to every /repos/ call: delay_ms plus a uniform 0..jitter_ms.
+    delay_ms: float = Field(default=0.0, ge=0)
+    jitter_ms: float = Field(default=0.0, ge=0)
+
+
+class SeedIssues(BaseModel):
+    repo: str
+    count: int
+    state: str = "open"
+
+
+RATE_LIMIT = {"config": RateLimitConfig(), "used": 0, "reset": 0}
+LATENCY = {"config": LatencyConfig()}
+
+
+def _rate_limit_headers(config: RateLimitConfig) -> dict[str, str]:
+    return {
+        "X-RateLimit-Limit": str(config.limit),
+        "X-RateLimit-Remaining": str(max(config.limit - RATE_LIMIT["used"], 0)),
+        "X-RateLimit-Used": str(RATE_LIMIT["used"]),
+        "X-RateLimit-Reset": str(RATE_LIMIT["reset"]),
+        "X-RateLimit-Resource": "core",
+    }
+
+
+@app.middleware("http")
+async def emulate_rate_limit(request: Request, call_next):
+    config: RateLimitConfig = RATE_LIMIT["config"]
+    if config.limit is None or not request.url.path.startswith("/repos/"):
+        return await call_next(request)
+    now = int(time.time())
+    if now >= RATE_LIMIT["reset"]:
+        RATE_LIMIT["used"], RATE_LIMIT["reset"] = 0, now + config.window_seconds
+    if config.secondary_limit_hits > 0:
+        config.secondary_limit_hits -= 1
+        return JSONResponse(
+            {"message": "You have exceeded a secondary rate limit."},
+            status_code=403,
+            headers={
+                **_rate_limit_headers(config),
+                "Retry-After": str(config.retry_after_seconds),
+            },
+        )
+    if RATE_LIMIT["used"] >= config.limit:
+        return JSONResponse(
+            {"message": "API rate limit exceeded."},
+            status_code=403,
+            headers=_rate_limit_headers(config),
+        )
+    response = await call_next(request)
+    # Conditional requests answered with 304 do not count against the limit.
+    if response.status_code != 304:
+        RATE_LIMIT["used"] += 1
+    response.headers.update(_rate_limit_headers(config))
+    return response
+
+
+@app.middleware("http")
+async def inject_latency(request: Request, call_next):
+    config: LatencyConfig = LATENCY["config"]
+    if request.url.path.startswith("/repos/") and (config.delay_ms or config.jitter_ms):
+        await asyncio.sleep((config.delay_ms + random.uniform(0, config.jitter_ms)) / 1000)
+    return await call_next(request)
+
+
+@app.put("/_mock/latency")
+def configure_latency(config: LatencyConfig) -> dict:
+    LATENCY["config"] = config
+    return config.model_dump()
+
+
+@app.put("/_mock/rate-limit")
+def configure_rate_limit(config: RateLimitConfig) -> dict:
+    RATE_LIMIT.update(config=config, used=0, reset=0)
+    return config.model_dump()
+
+
 @app.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
@@ -49,6 +143,38 @@ DATA = {
 }
 
 
+@app.put("/_mock/issues")
+def seed_issues(seed: SeedIssues) -> dict:
+    """Replace a repository's issues with ``count`` synthetic ones, for pagination tests."""
+    DATA[seed.repo] = {
+        "issues": [
+            {
+                "number": number,
+                "title": f"synthetic issue {number}",
+                "body": "",
+                "labels": [],
+                "comments": [],
+                "state": seed.state,
+            }
+            for number in range(1, seed.count + 1)
+        ]
+    }
+    return {"repo": seed.repo, "count": seed.count}
+
+
+def _page_links(request: Request, page: int, last: int) -> str:
+    """GitHub-style ``Link`` header for a page of ``last``."""
+    rels = {}
+    if page < last:
+        rels["next"], rels["last"] = page + 1, last
+    if page > 1:
+        rels["first"], rels["prev"] = 1, page - 1
+    return ", ".join(
+        f'<{request.url.include_query_params(page=number)}>; rel="{rel}"'
+        for rel, number in rels.items()
+    )
+
+
 def _find_issue(repo: str, number: int) -> dict:
     for issue in DATA.get(repo, {}).get("issues", []):
         if issue["number"] == number:
@@ -57,10 +183,31 @@ def _find_issue(repo: str, number: int) -> dict:
 
 
 @app.get("/repos/{owner}/{repo}/issues")
-def list_issues(owner: str, repo: str, state: str = "open") -> list[dict]:
+def list_issues(
+    owner: str,
+    repo: str,
+    request: Request,
+    state: str = "open",
+    per_page: int = Query(default=30, ge=1),
+    page: int = Query(default=1, ge=1),
+) -> Response:
     key = f"{owner}/{repo}"
-    issues = DATA.get(key, {}).get("issues", [])
-    return [issue for issue in issues if issue.get("state") == state]
+    issues = [
+        issue for issue in DATA.get(key, {}).get("issues", []) if issue.get("state") == state
+    ]
+    # GitHub caps per_page at 100 and answers past-the-end pages with [].
+    per_page = min(per_page, 100)
+    last = max(1, -(-len(issues) // per_page))
+    body = json.dumps(issues[(page - 1) * per_page : page * per_page]).encode()
+    headers = {}
+    links = _page_links(request, page, last)
+    if links:
+        headers["Link"] = links
+    # Like GitHub: a matching If-None-Match gets an empty 304.
+    headers["ETag"] = f'"{sha256(body + links.encode()).hexdigest()[:32]}"'
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @app.post("/repos/{owner}/{repo}/issues/{number}/labels")
@@ -14,19 +14,31 @@ TRIAGE_DRY_RUN = os.getenv("TRIAGE_DRY_RUN", "false").lower() == "true"
 TRIAGE_AUTO_APPROVE = os.getenv("TRIAGE_AUTO_APPROVE", "true").lower() == "true"
 
 
-def tool_call(action: str, repo: str, params: dict) -> dict:
-    payload = {
+def build_call(action: str, repo: str, params: dict) -> dict:
+    return {
         "agent_id": "github-triage-agent",
         "tool": "github",
         "action": action,
         "repo": repo,
         "params": params,
     }
+
+
+def tool_call(action: str, repo: str, params: dict) -> dict:
+    payload = build_call(action, repo, params)
     response = httpx.post(f"{GATEWAY_URL}/v1/tool-calls", json=payload, timeout=20.0)
     response.raise_for_status()
     return response.json()
 
 
+def tool_call_batch(calls: list[dict]) -> list[dict]:
+    response = httpx.post(
+        f"{GATEWAY_URL}/v1/tool-calls:batch", json={"calls": calls}, timeout=20.0
+    )
+    response.raise_for_status()
+    return response.json()["results"]
+
+
 def load_template(path: str) -> dict:
     with open(path, encoding="utf-8") as handle:
         return json.load(handle)
@@ -77,30 +89,29 @@ def main() -> None:
     issues = (read.get("result") or {}).get("issues", [])
     print(f"   Found {len(issues)} issues")
 
-    planned_writes = 0
+    writes: list[dict] = []
     for issue in issues:
         label, comment = classify(issue, template)
         print(f"   Issue #{issue['number']} classified as: {label}")
-        if TRIAGE_DRY_RUN:
-            continue
-
-        label_result = tool_call(
-            "issues.set_labels",
-            REPO,
-            {"issue_number": issue["number"], "labels": [label]},
+        writes.append(
+            build_call("issues.set_labels", REPO, {"issue_number": issue["number"], "labels": [label]})
         )
-        comment_result = tool_call(
-            "issues.create_comment",
-            REPO,
-            {"issue_number": issue["number"], "body": comment},
+        writes.append(
+            build_call("issues.create_comment", REPO, {"issue_number": issue["number"], "body": comment})
         )
-        print(
-            f"3) Issue #{issue['number']} write calls:",
-            label_result["status"],
-            "/",
-            comment_result["status"],
-        )
-        planned_writes += 2
+
+    planned_writes = 0
+    if writes and not TRIAGE_DRY_RUN:
+        # One batch request for all label and comment writes instead of a round trip each.
+        results = tool_call_batch(writes)
+        for issue, label_result, comment_result in zip(issues, results[::2], results[1::2]):
+            print(
+                f"3) Issue #{issue['number']} write calls:",
+                label_result["status"],
+                "/",
+                comment_result["status"],
+            )
+        planned_writes = len(writes)
 
     if TRIAGE_DRY_RUN:
         print(f"3) Dry run enabled, no write calls executed. Planned writes: {len(issues) * 2}")
@@ -120,6 +131,16 @@ def main() -> None:
             )
             approved.raise_for_status()
         print(f"5) Approved {len(approvals)} actions")
+        # With APPROVAL_EXECUTION_MODE=queue approve returns before the call runs; the
+        # wait endpoint returns as soon as each approval is executed or failed.
+        for item in approvals:
+            outcome = httpx.get(
+                f"{GATEWAY_URL}/v1/approvals/{item['id']}/wait",
+                params={"timeout": 30},
+                timeout=50.0,
+            )
+            outcome.raise_for_status()
+            print(f"   Approval {item['id']}: {outcome.json()['status']}")
     else:
         print("5) Auto-approve disabled; approve pending actions via UI/API.")
 
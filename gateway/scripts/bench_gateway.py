@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""Load-test the gateway over HTTP against the mock GitHub server, plus micro-benchmarks.
+
+Starts ``connectors/github/mock_server.py`` and the gateway (``uvicorn src.main:app``)
+as subprocesses on free local ports. The gateway uses a temporary SQLite file unless
+``--database-url`` is given. The mock server adds ``--latency-ms`` to every GitHub
+call, plus a random 0..``--jitter-ms``. ``--concurrency`` client threads then send
+``--requests`` tool calls drawn from ``--mix``:
+
+- ``read``: allowed ``issues.list``, one GitHub GET
+- ``write``: allowed low-risk ``issues.set_labels``, one GitHub POST
+- ``approval``: medium-risk ``issues.set_labels`` that creates a pending approval
+- ``denied``: a call no rule allows
+- ``replay``: an ``X-Idempotency-Key`` already used during warm-up
+
+The report covers:
+- requests/s;
+- p50/p95/p99 latency, overall and per kind;
+- database growth per request;
+- the gateway's ``/metrics`` stage means.
+
+``--micro`` adds in-process timings of ``PolicyEngine.decide``, ``_request_hash`` and
+audit row serialization. ``--output`` writes the results as JSON. ``--compare`` prints
+the change against an earlier results file, and with ``--max-regression`` it fails on
+regressions. ``--env KEY=VALUE`` passes gateway settings, for example
+``--env AUDIT_WRITE_MODE=group_commit``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import UTC, datetime
+from pathlib import Path
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.orm import Session, sessionmaker
+
+GATEWAY_DIR = Path(__file__).resolve().parents[1]
+REPO_ROOT = GATEWAY_DIR.parent
+sys.path.insert(0, str(GATEWAY_DIR))
+
+from src.connectors.github_client import GithubClient  # noqa: E402
+from src.policy import PolicyEngine  # noqa: E402
+from src.schemas import ToolCallRequest  # noqa: E402
+from src.service import Agent2AllowService  # noqa: E402
+
+RESULTS_FORMAT = "agent2allow-bench/1"
+
+POLICY = """
+version: 1
+defaults:
+  deny_by_default: true
+rules:
+  - tool: github
+    actions: [issues.list]
+    repo: acme/roadrunner
+    risk: read
+    allow: true
+  - tool: github
+    actions: [issues.set_labels]
+    repo: acme/roadrunner
+    risk: low
+    allow: true
+  - tool: github
+    actions: [issues.set_labels]
+    repo: acme/approvals
+    risk: medium
+    allow: true
+"""
+
+KINDS = ("read", "write", "approval", "denied", "replay")
+DEFAULT_MIX = "read=40,write=20,approval=10,denied=15,replay=15"
+REPLAY_KEYS = 20
+
+_STAGE_RE = re.compile(
+    r'^agent2allow_tool_call_stage_seconds_(sum|count)\{stage="([^"]+)"\} (\S+)$'
+)
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """Parse ``"read=40,write=20"`` into normalised traffic weights."""
+    weights: dict[str, float] = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        kind, sep, weight = item.partition("=")
+        kind = kind.strip()
+        if not sep or kind not in KINDS:
+            raise ValueError(f"invalid mix entry {item.strip()!r}; kinds are {', '.join(KINDS)}")
+        weights[kind] = float(weight)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("traffic mix weights must add up to more than zero")
+    return {kind: weight / total for kind, weight in weights.items() if weight > 0}
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def _latency_ms(latencies: list[float]) -> dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        name: round(percentile(ordered, pct) * 1000, 3)
+        for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+    }
+
+
+def _call(kind: str, index: int, run_id: str) -> tuple[dict, dict[str, str]]:
+    base = {"agent_id": "bench-agent", "tool": "github"}
+    if kind == "read":
+        return {**base, "action": "issues.list", "repo": "acme/roadrunner"}, {}
+    if kind == "denied":
+        return {**base, "action": "issues.list", "repo": "other/repo"}, {}
+    if kind == "approval":
+        params = {"issue_number": index + 1, "labels": ["bench"]}
+        return {
+            **base,
+            "action": "issues.set_labels",
+            "repo": "acme/approvals",
+            "params": params,
+        }, {}
+    # The mock server only knows issues 1-3 of acme/roadrunner.
+    params = {"issue_number": index % 3 + 1, "labels": ["bench"]}
+    call = {**base, "action": "issues.set_labels", "repo": "acme/roadrunner", "params": params}
+    if kind == "replay":
+        slot = index % REPLAY_KEYS
+        call["params"] = {"issue_number": slot % 3 + 1, "labels": ["bench"]}
+        return call, {"X-Idempotency-Key": f"bench-{run_id}-{slot}"}
+    return call, {}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start(command: list[str], cwd: Path, env: dict[str, str], log: Path) -> subprocess.Popen:
+    with log.open("wb") as output:
+        return subprocess.Popen(command, cwd=cwd, env=env, stdout=output, stderr=output)
+
+
+def _wait_ready(process: subprocess.Popen, url: str, log: Path, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    tail = log.read_text(errors="replace")[-2000:]
+    raise RuntimeError(f"{url} did not become ready:\n{tail}")
+
+
+def _stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def database_bytes(database_url: str) -> int:
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        path = Path(url.database or "")
+        return sum(
+            candidate.stat().st_size
+            for candidate in (path, Path(f"{path}-wal"))
+            if candidate.exists()
+        )
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as connection:
+            return int(connection.scalar(text("SELECT pg_database_size(current_database())")) or 0)
+    finally:
+        engine.dispose()
+
+
+def stage_means_ms(metrics_text: str) -> dict[str, float]:
+    """Mean per-stage latency from the gateway's ``/metrics`` histogram."""
+    totals: dict[str, dict[str, float]] = defaultdict(dict)
+    for line in metrics_text.splitlines():
+        match = _STAGE_RE.match(line)
+        if match:
+            totals[match.group(2)][match.group(1)] = float(match.group(3))
+    return {
+        stage: round(values["sum"] / values["count"] * 1000, 4)
+        for stage, values in sorted(totals.items())
+        if values.get("count")
+    }
+
+
+def _drive(
+    base_url: str, plan: list[tuple[str, int]], concurrency: int, run_id: str
+) -> tuple[list[tuple[str, float, str]], float]:
+    """Send ``plan`` from ``concurrency`` threads; return ``(kind, seconds, status)`` rows."""
+    samples: list[tuple[str, float, str]] = []
+    lock = threading.Lock()
+    position = 0
+
+    def _client() -> None:
+        nonlocal position
+        rows: list[tuple[str, float, str]] = []
+        with httpx.Client(base_url=base_url, timeout=60.0) as http:
+            while True:
+                with lock:
+                    if position >= len(plan):
+                        break
+                    kind, index = plan[position]
+                    position += 1
+                body, headers = _call(kind, index, run_id)
+                started = time.perf_counter()
+                try:
+                    response = http.post("/v1/tool-calls", json=body, headers=headers)
+                    status = (
+                        response.json()["status"]
+                        if response.status_code == 200
+                        else f"http_{response.status_code}"
+                    )
+                except httpx.HTTPError as exc:
+                    status = f"error_{type(exc).__name__}"
+                rows.append((kind, time.perf_counter() - started, status))
+        with lock:
+            samples.extend(rows)
+
+    threads = [threading.Thread(target=_client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def run_load(args: argparse.Namespace) -> dict:
+    mix = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    kinds = list(mix)
+    plan = [
+        (kind, index)
+        for index, kind in enumerate(
+            rng.choices(kinds, weights=[mix[k] for k in kinds], k=args.requests)
+        )
+    ]
+    warmup = [(kind, -1 - index) for index, kind in enumerate(rng.choices(kinds, k=args.warmup))]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        policy_path = tmp_path / "policy.yml"
+        policy_path.write_text(POLICY, encoding="utf-8")
+        database_url = args.database_url or f"sqlite:///{tmp_path / 'bench.db'}"
+        mock_port, gateway_port = _free_port(), _free_port()
+        mock_url = f"http://127.0.0.1:{mock_port}"
+        gateway_url = f"http://127.0.0.1:{gateway_port}"
+        uvicorn = [sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--log-level", "warning"]
+        env = {
+            **os.environ,
+            "DATABASE_URL": database_url,
+            "POLICY_PATH": str(policy_path),
+            "GITHUB_BASE_URL": mock_url,
+            "METRICS_ENABLED": "true",
+            **dict(item.split("=", 1) for item in args.env),
+        }
+        mock_log, gateway_log = tmp_path / "mock.log", tmp_path / "gateway.log"
+        mock = _start(
+            [*uvicorn, "--port", str(mock_port), "connectors.github.mock_server:app"],
+            REPO_ROOT,
+            os.environ.copy(),
+            mock_log,
+        )
+        gateway = None
+        try:
+            _wait_ready(mock, f"{mock_url}/health", mock_log)
+            httpx.put(
+                f"{mock_url}/_mock/latency",
+                json={"delay_ms": args.latency_ms, "jitter_ms": args.jitter_ms},
+            ).raise_for_status()
+            gateway = _start(
+                [*uvicorn, "--port", str(gateway_port), "src.main:app"],
+                GATEWAY_DIR,
+                env,
+                gateway_log,
+            )
+            _wait_ready(gateway, f"{gateway_url}/ready", gateway_log)
+
+            run_id = uuid4().hex
+            seeds = [("replay", slot) for slot in range(REPLAY_KEYS)] if "replay" in mix else []
+            _drive(gateway_url, seeds + warmup, args.concurrency, run_id)
+            bytes_before = database_bytes(database_url)
+            samples, elapsed = _drive(gateway_url, plan, args.concurrency, run_id)
+            bytes_after = database_bytes(database_url)
+            metrics = httpx.get(f"{gateway_url}/metrics", timeout=10.0)
+        finally:
+            if gateway is not None:
+                _stop(gateway)
+            _stop(mock)
+
+    by_kind: dict[str, list[float]] = defaultdict(list)
+    for kind, seconds, _ in samples:
+        by_kind[kind].append(seconds)
+    statuses = Counter(status for _, _, status in samples)
+    return {
+        "database": make_url(database_url).get_backend_name(),
+        "requests": len(samples),
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(len(samples) / elapsed, 1),
+        "latency_ms": _latency_ms([seconds for _, seconds, _ in samples]),
+        "by_kind": {
+            kind: {"requests": len(latencies), "latency_ms": _latency_ms(latencies)}
+            for kind, latencies in sorted(by_kind.items())
+        },
+        "statuses": dict(sorted(statuses.items())),
+        "errors": sum(
+            count for status, count in statuses.items() if status.startswith(("http_", "error_"))
+        ),
+        "db_bytes_before": bytes_before,
+        "db_bytes_after": bytes_after,
+        "db_bytes_per_request": round((bytes_after - bytes_before) / max(1, len(samples)), 1),
+        "stage_mean_ms": stage_means_ms(metrics.text) if metrics.status_code == 200 else {},
+    }
+
+
+def _time_per_call(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def run_micro(iterations: int) -> dict[str, float]:
+    """Microseconds per call of the CPU-bound steps of every tool call."""
+    with tempfile.TemporaryDirectory() as tmp:
+        policy_path = Path(tmp) / "policy.yml"
+        policy_path.write_text(POLICY, encoding="utf-8")
+        engine = PolicyEngine(str(policy_path))
+        github = GithubClient("http://127.0.0.1:9")
+        # No database is touched: _audit only adds rows to an unbound session.
+        service = Agent2AllowService(
+            session_factory=sessionmaker(), policy_engine=engine, github_client=github
+        )
+        request = ToolCallRequest(
+            agent_id="bench-agent",
+            tool="github",
+            action="issues.set_labels",
+            repo="acme/roadrunner",
+            params={"issue_number": 1, "labels": ["bug", "triage"]},
+            idempotency_key="bench-key",
+        )
+        payload = request.model_dump()
+        response = {"labels": ["bug", "triage"]}
+
+        def _audit_batch(size: int) -> float:
+            db = Session()
+            started = time.perf_counter()
+            for _ in range(size):
+                service._audit(
+                    db,
+                    agent_id=request.agent_id,
+                    tool=request.tool,
+                    action=request.action,
+                    repo=request.repo,
+                    risk_level="low",
+                    status="executed",
+                    request_payload=payload,
+                    response_payload=response,
+                    message="executed",
+                )
+            elapsed = time.perf_counter() - started
+            db.close()
+            return elapsed
+
+        batch = 1000
+        audit_seconds = sum(_audit_batch(batch) for _ in range(max(1, iterations // batch)))
+        results = {
+            "policy_decide_us": _time_per_call(
+                lambda: engine.decide("github", "issues.set_labels", "acme/roadrunner"),
+                iterations,
+            ),
+            "request_hash_us": _time_per_call(lambda: service._request_hash(request), iterations),
+            "audit_row_us": audit_seconds / (max(1, iterations // batch) * batch) * 1_000_000,
+        }
+        github.close()
+    return {name: round(value, 3) for name, value in results.items()}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparable(results: dict) -> dict[str, tuple[float, bool]]:
+    """Flatten results into ``{metric: (value, higher_is_better)}`` for comparison."""
+    metrics: dict[str, tuple[float, bool]] = {}
+    load = results.get("load")
+    if load:
+        metrics["load.requests_per_second"] = (load["requests_per_second"], True)
+        for name in ("p50", "p95", "p99"):
+            metrics[f"load.latency_ms.{name}"] = (load["latency_ms"][name], False)
+        metrics["load.db_bytes_per_request"] = (load["db_bytes_per_request"], False)
+    for name, value in (results.get("micro") or {}).items():
+        metrics[f"micro.{name}"] = (value, False)
+    return metrics
+
+
+def compare(baseline: dict, current: dict) -> list[dict]:
+    """Per-metric change from ``baseline``; ``regression`` is the worsening in percent."""
+    before, after = comparable(baseline), comparable(current)
+    rows = []
+    for name, (value, higher_is_better) in after.items():
+        if name not in before:
+            continue
+        base = before[name][0]
+        change = (value - base) / base * 100 if base else 0.0
+        rows.append(
+            {
+                "metric": name,
+                "baseline": base,
+                "current": value,
+                "change_pct": round(change, 1),
+                "regression_pct": round(-change if higher_is_better else change, 1),
+            }
+        )
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test the gateway against the mock server")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--mix", default=DEFAULT_MIX, help=f"kind=weight list (default {DEFAULT_MIX})"
+    )
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="mock GitHub latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument(
+        "--env", action="append", default=[], metavar="KEY=VALUE", help="gateway setting"
+    )
+    parser.add_argument("--seed", type=int, default=1, help="traffic mix random seed")
+    parser.add_argument("--skip-load", action="store_true", help="only run micro-benchmarks")
+    parser.add_argument("--micro", action="store_true", help="add in-process micro-benchmarks")
+    parser.add_argument("--micro-iterations", type=int, default=20_000)
+    parser.add_argument("--output", type=Path, help="write results JSON to this file")
+    parser.add_argument("--compare", type=Path, help="earlier results JSON to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=None,
+        help="with --compare, exit 1 if any metric is this many percent worse",
+    )
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    args = parser.parse_args()
+    for item in args.env:
+        if "=" not in item:
+            parser.error(f"--env expects KEY=VALUE, got {item!r}")
+    try:
+        parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    results: dict = {
+        "format": RESULTS_FORMAT,
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in {"output", "compare", "max_regression", "json"}
+        },
+        "load": None if args.skip_load else run_load(args),
+        "micro": run_micro(args.micro_iterations) if args.micro or args.skip_load else None,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    comparison = compare(json.loads(args.compare.read_text()), results) if args.compare else None
+
+    if args.json:
+        print(json.dumps({**results, "comparison": comparison}, indent=2, sort_keys=True))
+    else:
+        _print_report(results, comparison)
+    if comparison and args.max_regression is not None:
+        worst = [row for row in comparison if row["regression_pct"] > args.max_regression]
+        if worst:
+            names = ", ".join(row["metric"] for row in worst)
+            print(f"regressed more than {args.max_regression}%: {names}", file=sys.stderr)
+            return 1
+    return 0
+
+
+def _print_report(results: dict, comparison: list[dict] | None) -> None:
+    load = results["load"]
+    if load:
+        print(
+            f"{load['requests']} requests in {load['elapsed_seconds']}s: "
+            f"{load['requests_per_second']} req/s, {load['errors']} errors, "
+            f"db +{load['db_bytes_per_request']} bytes/request"
+        )
+        print(f"{'kind':<10} {'requests':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for kind, row in [("all", load), *load["by_kind"].items()]:
+            latency = row["latency_ms"]
+            print(
+                f"{kind:<10} {row['requests']:>9} {latency['p50']:>9.2f} "
+                f"{latency['p95']:>9.2f} {latency['p99']:>9.2f}"
+            )
+        print("statuses: " + ", ".join(f"{k}={v}" for k, v in load["statuses"].items()))
+        if load["stage_mean_ms"]:
+            stages = ", ".join(f"{k}={v}" for k, v in load["stage_mean_ms"].items())
+            print(f"gateway stage means (ms): {stages}")
+    if results["micro"]:
+        print("micro (us/call): " + ", ".join(f"{k}={v}" for k, v in results["micro"].items()))
+    if comparison:
+        print(f"{'metric':<30} {'baseline':>12} {'current':>12} {'change':>8}")
+        for row in comparison:
+            print(
+                f"{row['metric']:<30} {row['baseline']:>12} {row['current']:>12} "
+                f"{row['change_pct']:>+7.1f}%"
+            )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Compare pooled GithubClient calls with a fresh HTTP client per call.
+
+Starts ``connectors/github/mock_server.py`` on a local port with uvicorn and issues
+``list_issues`` calls against it. The per-call variant reproduces a TCP handshake
+for every request; against real GitHub each of those is also a TLS handshake.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "gateway"))
+sys.path.insert(0, str(REPO_ROOT))
+
+from connectors.github.mock_server import app as mock_app  # noqa: E402
+
+from src.connectors.github_client import GithubClient  # noqa: E402
+
+
+class PerCallGithubClient(GithubClient):
+    """Opens a new connection for every request (the pre-pooling behaviour)."""
+
+    def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        with httpx.Client(timeout=10.0) as client:
+            response = client.request(
+                method, f"{self.base_url}{path}", headers=self._headers(), **kwargs
+            )
+        response.raise_for_status()
+        return response
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_server() -> tuple[uvicorn.Server, str]:
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(mock_app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("mock server did not start")
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def _run(client: GithubClient, calls: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+
+    def _call(_: int) -> None:
+        started = time.perf_counter()
+        client.list_issues("acme/roadrunner")
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(_call, range(calls)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "calls_per_second": round(calls / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark pooled GitHub connector calls")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server()
+    try:
+        results = []
+        for name, client in (
+            ("per_call_client", PerCallGithubClient(base_url)),
+            ("pooled_client", GithubClient(base_url)),
+        ):
+            results.append({"client": name, **_run(client, args.calls, args.concurrency)})
+            client.close()
+    finally:
+        server.should_exit = True
+
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return 0
+    print(f"{'client':<18} {'calls/s':>10} {'mean ms':>10} {'p95 ms':>10}")
+    for row in results:
+        print(
+            f"{row['client']:<18} {row['calls_per_second']:>10.1f} "
+            f"{row['mean_ms']:>10.3f} {row['p95_ms']:>10.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Measure PolicyEngine.decide latency against policies of increasing size."""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.policy import PolicyEngine, PolicyRule  # noqa: E402
+
+DEFAULT_SIZES = [10, 1_000, 50_000]
+
+
+def _build_policy(size: int) -> dict:
+    rules: list[dict] = []
+    for idx in range(size):
+        if idx % 100 == 99:
+            rules.append(
+                {
+                    "tool": "github",
+                    "actions": ["issues.*"],
+                    "repo": f"team-{idx}/*",
+                    "risk": "medium",
+                    "allow": True,
+                }
+            )
+            continue
+        rules.append(
+            {
+                "tool": "github",
+                "actions": ["issues.list"],
+                "repo": f"acme/repo-{idx}",
+                "risk": "read",
+                "allow": True,
+            }
+        )
+    return {"version": 1, "defaults": {"deny_by_default": True}, "rules": rules}
+
+
+def _linear_match(rules: list[PolicyRule], tool: str, action: str, repo: str) -> bool:
+    for rule in rules:
+        if rule.tool != tool:
+            continue
+        if not any(fnmatch.fnmatch(action, pattern) for pattern in rule.actions):
+            continue
+        if not fnmatch.fnmatch(repo, rule.repo):
+            continue
+        return True
+    return False
+
+
+def _time_per_call(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def run_benchmark(sizes: list[int], iterations: int) -> list[dict]:
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            policy_path = Path(tmp) / f"policy-{size}.yml"
+            policy_path.write_text(yaml.safe_dump(_build_policy(size)), encoding="utf-8")
+            engine = PolicyEngine(str(policy_path))
+            probes = {
+                "first_rule": ("issues.list", "acme/repo-0"),
+                "last_rule": ("issues.list", f"acme/repo-{size - 2}"),
+                "no_match": ("issues.list", "other/repo"),
+            }
+            for probe, (action, repo) in probes.items():
+                compiled_us = _time_per_call(
+                    partial(engine.decide, "github", action, repo), iterations
+                )
+                linear_us = _time_per_call(
+                    partial(_linear_match, engine.rules, "github", action, repo),
+                    max(1, iterations // max(1, size // 100)),
+                )
+                results.append(
+                    {
+                        "rules": size,
+                        "probe": probe,
+                        "decide_us": round(compiled_us, 3),
+                        "linear_scan_us": round(linear_us, 3),
+                    }
+                )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark PolicyEngine.decide latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.iterations)
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return 0
+
+    print(f"{'rules':>8} {'probe':<12} {'decide (us)':>12} {'linear scan (us)':>18}")
+    for row in results:
+        print(
+            f"{row['rules']:>8} {row['probe']:<12} "
+            f"{row['decide_us']:>12.3f} {row['linear_scan_us']:>18.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,302 @@
+import logging
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ColumnElement, and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .models import Approval, ApprovalJob
+
+if TYPE_CHECKING:
+    from .service import Agent2AllowService
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class ClaimedJob:
+    id: int
+    approval_id: int
+    repo: str
+    attempts: int
+
+
+class ApprovalJobQueue:
+    """Durable queue of approved calls waiting to run, stored in ``approval_jobs``.
+
+    ``enqueue`` adds the job in the approver's transaction, so an approval is never
+    marked ``approved`` without its job. ``claim`` moves one job to ``running`` with a
+    lease of ``lease_seconds``. A worker that dies mid-job leaves the lease to expire,
+    and the job is claimed again, so execution is at least once. A job claimed more
+    than ``max_attempts`` times is failed instead of run again. On PostgreSQL
+    concurrent claimers skip each other's rows with ``FOR UPDATE SKIP LOCKED``;
+    SQLite ignores the lock clause and relies on its single writer plus the
+    conditional update in ``claim``.
+    """
+
+    def __init__(self, *, lease_seconds: float = 300.0, max_attempts: int = 3):
+        if lease_seconds <= 0:
+            raise ValueError("approval job lease must be positive")
+        if max_attempts <= 0:
+            raise ValueError("approval job max attempts must be positive")
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._wakeup = threading.Condition()
+        self._pending_wakeups = 0
+
+    def enqueue(self, db: Session | AsyncSession, approval: Approval) -> None:
+        db.add(ApprovalJob(approval_id=approval.id, repo=approval.repo, status=QUEUED))
+
+    def notify(self, count: int = 1) -> None:
+        """Wake idle workers after jobs were committed."""
+        with self._wakeup:
+            self._pending_wakeups += count
+            self._wakeup.notify(count)
+
+    def wait(self, timeout: float) -> None:
+        with self._wakeup:
+            if not self._pending_wakeups:
+                self._wakeup.wait(timeout)
+            self._pending_wakeups = max(0, self._pending_wakeups - 1)
+
+    @staticmethod
+    def _claimable(now: datetime) -> ColumnElement[bool]:
+        return or_(
+            ApprovalJob.status == QUEUED,
+            and_(ApprovalJob.status == RUNNING, ApprovalJob.lease_expires_at < now),
+        )
+
+    def claim(
+        self, db: Session, worker_id: str, *, exclude_repos: set[str] | None = None
+    ) -> ClaimedJob | None:
+        """Claim the oldest runnable job outside ``exclude_repos`` and commit the claim."""
+        now = _utcnow()
+        candidate = (
+            select(ApprovalJob.id)
+            .where(self._claimable(now))
+            .order_by(ApprovalJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if exclude_repos:
+            candidate = candidate.where(ApprovalJob.repo.not_in(exclude_repos))
+        job_id = db.scalar(candidate)
+        if job_id is None:
+            db.rollback()
+            return None
+        claimed = db.execute(
+            update(ApprovalJob)
+            .where(ApprovalJob.id == job_id, self._claimable(now))
+            .values(
+                status=RUNNING,
+                worker_id=worker_id,
+                attempts=ApprovalJob.attempts + 1,
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                updated_at=now,
+            )
+            .returning(ApprovalJob.approval_id, ApprovalJob.repo, ApprovalJob.attempts)
+        ).first()
+        db.commit()
+        if claimed is None:
+            return None
+        return ClaimedJob(job_id, claimed.approval_id, claimed.repo, claimed.attempts)
+
+    def release(self, db: Session, job: ClaimedJob, worker_id: str) -> None:
+        """Hand back a claimed job that was never started; the claim is not an attempt."""
+        db.execute(
+            update(ApprovalJob)
+            .where(
+                ApprovalJob.id == job.id,
+                ApprovalJob.status == RUNNING,
+                ApprovalJob.worker_id == worker_id,
+            )
+            .values(
+                status=QUEUED,
+                worker_id="",
+                attempts=ApprovalJob.attempts - 1,
+                lease_expires_at=None,
+                updated_at=_utcnow(),
+            )
+        )
+        db.commit()
+
+    def finish(self, db: Session, job_id: int, status: str, error: str = "") -> None:
+        """Stage the job's final status; committed with the approval's outcome."""
+        db.execute(
+            update(ApprovalJob)
+            .where(ApprovalJob.id == job_id)
+            .values(status=status, last_error=error, lease_expires_at=None, updated_at=_utcnow())
+        )
+
+    def depth(self, db: Session) -> dict[str, int]:
+        rows = db.execute(
+            select(ApprovalJob.status, func.count()).group_by(ApprovalJob.status)
+        ).all()
+        return {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, **dict(rows)}
+
+
+class ApprovalWorkerPool:
+    """Threads that claim approval jobs and run them through the service.
+
+    Each worker claims one job at a time. Claims skip repos that already have
+    ``per_repo_concurrency`` jobs running in this pool, so one busy repo cannot
+    hold every worker. Idle workers sleep for ``poll_interval_seconds`` or until
+    ``ApprovalJobQueue.notify``.
+    """
+
+    def __init__(
+        self,
+        service: "Agent2AllowService",
+        *,
+        workers: int = 4,
+        per_repo_concurrency: int = 2,
+        poll_interval_seconds: float = 1.0,
+    ):
+        if service.approval_queue is None:
+            raise ValueError("approval worker pool needs a service with an approval queue")
+        if workers <= 0:
+            raise ValueError("approval worker count must be positive")
+        self.service = service
+        self.queue = service.approval_queue
+        self.workers = workers
+        self.per_repo_concurrency = max(1, per_repo_concurrency)
+        self.poll_interval_seconds = poll_interval_seconds
+        self.executed = 0
+        self.failed = 0
+        self.errors = 0
+        self._running: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(
+                target=self._run,
+                args=(f"{os.getpid()}-{index}",),
+                name=f"agent2allow-approval-worker-{index}",
+                daemon=True,
+            )
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self.queue.notify(len(self._threads))
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _claim(self, worker_id: str) -> ClaimedJob | None:
+        # The lock is not held across the database claim, so workers do not queue
+        # behind each other's round trip. A worker that claims a job for a repo whose
+        # last slot was taken meanwhile hands the job back and claims again.
+        while True:
+            with self._lock:
+                saturated = {
+                    repo
+                    for repo, count in self._running.items()
+                    if count >= self.per_repo_concurrency
+                }
+            with self.service.session_factory() as db:
+                job = self.queue.claim(db, worker_id, exclude_repos=saturated)
+                if job is None:
+                    return None
+                with self._lock:
+                    if self._running[job.repo] < self.per_repo_concurrency:
+                        self._running[job.repo] += 1
+                        return job
+                self.queue.release(db, job, worker_id)
+
+    def run_once(self, worker_id: str = "manual") -> bool:
+        """Claim and run one job; return False when there was nothing to claim."""
+        try:
+            job = self._claim(worker_id)
+        except Exception as exc:
+            self.errors += 1
+            logger.warning("approval job claim failed: %s", exc)
+            return False
+        if job is None:
+            return False
+        try:
+            status = self.service.run_approval_job(job)
+        except Exception as exc:
+            # The lease runs out and another claim retries the job.
+            self.errors += 1
+            logger.warning("approval job %d failed: %s", job.id, exc)
+        else:
+            with self._lock:
+                if status == "executed":
+                    self.executed += 1
+                else:
+                    self.failed += 1
+        finally:
+            with self._lock:
+                self._running[job.repo] -= 1
+                if not self._running[job.repo]:
+                    del self._running[job.repo]
+        return True
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "per_repo_concurrency": self.per_repo_concurrency,
+                "running": dict(self._running),
+                "executed": self.executed,
+                "failed": self.failed,
+                "errors": self.errors,
+            }
+
+    def _run(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            if not self.run_once(worker_id):
+                self.queue.wait(self.poll_interval_seconds)
+
+
+def build_approval_job_queue(
+    *, mode: str, lease_seconds: float, max_attempts: int
+) -> ApprovalJobQueue | None:
+    mode = mode.lower().strip()
+    if mode == "inline":
+        return None
+    if mode == "queue":
+        return ApprovalJobQueue(lease_seconds=lease_seconds, max_attempts=max_attempts)
+    raise ValueError(f"unsupported approval execution mode: {mode}")
+
+
+def build_approval_worker_pool(
+    service: "Agent2AllowService",
+    *,
+    workers: int,
+    per_repo_concurrency: int,
+    poll_interval_seconds: float,
+) -> ApprovalWorkerPool | None:
+    if service.approval_queue is None or workers <= 0:
+        return None
+    return ApprovalWorkerPool(
+        service,
+        workers=workers,
+        per_repo_concurrency=per_repo_concurrency,
+        poll_interval_seconds=poll_interval_seconds,
+    )
+
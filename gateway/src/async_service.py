@@ -0,0 +1,342 @@
+import asyncio
+from collections.abc import Callable
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .approval_queue import ApprovalJobQueue
+from .audit_partitions import AuditPartitionManager
+from .audit_sink import AuditSinkContract, NoopAuditSink, safe_emit
+from .audit_writer import AuditWriter
+from .coalescing import RequestCoalescer
+from .connectors.contracts import AsyncGithubConnectorContract, GithubConnectorContract
+from .event_bus import EventBus
+from .idempotency import IdempotencyCache
+from .metrics import GatewayMetrics
+from .models import Approval, IdempotencyRecord
+from .policy import PolicyDecision, PolicyEngine
+from .schemas import ToolCallRequest
+from .service import (
+    COALESCED_MESSAGE,
+    Agent2AllowService,
+    IdempotencyConflictError,
+    ToolCallOutcome,
+    _BatchItem,
+)
+
+
+class AsyncAgent2AllowService(Agent2AllowService):
+    """Agent2AllowService with an asyncio tool-call and approval path.
+
+    The ``*_async`` methods mirror their synchronous counterparts but await the
+    database (``AsyncSession``) and the connector (``AsyncGithubConnectorContract``),
+    so a worker can hold many in-flight calls without a thread per call. Read-only
+    helpers such as ``list_pending_approvals`` keep using the synchronous session.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        async_session_factory: Callable[[], AsyncSession],
+        policy_engine: PolicyEngine,
+        github_client: GithubConnectorContract,
+        async_github_client: AsyncGithubConnectorContract,
+        audit_sink: AuditSinkContract | None = None,
+        audit_writer: AuditWriter | None = None,
+        audit_partitions: AuditPartitionManager | None = None,
+        idempotency_ttl_seconds: int = 0,
+        idempotency_cache: IdempotencyCache | None = None,
+        coalescer: RequestCoalescer | None = None,
+        approval_queue: ApprovalJobQueue | None = None,
+        event_bus: EventBus | None = None,
+        metrics: GatewayMetrics | None = None,
+    ):
+        super().__init__(
+            session_factory=session_factory,
+            policy_engine=policy_engine,
+            github_client=github_client,
+            audit_sink=audit_sink,
+            audit_writer=audit_writer,
+            audit_partitions=audit_partitions,
+            idempotency_ttl_seconds=idempotency_ttl_seconds,
+            idempotency_cache=idempotency_cache,
+            coalescer=coalescer,
+            approval_queue=approval_queue,
+            event_bus=event_bus,
+            metrics=metrics,
+        )
+        if not isinstance(async_github_client, AsyncGithubConnectorContract):
+            raise TypeError("async_github_client does not satisfy AsyncGithubConnectorContract")
+        self.async_session_factory = async_session_factory
+        self.async_github_client = async_github_client
+
+    async def _commit_async(self, db: AsyncSession) -> None:
+        with self._timed("db_commit"):
+            await db.commit()
+        self._cache_committed_keys(db)
+        self._publish_committed_events(db)
+        rows = db.info.pop("audit_rows", [])
+        events = db.info.pop("audit_events", [])
+        with self._timed("audit_emit"):
+            if self.audit_writer is not None:
+                await asyncio.to_thread(self.audit_writer.submit, rows, events)
+                return
+            if events and not isinstance(self.audit_sink, NoopAuditSink):
+                await asyncio.to_thread(self._emit_events, events)
+
+    def _emit_events(self, events: list[dict]) -> None:
+        for event in events:
+            safe_emit(self.audit_sink, event)
+
+    async def _execute_async(self, request: ToolCallRequest) -> dict:
+        method, args = self._connector_call(request)
+        with self._timed("connector_execute"):
+            return await getattr(self.async_github_client, method)(*args)
+
+    async def _execute_call_async(
+        self, request: ToolCallRequest, decision: PolicyDecision
+    ) -> tuple[dict, str]:
+        key = self._coalescing_key(request, decision)
+        if key is None:
+            return await self._execute_async(request), "executed"
+        result, coalesced = await self.coalescer.do_async(
+            key, lambda: self._execute_async(request)
+        )
+        return result, COALESCED_MESSAGE if coalesced else "executed"
+
+    async def _load_idempotency_async(
+        self, db: AsyncSession, keys: set[str]
+    ) -> dict[str, IdempotencyRecord]:
+        with self._timed("idempotency_lookup"):
+            found, query = self._idempotency_lookup(keys)
+            if query is not None:
+                live, purge = self._live_idempotency_records(await db.scalars(query))
+                if purge is not None:
+                    await db.execute(purge)
+                found.update(live)
+            return found
+
+    async def _record_idempotency_async(
+        self,
+        db: AsyncSession,
+        *,
+        key: str,
+        request_hash: str,
+        response_payload: dict,
+    ) -> None:
+        row = self._new_idempotency_record(
+            db, key=key, request_hash=request_hash, response_payload=response_payload
+        )
+        try:
+            async with db.begin_nested():
+                db.add(row)
+        except IntegrityError:
+            db.info["idempotency_records"].pop()
+            existing = await db.scalar(
+                select(IdempotencyRecord).where(IdempotencyRecord.key == key)
+            )
+            if existing and existing.request_hash != request_hash:
+                await self._commit_async(db)
+                raise IdempotencyConflictError(
+                    "idempotency key already used with a different request payload"
+                ) from None
+            if not existing:
+                raise
+
+    async def handle_tool_call_async(self, request: ToolCallRequest) -> ToolCallOutcome:
+        request_hash = self._request_hash(request)
+        decision: PolicyDecision = self._decide(request)
+
+        async with self.async_session_factory() as db:
+            idempotency_key = request.idempotency_key
+
+            if idempotency_key:
+                records = await self._load_idempotency_async(db, {idempotency_key})
+                record = records.get(idempotency_key)
+                if record:
+                    replayed = self._stage_replay(db, request, decision, record, request_hash)
+                    await self._commit_async(db)
+                    return replayed
+
+            approval_id: int | None = None
+            result: dict | None = None
+            if not decision.allowed:
+                status, message = "denied", decision.message
+            elif decision.approval_required:
+                approval = self._new_approval(request, decision)
+                db.add(approval)
+                await db.flush()
+                approval_id = approval.id
+                status, message = "pending_approval", "approval required"
+            else:
+                try:
+                    result, message = await self._execute_call_async(request, decision)
+                    status = "executed"
+                except Exception as exc:
+                    status, message = self._failure_status(exc), str(exc)
+
+            outcome = self._stage_outcome(
+                db,
+                request,
+                decision,
+                status=status,
+                message=message,
+                result=result,
+                approval_id=approval_id,
+            )
+            if idempotency_key:
+                await self._record_idempotency_async(
+                    db,
+                    key=idempotency_key,
+                    request_hash=request_hash,
+                    response_payload=outcome,
+                )
+            await self._commit_async(db)
+            return status, message, result, approval_id, False
+
+    async def _execute_batch_item_async(
+        self, item: _BatchItem, semaphore: asyncio.Semaphore
+    ) -> None:
+        async with semaphore:
+            try:
+                item.result, item.message = await self._execute_call_async(
+                    item.request, item.decision
+                )
+                item.status = "executed"
+            except Exception as exc:
+                item.status, item.message = self._failure_status(exc), str(exc)
+
+    async def handle_tool_calls_async(
+        self, requests: list[ToolCallRequest], max_concurrency: int = 8
+    ) -> list[ToolCallOutcome]:
+        items = self._plan_batch(requests)
+        async with self.async_session_factory() as db:
+            records = await self._load_idempotency_async(db, self._batch_keys(items))
+            self._stage_batch_replays(db, items, records)
+
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+            await asyncio.gather(
+                *(
+                    self._execute_batch_item_async(item, semaphore)
+                    for item in items
+                    if item.needs_execution
+                )
+            )
+
+            await db.flush()
+            for key, request_hash, outcome in self._stage_batch_outcomes(db, items):
+                try:
+                    await self._record_idempotency_async(
+                        db, key=key, request_hash=request_hash, response_payload=outcome
+                    )
+                except IdempotencyConflictError as exc:
+                    for item in items:
+                        if item.request.idempotency_key == key:
+                            item.response = ("idempotency_conflict", str(exc), None, None, False)
+            await self._commit_async(db)
+            return [item.response for item in items]
+
+    async def get_approval_async(self, approval_id: int) -> Approval | None:
+        async with self.async_session_factory() as db:
+            return await db.get(Approval, approval_id)
+
+    async def approve_async(
+        self, approval_id: int, approver: str, reason: str
+    ) -> tuple[str, dict | None]:
+        async with self.async_session_factory() as db:
+            approval = await db.get(Approval, approval_id)
+            if not approval:
+                return "not_found", None
+            if approval.status != "pending":
+                return "invalid_state", None
+
+            request_payload = self._stage_decision(
+                db, approval, decision="approve", approver=approver, reason=reason
+            )
+            if self.approval_queue is not None:
+                self.approval_queue.enqueue(db, approval)
+                await self._commit_async(db)
+                self.approval_queue.notify()
+                return "approved", None
+            await self._commit_async(db)
+
+            try:
+                result = await self._execute_async(ToolCallRequest(**request_payload))
+            except Exception as exc:
+                status, outcome = self._stage_execution(db, approval, request_payload, error=exc)
+            else:
+                status, outcome = self._stage_execution(
+                    db, approval, request_payload, result=result
+                )
+            await self._commit_async(db)
+            return status, outcome
+
+    async def deny_async(self, approval_id: int, approver: str, reason: str) -> str:
+        async with self.async_session_factory() as db:
+            approval = await db.get(Approval, approval_id)
+            if not approval:
+                return "not_found"
+            if approval.status != "pending":
+                return "invalid_state"
+
+            self._stage_decision(db, approval, decision="deny", approver=approver, reason=reason)
+            await self._commit_async(db)
+            return "denied"
+
+    async def _execute_approved_async(
+        self, requests: list[ToolCallRequest], max_concurrency: int, per_repo_concurrency: int
+    ) -> list[tuple[dict | None, Exception | None]]:
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        limits = {
+            repo: asyncio.Semaphore(max(1, per_repo_concurrency))
+            for repo in {request.repo for request in requests}
+        }
+
+        async def _run(request: ToolCallRequest) -> tuple[dict | None, Exception | None]:
+            async with limits[request.repo], semaphore:
+                try:
+                    return await self._execute_async(request), None
+                except Exception as exc:
+                    return None, exc
+
+        return list(await asyncio.gather(*(_run(request) for request in requests)))
+
+    async def decide_approvals_async(
+        self,
+        approval_ids: list[int],
+        decision: str,
+        approver: str,
+        reason: str,
+        authorize: Callable[[str], tuple[bool, str]],
+        max_concurrency: int = 8,
+        per_repo_concurrency: int = 4,
+    ) -> list[dict]:
+        async with self.async_session_factory() as db:
+            approvals = {
+                approval.id: approval
+                for approval in await db.scalars(self._approvals_query(approval_ids))
+            }
+            results, claimed = self._stage_bulk_decisions(
+                db,
+                approval_ids,
+                approvals,
+                decision=decision,
+                approver=approver,
+                reason=reason,
+                authorize=authorize,
+            )
+            await self._commit_async(db)
+            self._notify_queued(results)
+            if not claimed:
+                return results
+
+            outcomes = await self._execute_approved_async(
+                [ToolCallRequest(**payload) for _, _, payload in claimed],
+                max_concurrency,
+                per_repo_concurrency,
+            )
+            self._stage_bulk_executions(db, claimed, outcomes)
+            await self._commit_async(db)
+            return results
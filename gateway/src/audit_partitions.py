@@ -0,0 +1,592 @@
+import logging
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import (
+    Connection,
+    Engine,
+    MetaData,
+    create_engine,
+    delete,
+    exists,
+    func,
+    insert,
+    make_url,
+    select,
+    text,
+)
+from sqlalchemy.orm import Session, sessionmaker
+
+from .audit_query import _as_stored_utc
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+PARTITION_INTERVALS = {"day", "month"}
+RETENTION_ACTIONS = {"drop", "archive"}
+# Key for pg_try_advisory_xact_lock; only one replica runs maintenance at a time.
+MAINTENANCE_LOCK_ID = 0x61326178
+_BOUND_RE = re.compile(r"FROM \((?P<start>[^)]*)\) TO \((?P<end>[^)]*)\)")
+
+
+def period_start(value: datetime, interval: str) -> datetime:
+    value = _as_stored_utc(value)
+    if interval == "day":
+        return datetime(value.year, value.month, value.day)
+    return datetime(value.year, value.month, 1)
+
+
+def next_period(start: datetime, interval: str) -> datetime:
+    if interval == "day":
+        return start + timedelta(days=1)
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(start: datetime, interval: str) -> str:
+    if interval == "month" and start.day == 1:
+        return f"audit_logs_p{start:%Y%m}"
+    return f"audit_logs_p{start:%Y%m%d}"
+
+
+def _parse_partition_name(name: str) -> tuple[datetime, str] | None:
+    suffix = name.removeprefix("audit_logs_p")
+    try:
+        if len(suffix) == 6:
+            return datetime.strptime(suffix, "%Y%m"), "month"
+        if len(suffix) == 8:
+            return datetime.strptime(suffix, "%Y%m%d"), "day"
+    except ValueError:
+        return None
+    return None
+
+
+def partition_audit_table(connection: Connection, now: datetime) -> bool:
+    """PostgreSQL: make ``audit_logs`` a table partitioned by range on ``timestamp``.
+
+    Existing rows stay where they are: the old table becomes ``audit_logs_legacy``,
+    attached for everything before next month. ``audit_logs_default`` catches
+    rows outside any range until maintenance creates their period. Returns False
+    when the table was already partitioned.
+    """
+    relkind = connection.scalar(
+        text("SELECT relkind FROM pg_class WHERE oid = 'audit_logs'::regclass")
+    )
+    if relkind == "p":
+        return False
+    legacy_end = next_period(period_start(now, "month"), "month")
+    # Attaching the legacy table builds the parent's indexes on every existing row.
+    connection.execute(text("SET LOCAL statement_timeout = 0"))
+    sequence = connection.scalar(text("SELECT pg_get_serial_sequence('audit_logs', 'id')"))
+    statements = [
+        "ALTER TABLE audit_logs RENAME TO audit_logs_legacy",
+        "ALTER TABLE audit_logs_legacy ALTER COLUMN timestamp SET NOT NULL",
+        # Attaching builds the parent's (id, timestamp) key on the legacy rows instead.
+        "ALTER TABLE audit_logs_legacy DROP CONSTRAINT audit_logs_pkey",
+        *(
+            f"ALTER INDEX {index.name} RENAME TO {index.name}_legacy"
+            for index in AuditLog.__table__.indexes
+        ),
+        "CREATE TABLE audit_logs (LIKE audit_logs_legacy INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (timestamp)",
+        # Unique constraints on a partitioned table must include the partition key.
+        "ALTER TABLE audit_logs ADD PRIMARY KEY (id, timestamp)",
+        "ALTER TABLE audit_logs ADD FOREIGN KEY (approval_id) REFERENCES approvals (id)",
+    ]
+    if sequence:
+        statements.append(f"ALTER SEQUENCE {sequence} OWNED BY audit_logs.id")
+    for statement in statements:
+        connection.execute(text(statement))
+    for index in AuditLog.__table__.indexes:
+        index.create(bind=connection)
+    connection.execute(
+        text(
+            "ALTER TABLE audit_logs ATTACH PARTITION audit_logs_legacy "
+            f"FOR VALUES FROM (MINVALUE) TO ('{legacy_end:%Y-%m-%d %H:%M:%S}')"
+        )
+    )
+    connection.execute(text("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT"))
+    return True
+
+
+@dataclass(frozen=True)
+class AuditPartition:
+    name: str
+    start: datetime | None = None
+    end: datetime | None = None  # exclusive; None means unbounded
+
+
+def _free_range(
+    start: datetime, end: datetime, existing: list[AuditPartition]
+) -> tuple[datetime, datetime] | None:
+    """Clip ``[start, end)`` so it does not overlap any bounded partition."""
+    for partition in sorted(existing, key=lambda p: p.start or datetime.min):
+        if partition.end is None:
+            continue
+        lower = partition.start or datetime.min
+        if lower <= start < partition.end:
+            start = partition.end
+        elif start < lower < end:
+            end = lower
+    return (start, end) if start < end else None
+
+
+class AuditPartitionManager(ABC):
+    """Time-partitioned audit storage: creation, compaction and retention.
+
+    ``retention_days`` of 0 keeps every partition. Otherwise a partition whose
+    upper bound is older than the cutoff is dropped or archived as a whole, so
+    retention never deletes row by row.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        interval: str = "month",
+        premake: int = 2,
+        retention_days: int = 0,
+        retention_action: str = "drop",
+    ):
+        if interval not in PARTITION_INTERVALS:
+            raise ValueError(f"unsupported audit partition interval: {interval}")
+        if retention_action not in RETENTION_ACTIONS:
+            raise ValueError(f"unsupported audit retention action: {retention_action}")
+        self.engine = engine
+        self.interval = interval
+        self.premake = max(premake, 0)
+        self.retention_days = retention_days
+        self.retention_action = retention_action
+
+    def retention_cutoff(self, now: datetime) -> datetime | None:
+        if self.retention_days <= 0:
+            return None
+        return _as_stored_utc(now) - timedelta(days=self.retention_days)
+
+    def _expired(self, partitions: list[AuditPartition], now: datetime) -> list[AuditPartition]:
+        cutoff = self.retention_cutoff(now)
+        if cutoff is None:
+            return []
+        return [p for p in partitions if p.end is not None and p.end <= cutoff]
+
+    def read_session_factories(
+        self, primary: Callable[[], Session]
+    ) -> list[Callable[[], Session]]:
+        """Session factories covering every partition, newest data first."""
+        return [primary]
+
+    @abstractmethod
+    def partitions(self) -> list[AuditPartition]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def ensure_partitions(self, now: datetime) -> list[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def compact(self, now: datetime) -> list[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def apply_retention(self, now: datetime) -> list[str]:
+        raise NotImplementedError
+
+    def run_maintenance(self, now: datetime | None = None) -> dict[str, list[str]]:
+        now = now or datetime.now(UTC)
+        return {
+            "created": self.ensure_partitions(now),
+            "compacted": self.compact(now),
+            "expired": self.apply_retention(now),
+        }
+
+
+class PostgresAuditPartitions(AuditPartitionManager):
+    """Native ``PARTITION BY RANGE (timestamp)`` partitions of ``audit_logs``.
+
+    The first maintenance pass turns ``audit_logs`` into a partitioned table
+    (``partition_audit_table``). This manager creates
+    the current and next ``premake`` periods ahead of time. Compaction moves rows that
+    landed in ``audit_logs_default`` into their own period. Expired periods are
+    detached, then dropped or renamed to ``audit_archive_*``. Reads need nothing
+    special because PostgreSQL prunes and merges partitions itself.
+    """
+
+    def partitions(self) -> list[AuditPartition]:
+        with self.engine.connect() as connection:
+            return self._partitions(connection)
+
+    @staticmethod
+    def _partitions(connection: Connection) -> list[AuditPartition]:
+        rows = connection.execute(
+            text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'audit_logs'::regclass"
+            )
+        )
+        partitions = []
+        for name, bound in rows:
+            match = _BOUND_RE.search(bound)
+            if match is None:
+                partitions.append(AuditPartition(name))
+                continue
+            start, end = (
+                None if value in {"MINVALUE", "MAXVALUE"} else datetime.fromisoformat(value[1:-1])
+                for value in (match["start"], match["end"])
+            )
+            partitions.append(AuditPartition(name, start, end))
+        return sorted(partitions, key=lambda p: p.end or datetime.max)
+
+    @staticmethod
+    def _try_lock(connection: Connection) -> bool:
+        return bool(
+            connection.scalar(
+                text("SELECT pg_try_advisory_xact_lock(:lock_id)"),
+                {"lock_id": MAINTENANCE_LOCK_ID},
+            )
+        )
+
+    def _create_partition(
+        self,
+        connection: Connection,
+        start: datetime,
+        end: datetime,
+        existing: list[AuditPartition],
+    ) -> str:
+        name = partition_name(start, self.interval)
+        bounds = {"start": start, "end": end}
+        in_range = "timestamp >= :start AND timestamp < :end"
+        has_default = any(p.name == "audit_logs_default" for p in existing)
+        stray = has_default and connection.scalar(
+            text(f"SELECT EXISTS (SELECT 1 FROM audit_logs_default WHERE {in_range})"), bounds
+        )
+        if stray:
+            # The default partition may not hold rows of a range attached beside it.
+            connection.execute(text("CREATE TEMP TABLE _audit_moved (LIKE audit_logs)"))
+            connection.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM audit_logs_default WHERE {in_range} "
+                    "RETURNING *) INSERT INTO _audit_moved SELECT * FROM moved"
+                ),
+                bounds,
+            )
+        connection.execute(
+            text(
+                f"CREATE TABLE {name} PARTITION OF audit_logs "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d %H:%M:%S}') TO ('{end:%Y-%m-%d %H:%M:%S}')"
+            )
+        )
+        if stray:
+            connection.execute(text("INSERT INTO audit_logs SELECT * FROM _audit_moved"))
+            connection.execute(text("DROP TABLE _audit_moved"))
+        existing.append(AuditPartition(name, start, end))
+        return name
+
+    def _convert(self, connection: Connection, now: datetime) -> None:
+        if partition_audit_table(connection, now):
+            logger.info("audit_logs converted to a partitioned table")
+
+    def ensure_partitions(self, now: datetime) -> list[str]:
+        created: list[str] = []
+        with self.engine.begin() as connection:
+            if not self._try_lock(connection):
+                return created
+            self._convert(connection, now)
+            existing = self._partitions(connection)
+            start = period_start(now, self.interval)
+            for _ in range(self.premake + 1):
+                end = next_period(start, self.interval)
+                free = _free_range(start, end, existing)
+                if free is not None:
+                    created.append(self._create_partition(connection, *free, existing))
+                start = end
+        return created
+
+    def compact(self, now: datetime) -> list[str]:
+        created: list[str] = []
+        with self.engine.begin() as connection:
+            if not self._try_lock(connection):
+                return created
+            self._convert(connection, now)
+            existing = self._partitions(connection)
+            if not any(p.name == "audit_logs_default" for p in existing):
+                return created
+            periods = connection.scalars(
+                text(
+                    "SELECT DISTINCT date_trunc(:interval, timestamp) FROM audit_logs_default "
+                    "ORDER BY 1"
+                ),
+                {"interval": self.interval},
+            ).all()
+            for start in periods:
+                free = _free_range(start, next_period(start, self.interval), existing)
+                if free is not None:
+                    created.append(self._create_partition(connection, *free, existing))
+        return created
+
+    def apply_retention(self, now: datetime) -> list[str]:
+        expired: list[str] = []
+        if self.retention_cutoff(now) is None:
+            return expired
+        with self.engine.begin() as connection:
+            if not self._try_lock(connection):
+                return expired
+            for partition in self._expired(self._partitions(connection), now):
+                connection.execute(
+                    text(f"ALTER TABLE audit_logs DETACH PARTITION {partition.name}")
+                )
+                if self.retention_action == "drop":
+                    connection.execute(text(f"DROP TABLE {partition.name}"))
+                else:
+                    archived = partition.name.replace("audit_logs_", "audit_archive_", 1)
+                    connection.execute(text(f"ALTER TABLE {partition.name} RENAME TO {archived}"))
+                expired.append(partition.name)
+        return expired
+
+
+class SqlitePartitionFiles(AuditPartitionManager):
+    """Rolling per-period SQLite files for closed audit periods.
+
+    The main database's ``audit_logs`` table keeps the open period. Compaction moves
+    each closed period into ``<partition_dir>/audit_logs_p<period>.db``, which has the
+    same schema and indexes. Retention deletes whole files, or moves them to
+    ``archive_dir``. Reads go through the main table first and then the files,
+    newest period first.
+    """
+
+    def __init__(self, engine: Engine, *, partition_dir: Path, archive_dir: Path, **kwargs):
+        super().__init__(engine, **kwargs)
+        self.partition_dir = Path(partition_dir)
+        self.archive_dir = Path(archive_dir)
+        self._engines: dict[Path, Engine] = {}
+        self._lock = threading.Lock()
+
+    def _files(self) -> list[tuple[AuditPartition, Path]]:
+        if not self.partition_dir.is_dir():
+            return []
+        files = []
+        for path in self.partition_dir.glob("audit_logs_p*.db"):
+            parsed = _parse_partition_name(path.stem)
+            if parsed is not None:
+                start, interval = parsed
+                files.append((AuditPartition(path.stem, start, next_period(start, interval)), path))
+        return sorted(files, key=lambda item: item[0].start, reverse=True)
+
+    def _engine_for(self, path: Path) -> Engine:
+        with self._lock:
+            engine = self._engines.get(path)
+            if engine is None:
+                engine = create_engine(
+                    f"sqlite:///{path}", connect_args={"check_same_thread": False}
+                )
+                self._engines[path] = engine
+            return engine
+
+    def partitions(self) -> list[AuditPartition]:
+        return [AuditPartition("audit_logs")] + [partition for partition, _ in self._files()]
+
+    def read_session_factories(
+        self, primary: Callable[[], Session]
+    ) -> list[Callable[[], Session]]:
+        return [primary] + [
+            sessionmaker(bind=self._engine_for(path), autoflush=False)
+            for _, path in self._files()
+        ]
+
+    def ensure_partitions(self, now: datetime) -> list[str]:
+        # Partition files are created when compaction first rolls a period into them.
+        self._reserve_ids()
+        return []
+
+    def _reserve_ids(self) -> None:
+        """Keep the main table's id sequence ahead of every id already in a file."""
+        highest = 0
+        for _, path in self._files():
+            with self._engine_for(path).connect() as connection:
+                highest = max(highest, connection.scalar(select(func.max(AuditLog.id))) or 0)
+        if not highest:
+            return
+        with self.engine.begin() as connection:
+            bumped = connection.execute(
+                text(
+                    "UPDATE sqlite_sequence SET seq = MAX(seq, :id) WHERE name = 'audit_logs'"
+                ),
+                {"id": highest},
+            ).rowcount
+            if not bumped:
+                connection.execute(
+                    text("INSERT INTO sqlite_sequence (name, seq) VALUES ('audit_logs', :id)"),
+                    {"id": highest},
+                )
+
+    def _roll(self, start: datetime, end: datetime) -> str:
+        name = partition_name(start, self.interval)
+        path = self.partition_dir / f"{name}.db"
+        self.partition_dir.mkdir(parents=True, exist_ok=True)
+        AuditLog.__table__.create(bind=self._engine_for(path), checkfirst=True)
+
+        source = AuditLog.__table__
+        target = source.to_metadata(MetaData(), schema="audit_partition")
+        columns = [column.name for column in source.columns]
+        in_period = (source.c.timestamp >= start, source.c.timestamp < end)
+        held = target.alias("held")
+        copied = exists().where(held.c.id == source.c.id)
+        landed = exists().where(held.c.id == source.c.id, held.c.timestamp == source.c.timestamp)
+        with self.engine.connect() as connection:
+            # ATTACH must run outside a transaction; pysqlite only begins one on DML.
+            connection.exec_driver_sql("ATTACH DATABASE ? AS audit_partition", (str(path),))
+            try:
+                # Rows a previous roll already copied are skipped, so a re-run after a
+                # copy without its delete is idempotent (WAL commits are atomic per
+                # database file). Anything else that collides fails the check below.
+                connection.execute(
+                    insert(target).from_select(
+                        columns,
+                        select(*(source.c[c] for c in columns)).where(*in_period, ~copied),
+                    )
+                )
+                stranded = connection.scalar(
+                    select(func.count()).select_from(source).where(*in_period, ~landed)
+                )
+                if stranded:
+                    raise RuntimeError(
+                        f"{stranded} audit rows for {name} clash with ids already in {path}; "
+                        "left in the main table"
+                    )
+                connection.execute(delete(AuditLog).where(*in_period))
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                connection.exec_driver_sql("DETACH DATABASE audit_partition")
+        return name
+
+    def compact(self, now: datetime) -> list[str]:
+        boundary = period_start(now, self.interval)
+        rolled: list[str] = []
+        while True:
+            with self.engine.connect() as connection:
+                oldest = connection.scalar(
+                    select(func.min(AuditLog.timestamp)).where(AuditLog.timestamp < boundary)
+                )
+            if oldest is None:
+                return rolled
+            start = period_start(oldest, self.interval)
+            rolled.append(self._roll(start, next_period(start, self.interval)))
+
+    def apply_retention(self, now: datetime) -> list[str]:
+        expired: list[str] = []
+        files = self._files()
+        paths = {partition.name: path for partition, path in files}
+        for partition in self._expired([partition for partition, _ in files], now):
+            path = paths[partition.name]
+            with self._lock:
+                engine = self._engines.pop(path, None)
+            if engine is not None:
+                engine.dispose()
+            if self.retention_action == "drop":
+                for suffix in ("", "-journal", "-wal", "-shm"):
+                    Path(f"{path}{suffix}").unlink(missing_ok=True)
+            else:
+                self.archive_dir.mkdir(parents=True, exist_ok=True)
+                path.rename(self.archive_dir / path.name)
+            expired.append(partition.name)
+        return expired
+
+
+class AuditMaintenance:
+    """Runs partition maintenance on a background thread every ``interval_seconds``.
+
+    A failed run is logged and retried on the next tick; it never stops the thread.
+    """
+
+    def __init__(self, manager: AuditPartitionManager, *, interval_seconds: float):
+        if interval_seconds <= 0:
+            raise ValueError("audit maintenance interval must be positive")
+        self.manager = manager
+        self.interval_seconds = interval_seconds
+        self.runs = 0
+        self.failed_runs = 0
+        self.last_result: dict[str, list[str]] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="agent2allow-audit-maintenance", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self, now: datetime | None = None) -> dict[str, list[str]]:
+        try:
+            result = self.manager.run_maintenance(now)
+        except Exception as exc:
+            self.failed_runs += 1
+            logger.warning("audit partition maintenance failed: %s", exc)
+            return {}
+        self.runs += 1
+        self.last_result = result
+        if any(result.values()):
+            logger.info("audit partition maintenance: %s", result)
+        return result
+
+    def _run(self) -> None:
+        self.run_once()
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+
+def build_audit_partition_manager(
+    engine: Engine,
+    *,
+    database_url: str,
+    interval: str,
+    premake: int,
+    partition_dir: str,
+    retention_days: int,
+    retention_action: str,
+    archive_dir: str,
+) -> AuditPartitionManager | None:
+    normalized = interval.lower().strip()
+    if normalized in {"", "none"}:
+        return None
+    options = {
+        "interval": normalized,
+        "premake": premake,
+        "retention_days": retention_days,
+        "retention_action": retention_action.lower().strip(),
+    }
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        return PostgresAuditPartitions(engine, **options)
+    if url.get_backend_name() == "sqlite" and url.database and url.database != ":memory:":
+        base = Path(partition_dir or Path(url.database).parent / "audit-partitions")
+        return SqlitePartitionFiles(
+            engine,
+            partition_dir=base,
+            archive_dir=Path(archive_dir) if archive_dir else base / "archive",
+            **options,
+        )
+    return None
+
+
+def build_audit_maintenance(
+    manager: AuditPartitionManager | None, *, interval_seconds: float
+) -> AuditMaintenance | None:
+    if manager is None or interval_seconds <= 0:
+        return None
+    return AuditMaintenance(manager, interval_seconds=interval_seconds)
@@ -0,0 +1,95 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from sqlalchemy import Row, Select, and_, or_, select
+
+from .models import AuditLog
+
+AUDIT_PAGE_DEFAULT_LIMIT = 100
+AUDIT_PAGE_MAX_LIMIT = 1000
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class AuditLogFilter:
+    agent_id: str | None = None
+    status: str | None = None
+    repo: str | None = None
+    action: str | None = None
+    risk_level: str | None = None
+    approval_id: int | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+
+
+def _as_stored_utc(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC, so compare against naive UTC bounds.
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(row: AuditLog | Row) -> str:
+    raw = f"{_as_stored_utc(row.timestamp).isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        timestamp, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise InvalidCursorError("invalid audit cursor") from exc
+
+
+def audit_log_query(
+    filters: AuditLogFilter | None = None,
+    *,
+    cursor: str | None = None,
+    descending: bool = True,
+) -> Select:
+    """Build a keyset-ordered ``audit_logs`` query on ``(timestamp, id)``.
+
+    Rows come back newest first by default; ``cursor`` (from :func:`encode_cursor`)
+    resumes strictly after the row it was taken from, in the same direction.
+    """
+    filters = filters or AuditLogFilter()
+    conditions = []
+    for column in ("agent_id", "status", "repo", "action", "risk_level", "approval_id"):
+        value = getattr(filters, column)
+        if value is not None:
+            conditions.append(getattr(AuditLog, column) == value)
+    if filters.since is not None:
+        conditions.append(AuditLog.timestamp >= _as_stored_utc(filters.since))
+    if filters.until is not None:
+        conditions.append(AuditLog.timestamp < _as_stored_utc(filters.until))
+    if cursor is not None:
+        timestamp, row_id = decode_cursor(cursor)
+        if descending:
+            conditions.append(
+                or_(
+                    AuditLog.timestamp < timestamp,
+                    and_(AuditLog.timestamp == timestamp, AuditLog.id < row_id),
+                )
+            )
+        else:
+            conditions.append(
+                or_(
+                    AuditLog.timestamp > timestamp,
+                    and_(AuditLog.timestamp == timestamp, AuditLog.id > row_id),
+                )
+            )
+
+    order = (
+        (AuditLog.timestamp.desc(), AuditLog.id.desc())
+        if descending
+        else (AuditLog.timestamp.asc(), AuditLog.id.asc())
+    )
+    return select(AuditLog).where(*conditions).order_by(*order)
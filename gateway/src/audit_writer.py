@@ -0,0 +1,285 @@
+import json
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .audit_sink import AuditSinkContract, NoopAuditSink, safe_emit
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+AUDIT_WRITE_MODES = {"sync", "group_commit", "async"}
+MAX_RETRY_BACKOFF_SECONDS = 5.0
+
+
+class AuditWriteError(RuntimeError):
+    pass
+
+
+def insert_audit_rows(db: Session, rows: list[dict[str, Any]]) -> None:
+    """Insert audit rows in bulk: ``COPY`` on psycopg, a multi-row INSERT elsewhere.
+
+    The non-COPY path is an executemany, which SQLAlchemy sends as batched
+    multi-row ``INSERT ... VALUES`` on PostgreSQL drivers.
+    """
+    statement = insert(AuditLog)
+    connection = db.connection(bind_arguments={"clause": statement})
+    dialect = connection.dialect
+    if dialect.name != "postgresql" or dialect.driver != "psycopg":
+        connection.execute(statement, rows)
+        return
+    columns = [column.name for column in AuditLog.__table__.columns if column.name != "id"]
+    copy_sql = f"COPY {AuditLog.__tablename__} ({', '.join(columns)}) FROM STDIN"
+    with connection.connection.driver_connection.cursor() as cursor:
+        with cursor.copy(copy_sql) as copy:
+            for row in rows:
+                copy.write_row([row[name] for name in columns])
+
+
+class _Batch:
+    def __init__(self, rows: list[dict[str, Any]], events: list[Mapping[str, object]]):
+        self.rows = rows
+        self.events = events
+        self.done = threading.Event()
+        self.error: Exception | None = None
+
+
+_STOP = object()
+
+
+class AuditWriter:
+    """Write-behind audit pipeline: a bounded queue drained by one worker thread.
+
+    ``group_commit`` callers block until the worker has committed the batch holding
+    their rows, so many requests share one commit. ``async`` callers return as soon
+    as their rows are queued and the worker lingers up to ``flush_interval_ms`` to
+    build larger batches. When the queue stays full for ``enqueue_timeout_ms`` the
+    caller writes its rows inline instead.
+
+    A failed insert is retried ``retry_attempts`` times with exponential backoff
+    from ``retry_backoff_ms``. If the batch still fails, its rows are inserted one
+    at a time. A row is dropped only when its own insert fails. It is then logged
+    in full and counted in ``failed_rows``, and its event still reaches the sink.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        mode: str,
+        audit_sink: AuditSinkContract | None = None,
+        max_queue_size: int = 10_000,
+        batch_size: int = 500,
+        flush_interval_ms: int = 50,
+        enqueue_timeout_ms: int = 1_000,
+        retry_attempts: int = 5,
+        retry_backoff_ms: int = 100,
+    ):
+        if mode not in AUDIT_WRITE_MODES - {"sync"}:
+            raise ValueError(f"unsupported write-behind audit mode: {mode}")
+        if batch_size <= 0:
+            raise ValueError("audit batch size must be positive")
+        self.session_factory = session_factory
+        self.mode = mode
+        self.audit_sink = audit_sink or NoopAuditSink()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.enqueue_timeout = enqueue_timeout_ms / 1000.0
+        self.retry_attempts = max(1, retry_attempts)
+        self.retry_backoff = retry_backoff_ms / 1000.0
+        self.batches_written = 0
+        self.rows_written = 0
+        self.inline_writes = 0
+        self.failed_rows = 0
+        self.retries = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="agent2allow-audit-writer", daemon=True
+        )
+        self._thread.start()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush everything queued so far and stop the worker."""
+        if self._thread is None:
+            self._drain_without_worker()
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("audit writer did not flush within %.1fs", timeout)
+        self._thread = None
+
+    def submit(self, rows: list[dict[str, Any]], events: list[Mapping[str, object]]) -> None:
+        if not rows:
+            return
+        batch = _Batch(rows, events)
+        if self._thread is None:
+            self._write([batch])
+        else:
+            try:
+                self._queue.put(batch, timeout=self.enqueue_timeout)
+            except queue.Full:
+                with self._stats_lock:
+                    self.inline_writes += 1
+                self._write([batch])
+        if self.mode == "group_commit":
+            batch.done.wait()
+        if batch.error is not None and self.mode == "group_commit":
+            raise AuditWriteError(f"audit write failed: {batch.error}") from batch.error
+
+    def stats(self) -> dict[str, int | str]:
+        return {
+            "mode": self.mode,
+            "queue_depth": self._queue.qsize(),
+            "batches_written": self.batches_written,
+            "rows_written": self.rows_written,
+            "inline_writes": self.inline_writes,
+            "failed_rows": self.failed_rows,
+            "retries": self.retries,
+        }
+
+    def _run(self) -> None:
+        linger = 0.0 if self.mode == "group_commit" else self.flush_interval
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            pending = [item]
+            row_count = len(item.rows)
+            deadline = time.monotonic() + linger
+            stopping = False
+            while row_count < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                pending.append(item)
+                row_count += len(item.rows)
+            self._write(pending)
+            if stopping:
+                return
+
+    def _drain_without_worker(self) -> None:
+        pending: list[_Batch] = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                pending.append(item)
+        if pending:
+            self._write(pending)
+
+    def _insert(self, rows: list[dict[str, Any]]) -> None:
+        with self.session_factory() as db:
+            insert_audit_rows(db, rows)
+            db.commit()
+
+    def _insert_with_retry(self, rows: list[dict[str, Any]]) -> Exception | None:
+        """Insert ``rows`` in one transaction, retrying transient failures with backoff."""
+        for attempt in range(1, self.retry_attempts + 1):
+            try:
+                self._insert(rows)
+                return None
+            except Exception as exc:
+                if attempt == self.retry_attempts:
+                    return exc
+                with self._stats_lock:
+                    self.retries += 1
+                delay = min(self.retry_backoff * 2 ** (attempt - 1), MAX_RETRY_BACKOFF_SECONDS)
+                logger.warning(
+                    "audit insert of %d rows failed (attempt %d), retrying in %.2fs: %s",
+                    len(rows),
+                    attempt,
+                    delay,
+                    exc,
+                )
+                time.sleep(delay)
+        return None
+
+    def _write(self, batches: list[_Batch]) -> None:
+        rows = [row for batch in batches for row in batch.rows]
+        error = self._insert_with_retry(rows)
+        if error is None:
+            with self._stats_lock:
+                self.batches_written += 1
+                self.rows_written += len(rows)
+        else:
+            logger.warning(
+                "batched audit insert of %d rows failed, retrying row by row: %s", len(rows), error
+            )
+            for batch in batches:
+                self._write_rows(batch)
+        for batch in batches:
+            batch.done.set()
+            # Events go to the sink even for dropped rows, so the sink keeps a copy.
+            for event in batch.events:
+                safe_emit(self.audit_sink, event)
+
+    def _write_rows(self, batch: _Batch) -> None:
+        """Insert a batch row by row, so only rows that fail on their own are dropped."""
+        for row in batch.rows:
+            try:
+                self._insert([row])
+            except Exception as exc:
+                batch.error = exc
+                with self._stats_lock:
+                    self.failed_rows += 1
+                logger.error(
+                    "dropping audit row after failed insert: %s; row=%s",
+                    exc,
+                    json.dumps(row, default=str, sort_keys=True),
+                )
+            else:
+                with self._stats_lock:
+                    self.rows_written += 1
+
+
+def build_audit_writer(
+    session_factory: Callable[[], Session],
+    *,
+    mode: str,
+    audit_sink: AuditSinkContract,
+    max_queue_size: int,
+    batch_size: int,
+    flush_interval_ms: int,
+    enqueue_timeout_ms: int,
+    retry_attempts: int = 5,
+    retry_backoff_ms: int = 100,
+) -> AuditWriter | None:
+    normalized = mode.lower().strip().replace("-", "_")
+    if normalized not in AUDIT_WRITE_MODES:
+        raise ValueError(f"unsupported audit write mode: {mode}")
+    if normalized == "sync":
+        return None
+    return AuditWriter(
+        session_factory,
+        mode=normalized,
+        audit_sink=audit_sink,
+        max_queue_size=max_queue_size,
+        batch_size=batch_size,
+        flush_interval_ms=flush_interval_ms,
+        enqueue_timeout_ms=enqueue_timeout_ms,
+        retry_attempts=retry_attempts,
+        retry_backoff_ms=retry_backoff_ms,
+    )
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class RequestCoalescer:
+    """Singleflight: concurrent calls with the same key share one execution.
+
+    The first caller for a key (the leader) runs the function. Callers that arrive
+    while it is in flight wait and receive the same result or exception. Nothing
+    is cached: once the leader finishes, the next call for the key runs again.
+    Thread callers use ``do``, event-loop callers use ``do_async``; each has its
+    own in-flight table, and they share the counters.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+        self._async_flights: dict[Hashable, asyncio.Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """Return ``(result, coalesced)``; ``coalesced`` is True for followers."""
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+        try:
+            flight.result = fn()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Event-loop variant of ``do``; must always be called from the same loop."""
+        flight = self._async_flights.get(key)
+        with self._lock:
+            self.calls += 1
+            if flight is None:
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        if flight is not None:
+            # shield: a cancelled follower must not cancel the leader's call.
+            return await asyncio.shield(flight), True
+        # The call runs in its own task, so cancelling the leader leaves it running
+        # for the followers instead of failing them all with CancelledError.
+        flight = self._async_flights[key] = asyncio.ensure_future(fn())
+        flight.add_done_callback(lambda done: self._land(key, done))
+        return await asyncio.shield(flight), False
+
+    def _land(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._async_flights.get(key) is flight:
+            del self._async_flights[key]
+        if not flight.cancelled():
+            # Mark retrieved so a flight nobody awaited does not log "never retrieved".
+            flight.exception()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "coalescing_ratio": self.coalesced / self.calls if self.calls else 0.0,
+                "in_flight": len(self._flights) + len(self._async_flights),
+            }
+
+
+def build_request_coalescer(*, enabled: bool) -> RequestCoalescer | None:
+    return RequestCoalescer() if enabled else None
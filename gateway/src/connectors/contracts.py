@@ -13,3 +13,15 @@ class GithubConnectorContract(Protocol):
 
     def create_comment(self, repo: str, issue_number: int, body: str) -> dict[str, Any]:
         ...
+
+
+@runtime_checkable
+class AsyncGithubConnectorContract(Protocol):
+    async def list_issues(self, repo: str, state: str = "open") -> dict[str, Any]:
+        ...
+
+    async def set_labels(self, repo: str, issue_number: int, labels: list[str]) -> dict[str, Any]:
+        ...
+
+    async def create_comment(self, repo: str, issue_number: int, body: str) -> dict[str, Any]:
+        ...
@@ -1,11 +1,34 @@
+import asyncio
+import base64
+import binascii
+import json
+import re
+import threading
 import time
+from collections.abc import AsyncIterator, Iterator
 from typing import Any
+from urllib.parse import parse_qsl, urlsplit
 
 import httpx
 
+from .rate_limit import (
+    READ,
+    WRITE,
+    RateLimitScheduler,
+    is_rate_limited,
+    jittered_backoff,
+    retry_after_seconds,
+    token_key,
+)
+from .resilience import CircuitBreaker, RetryBudget
+from .response_cache import CachedResponse, ResponseCache
 
-class GithubClient:
+_LINK_RE = re.compile(r'<([^>]+)>\s*;\s*rel="([^"]+)"')
+
+
+class _GithubClientBase:
     transient_status_codes = {429, 500, 502, 503, 504}
+    retryable_errors = (httpx.ReadTimeout, httpx.ConnectTimeout, httpx.ConnectError)
 
     def __init__(
         self,
@@ -13,11 +36,47 @@ class GithubClient:
         token: str | None = None,
         retry_attempts: int = 3,
         retry_backoff_ms: int = 200,
+        *,
+        retry_max_backoff_ms: int = 10000,
+        response_cache: ResponseCache | None = None,
+        rate_limiter: RateLimitScheduler | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        retry_budget: RetryBudget | None = None,
     ):
         self.base_url = base_url.rstrip("/")
         self.token = token
         self.retry_attempts = retry_attempts
         self.retry_backoff_ms = retry_backoff_ms
+        self.retry_max_backoff_ms = retry_max_backoff_ms
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.retry_budget = retry_budget
+        self._token_key = token_key(token)
+        self._host = urlsplit(self.base_url).netloc
+        self.retries = 0
+        self.timeouts = 0
+        self._counts_lock = threading.Lock()
+
+    @staticmethod
+    def _pool_options(
+        *,
+        timeout_seconds: float,
+        connect_timeout_seconds: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry_seconds: float,
+        http2: bool,
+    ) -> dict[str, Any]:
+        return {
+            "timeout": httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds),
+            "limits": httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry_seconds,
+            ),
+            "http2": http2,
+        }
 
     def _headers(self) -> dict[str, str]:
         headers = {"Accept": "application/json"}
@@ -25,61 +84,485 @@ class GithubClient:
             headers["Authorization"] = f"Bearer {self.token}"
         return headers
 
-    def _request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+    def _backoff_seconds(self, attempt: int) -> float:
+        return jittered_backoff(attempt, self.retry_backoff_ms, self.retry_max_backoff_ms)
+
+    def _start_request(self) -> None:
+        if self.retry_budget is not None:
+            self.retry_budget.record_request()
+
+    def _before_attempt(self) -> None:
+        """Fail fast with ``CircuitOpenError`` while the host's breaker is open."""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_call(self._host)
+
+    def _count_retry(self) -> None:
+        with self._counts_lock:
+            self.retries += 1
+
+    def _count_timeout(self) -> None:
+        with self._counts_lock:
+            self.timeouts += 1
+
+    def request_stats(self) -> dict[str, int]:
+        with self._counts_lock:
+            return {"retries": self.retries, "timeouts": self.timeouts}
+
+    def _record_attempt(self, response: httpx.Response | None) -> None:
+        """Feed the breaker: transport errors and 5xx count as failures."""
+        if self.circuit_breaker is None:
+            return
+        if response is None or response.status_code >= 500:
+            self.circuit_breaker.record_failure(self._host)
+        else:
+            self.circuit_breaker.record_success(self._host)
+
+    def _may_retry(self, attempt: int) -> bool:
+        if attempt >= self.retry_attempts:
+            return False
+        return self.retry_budget is None or self.retry_budget.try_retry()
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> float | None:
+        """Seconds to wait before retrying ``response``, or None to stop retrying."""
+        if not (response.status_code in self.transient_status_codes or is_rate_limited(response)):
+            return None
+        wait = retry_after_seconds(response)
+        if wait is None:
+            delay = self._backoff_seconds(attempt)
+        elif self.rate_limiter is not None:
+            # observe() blocked the token; the next acquire waits (or gives up) for us.
+            delay = 0.0
+        elif wait > self.retry_max_backoff_ms / 1000.0:
+            return None
+        else:
+            delay = wait
+        return delay if self._may_retry(attempt) else None
+
+    @staticmethod
+    def _priority(method: str) -> str:
+        return READ if method == "GET" else WRITE
+
+    def _cache_lookup(
+        self, method: str, repo: str, path: str, params: dict[str, Any]
+    ) -> tuple[tuple | None, CachedResponse | None, bool, int]:
+        """Return ``(key, entry, fresh, generation)``; ``key`` is None when not cached."""
+        if self.response_cache is None or not self.response_cache.caches(method):
+            return None, None, False, 0
+        key = (method, repo, path, tuple(sorted(params.items())))
+        return (key, *self.response_cache.lookup(key))
+
+    @staticmethod
+    def _conditional_headers(entry: CachedResponse | None) -> dict[str, str]:
+        if entry is None or not entry.etag:
+            return {}
+        return {"If-None-Match": entry.etag}
+
+    def _cache_response(
+        self,
+        key: tuple,
+        entry: CachedResponse | None,
+        generation: int,
+        response: httpx.Response,
+    ) -> tuple[Any, str | None]:
+        if response.status_code == httpx.codes.NOT_MODIFIED and entry is not None:
+            self.response_cache.refresh(key, generation)
+            return json.loads(entry.body), entry.link
+        link = response.headers.get("Link")
+        self.response_cache.store(
+            key, response.content, response.headers.get("ETag"), generation, link
+        )
+        return response.json(), link
+
+    def _invalidate(self, repo: str) -> None:
+        if self.response_cache is not None:
+            self.response_cache.invalidate(repo)
+
+    @staticmethod
+    def _page_cursor(link_header: str | None) -> str | None:
+        """Opaque resume cursor for the ``rel="next"`` page, or None on the last page.
+
+        Only the query is kept; the path is always rebuilt from the repo, so a
+        cursor cannot point the connector at another repository or host.
+        """
+        for url, rel in _LINK_RE.findall(link_header or ""):
+            if rel == "next":
+                return base64.urlsafe_b64encode(urlsplit(url).query.encode()).decode()
+        return None
+
+    @staticmethod
+    def _page_params(state: str, per_page: int | None, cursor: str | None) -> dict[str, Any]:
+        if cursor:
+            try:
+                query = base64.urlsafe_b64decode(cursor.encode()).decode()
+                params = dict(parse_qsl(query, strict_parsing=True))
+            except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+                raise ValueError("invalid page cursor") from exc
+            return params
+        params: dict[str, Any] = {"state": state}
+        if per_page:
+            params["per_page"] = min(int(per_page), 100)
+        return params
+
+    @staticmethod
+    def _issue_listing(issues: list[Any], next_cursor: str | None) -> dict[str, Any]:
+        listing: dict[str, Any] = {"issues": issues}
+        if next_cursor is not None:
+            listing["next_cursor"] = next_cursor
+        return listing
+
+    @staticmethod
+    def _issues_path(repo: str, suffix: str = "") -> str:
+        owner, name = repo.split("/", 1)
+        return f"/repos/{owner}/{name}/issues{suffix}"
+
+
+class GithubClient(_GithubClientBase):
+    def __init__(
+        self,
+        base_url: str,
+        token: str | None = None,
+        retry_attempts: int = 3,
+        retry_backoff_ms: int = 200,
+        *,
+        timeout_seconds: float = 10.0,
+        connect_timeout_seconds: float = 10.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry_seconds: float = 30.0,
+        http2: bool = False,
+        retry_max_backoff_ms: int = 10000,
+        response_cache: ResponseCache | None = None,
+        rate_limiter: RateLimitScheduler | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        retry_budget: RetryBudget | None = None,
+    ):
+        super().__init__(
+            base_url,
+            token,
+            retry_attempts,
+            retry_backoff_ms,
+            retry_max_backoff_ms=retry_max_backoff_ms,
+            response_cache=response_cache,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            retry_budget=retry_budget,
+        )
+        try:
+            self._client = httpx.Client(
+                **self._pool_options(
+                    timeout_seconds=timeout_seconds,
+                    connect_timeout_seconds=connect_timeout_seconds,
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry_seconds=keepalive_expiry_seconds,
+                    http2=http2,
+                )
+            )
+        except ImportError as exc:
+            raise RuntimeError("h2 is required for github_http2=true (pip install h2)") from exc
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _request(
+        self, method: str, path: str, extra_headers: dict[str, str] | None = None, **kwargs: Any
+    ) -> httpx.Response:
         last_error: Exception | None = None
+        self._start_request()
         for attempt in range(1, self.retry_attempts + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(self._token_key, self._priority(method))
+            self._before_attempt()
             try:
-                with httpx.Client(timeout=10.0) as client:
-                    response = client.request(
-                        method,
-                        f"{self.base_url}{path}",
-                        headers=self._headers(),
-                        **kwargs,
-                    )
-                if (
-                    response.status_code in self.transient_status_codes
-                    and attempt < self.retry_attempts
-                ):
-                    time.sleep((self.retry_backoff_ms / 1000.0) * attempt)
-                    continue
-                response.raise_for_status()
-                return response
-            except (httpx.ReadTimeout, httpx.ConnectTimeout, httpx.ConnectError) as exc:
+                response = self._client.request(
+                    method,
+                    f"{self.base_url}{path}",
+                    headers={**self._headers(), **(extra_headers or {})},
+                    **kwargs,
+                )
+            except httpx.TransportError as exc:
+                self._record_attempt(None)
+                if isinstance(exc, httpx.TimeoutException):
+                    self._count_timeout()
+                if not isinstance(exc, self.retryable_errors):
+                    raise
                 last_error = exc
-                if attempt < self.retry_attempts:
-                    time.sleep((self.retry_backoff_ms / 1000.0) * attempt)
+                if self._may_retry(attempt):
+                    self._count_retry()
+                    time.sleep(self._backoff_seconds(attempt))
                     continue
                 raise
-            except httpx.HTTPStatusError as exc:
-                last_error = exc
-                if (
-                    exc.response.status_code in self.transient_status_codes
-                    and attempt < self.retry_attempts
-                ):
-                    time.sleep((self.retry_backoff_ms / 1000.0) * attempt)
-                    continue
+            except BaseException:
+                # Decoding errors, cancellation: the outcome is unknown, so count it as
+                # a failure rather than leave a half-open probe slot taken.
+                self._record_attempt(None)
                 raise
+            self._record_attempt(response)
+            if self.rate_limiter is not None:
+                self.rate_limiter.observe(self._token_key, response)
+            delay = self._retry_delay(response, attempt)
+            if delay is not None:
+                self._count_retry()
+                time.sleep(delay)
+                continue
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                return response
+            response.raise_for_status()
+            return response
         raise RuntimeError(f"GitHub request failed after retries: {last_error}")
 
-    def list_issues(self, repo: str, state: str = "open") -> dict[str, Any]:
-        owner, name = repo.split("/", 1)
-        response = self._request("GET", f"/repos/{owner}/{name}/issues", params={"state": state})
-        return {"issues": response.json()}
-
-    def set_labels(self, repo: str, issue_number: int, labels: list[str]) -> dict[str, Any]:
-        owner, name = repo.split("/", 1)
+    def _cached_get(
+        self, method: str, repo: str, path: str, params: dict[str, Any]
+    ) -> tuple[Any, str | None]:
+        """GET through the response cache; return the JSON body and the ``Link`` header."""
+        key, entry, fresh, generation = self._cache_lookup(method, repo, path, params)
+        if key is None:
+            response = self._request("GET", path, params=params)
+            return response.json(), response.headers.get("Link")
+        if fresh:
+            return json.loads(entry.body), entry.link
         response = self._request(
-            "POST",
-            f"/repos/{owner}/{name}/issues/{issue_number}/labels",
-            json={"labels": labels},
+            "GET", path, extra_headers=self._conditional_headers(entry), params=params
         )
+        return self._cache_response(key, entry, generation, response)
+
+    def iter_issue_pages(
+        self,
+        repo: str,
+        state: str = "open",
+        *,
+        per_page: int | None = 100,
+        max_pages: int | None = None,
+        cursor: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield ``{"issues", "next_cursor"}`` per page, following ``Link: rel="next"``.
+
+        Pages are fetched one at a time as the caller iterates. ``cursor`` resumes
+        from a ``next_cursor`` returned earlier.
+        """
+        path = self._issues_path(repo)
+        params = self._page_params(state, per_page, cursor)
+        pages = 0
+        while True:
+            issues, link = self._cached_get("list_issues", repo, path, params)
+            next_cursor = self._page_cursor(link)
+            yield {"issues": issues, "next_cursor": next_cursor}
+            pages += 1
+            if next_cursor is None or (max_pages is not None and pages >= max_pages):
+                return
+            params = self._page_params(state, per_page, next_cursor)
+
+    def list_issues(
+        self,
+        repo: str,
+        state: str = "open",
+        per_page: int | None = None,
+        max_pages: int | None = 1,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """Return up to ``max_pages`` pages (None for all) as one list.
+
+        ``next_cursor`` is included when more pages remain.
+        """
+        issues: list[Any] = []
+        next_cursor = None
+        for page in self.iter_issue_pages(
+            repo, state, per_page=per_page, max_pages=max_pages, cursor=cursor
+        ):
+            issues.extend(page["issues"])
+            next_cursor = page["next_cursor"]
+        return self._issue_listing(issues, next_cursor)
+
+    def set_labels(self, repo: str, issue_number: int, labels: list[str]) -> dict[str, Any]:
+        try:
+            response = self._request(
+                "POST",
+                self._issues_path(repo, f"/{issue_number}/labels"),
+                json={"labels": labels},
+            )
+        finally:
+            self._invalidate(repo)
         return {"labels": response.json()}
 
     def create_comment(self, repo: str, issue_number: int, body: str) -> dict[str, Any]:
-        owner, name = repo.split("/", 1)
-        response = self._request(
-            "POST",
-            f"/repos/{owner}/{name}/issues/{issue_number}/comments",
-            json={"body": body},
+        try:
+            response = self._request(
+                "POST",
+                self._issues_path(repo, f"/{issue_number}/comments"),
+                json={"body": body},
+            )
+        finally:
+            self._invalidate(repo)
+        return {"comment": response.json()}
+
+
+class AsyncGithubClient(_GithubClientBase):
+    """``httpx.AsyncClient`` variant of :class:`GithubClient` for the async execution path."""
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str | None = None,
+        retry_attempts: int = 3,
+        retry_backoff_ms: int = 200,
+        *,
+        timeout_seconds: float = 10.0,
+        connect_timeout_seconds: float = 10.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry_seconds: float = 30.0,
+        http2: bool = False,
+        retry_max_backoff_ms: int = 10000,
+        response_cache: ResponseCache | None = None,
+        rate_limiter: RateLimitScheduler | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        retry_budget: RetryBudget | None = None,
+    ):
+        super().__init__(
+            base_url,
+            token,
+            retry_attempts,
+            retry_backoff_ms,
+            retry_max_backoff_ms=retry_max_backoff_ms,
+            response_cache=response_cache,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            retry_budget=retry_budget,
         )
+        try:
+            self._client = httpx.AsyncClient(
+                **self._pool_options(
+                    timeout_seconds=timeout_seconds,
+                    connect_timeout_seconds=connect_timeout_seconds,
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry_seconds=keepalive_expiry_seconds,
+                    http2=http2,
+                )
+            )
+        except ImportError as exc:
+            raise RuntimeError("h2 is required for github_http2=true (pip install h2)") from exc
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _request(
+        self, method: str, path: str, extra_headers: dict[str, str] | None = None, **kwargs: Any
+    ) -> httpx.Response:
+        last_error: Exception | None = None
+        self._start_request()
+        for attempt in range(1, self.retry_attempts + 1):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(self._token_key, self._priority(method))
+            self._before_attempt()
+            try:
+                response = await self._client.request(
+                    method,
+                    f"{self.base_url}{path}",
+                    headers={**self._headers(), **(extra_headers or {})},
+                    **kwargs,
+                )
+            except httpx.TransportError as exc:
+                self._record_attempt(None)
+                if isinstance(exc, httpx.TimeoutException):
+                    self._count_timeout()
+                if not isinstance(exc, self.retryable_errors):
+                    raise
+                last_error = exc
+                if self._may_retry(attempt):
+                    self._count_retry()
+                    await asyncio.sleep(self._backoff_seconds(attempt))
+                    continue
+                raise
+            except BaseException:
+                # Decoding errors, cancellation: the outcome is unknown, so count it as
+                # a failure rather than leave a half-open probe slot taken.
+                self._record_attempt(None)
+                raise
+            self._record_attempt(response)
+            if self.rate_limiter is not None:
+                self.rate_limiter.observe(self._token_key, response)
+            delay = self._retry_delay(response, attempt)
+            if delay is not None:
+                self._count_retry()
+                await asyncio.sleep(delay)
+                continue
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                return response
+            response.raise_for_status()
+            return response
+        raise RuntimeError(f"GitHub request failed after retries: {last_error}")
+
+    async def _cached_get(
+        self, method: str, repo: str, path: str, params: dict[str, Any]
+    ) -> tuple[Any, str | None]:
+        key, entry, fresh, generation = self._cache_lookup(method, repo, path, params)
+        if key is None:
+            response = await self._request("GET", path, params=params)
+            return response.json(), response.headers.get("Link")
+        if fresh:
+            return json.loads(entry.body), entry.link
+        response = await self._request(
+            "GET", path, extra_headers=self._conditional_headers(entry), params=params
+        )
+        return self._cache_response(key, entry, generation, response)
+
+    async def iter_issue_pages(
+        self,
+        repo: str,
+        state: str = "open",
+        *,
+        per_page: int | None = 100,
+        max_pages: int | None = None,
+        cursor: str | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        path = self._issues_path(repo)
+        params = self._page_params(state, per_page, cursor)
+        pages = 0
+        while True:
+            issues, link = await self._cached_get("list_issues", repo, path, params)
+            next_cursor = self._page_cursor(link)
+            yield {"issues": issues, "next_cursor": next_cursor}
+            pages += 1
+            if next_cursor is None or (max_pages is not None and pages >= max_pages):
+                return
+            params = self._page_params(state, per_page, next_cursor)
+
+    async def list_issues(
+        self,
+        repo: str,
+        state: str = "open",
+        per_page: int | None = None,
+        max_pages: int | None = 1,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        issues: list[Any] = []
+        next_cursor = None
+        async for page in self.iter_issue_pages(
+            repo, state, per_page=per_page, max_pages=max_pages, cursor=cursor
+        ):
+            issues.extend(page["issues"])
+            next_cursor = page["next_cursor"]
+        return self._issue_listing(issues, next_cursor)
+
+    async def set_labels(self, repo: str, issue_number: int, labels: list[str]) -> dict[str, Any]:
+        try:
+            response = await self._request(
+                "POST",
+                self._issues_path(repo, f"/{issue_number}/labels"),
+                json={"labels": labels},
+            )
+        finally:
+            self._invalidate(repo)
+        return {"labels": response.json()}
+
+    async def create_comment(self, repo: str, issue_number: int, body: str) -> dict[str, Any]:
+        try:
+            response = await self._request(
+                "POST",
+                self._issues_path(repo, f"/{issue_number}/comments"),
+                json={"body": body},
+            )
+        finally:
+            self._invalidate(repo)
         return {"comment": response.json()}
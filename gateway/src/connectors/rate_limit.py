@@ -0,0 +1,245 @@
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from hashlib import sha256
+
+import httpx
+
+READ = "read"
+WRITE = "write"
+
+
+class RateLimitExceededError(RuntimeError):
+    """The GitHub budget for a token will not come back within ``max_wait_seconds``."""
+
+
+def token_key(token: str | None) -> str:
+    """Identify a token in scheduler state without keeping the secret itself."""
+    if not token:
+        return "anonymous"
+    return sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+def retry_after_seconds(response: httpx.Response, now: float | None = None) -> float | None:
+    """Seconds GitHub asked us to wait, from ``Retry-After`` or an exhausted budget."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(retry_after).timestamp()
+            except (TypeError, ValueError):
+                return None
+            return max(0.0, when - (now or time.time()))
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        reset = response.headers.get("X-RateLimit-Reset")
+        if reset and reset.isdigit():
+            return max(0.0, int(reset) - (now or time.time()))
+    return None
+
+
+def is_rate_limited(response: httpx.Response) -> bool:
+    """429, or GitHub's 403 flavour of a primary or secondary rate limit."""
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        "Retry-After" in response.headers or response.headers.get("X-RateLimit-Remaining") == "0"
+    )
+
+
+@dataclass
+class _Budget:
+    tokens: float
+    refilled_at: float
+    remaining: int | None = None
+    reset_at: float = 0.0
+    blocked_until: float = 0.0
+    waiting_writes: int = 0
+    stats: dict[str, int] = field(
+        default_factory=lambda: {"acquired": 0, "delayed": 0, "rate_limited": 0}
+    )
+
+
+class RateLimitScheduler:
+    """Shared per-token scheduler for GitHub API calls.
+
+    Each token gets a local token bucket (``requests_per_second``, ``burst``) that
+    spreads bursts out before GitHub's secondary limits fire. Each token also
+    mirrors GitHub's ``X-RateLimit-Remaining``/``X-RateLimit-Reset``. Calls are
+    counted down optimistically as they start, so concurrent callers do not all
+    spend the last unit. Once the remaining budget falls to ``write_reserve``,
+    reads wait for the reset and writes keep going. Reads also yield the bucket
+    to any write that is waiting. A ``Retry-After`` or an exhausted budget blocks
+    the token until the given time. A wait longer than ``max_wait_seconds``
+    raises :class:`RateLimitExceededError` instead of parking the request.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_second: float = 0.0,
+        burst: int = 10,
+        write_reserve: int = 50,
+        max_wait_seconds: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.requests_per_second = requests_per_second
+        self.burst = max(1, burst)
+        self.write_reserve = write_reserve
+        self.max_wait_seconds = max_wait_seconds
+        self.clock = clock
+        self._budgets: dict[str, _Budget] = {}
+        self._lock = threading.Lock()
+
+    def _budget(self, key: str, now: float) -> _Budget:
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = self._budgets[key] = _Budget(tokens=float(self.burst), refilled_at=now)
+        return budget
+
+    def _refill(self, budget: _Budget, now: float) -> None:
+        if self.requests_per_second > 0:
+            elapsed = now - budget.refilled_at
+            budget.tokens = min(self.burst, budget.tokens + elapsed * self.requests_per_second)
+        budget.refilled_at = now
+        if budget.remaining is not None and budget.reset_at and now >= budget.reset_at:
+            budget.remaining = None
+
+    def _delay(self, budget: _Budget, priority: str, now: float) -> float:
+        if budget.blocked_until > now:
+            return budget.blocked_until - now
+        if budget.remaining is not None:
+            floor = 0 if priority == WRITE else self.write_reserve
+            if budget.remaining <= floor:
+                return max(budget.reset_at - now, 0.001)
+        if self.requests_per_second <= 0:
+            return 0.0
+        step = 1.0 / self.requests_per_second
+        if priority == READ and budget.waiting_writes:
+            return step
+        if budget.tokens < 1 - 1e-9:
+            return (1 - budget.tokens) * step
+        return 0.0
+
+    def try_acquire(self, key: str, priority: str = READ) -> float:
+        """Take a slot and return 0, or return how long to wait before trying again."""
+        now = self.clock()
+        with self._lock:
+            budget = self._budget(key, now)
+            self._refill(budget, now)
+            delay = self._delay(budget, priority, now)
+            if delay > 0:
+                return delay
+            if self.requests_per_second > 0:
+                budget.tokens -= 1
+            if budget.remaining is not None:
+                budget.remaining -= 1
+            budget.stats["acquired"] += 1
+            return 0.0
+
+    def _check_wait(self, waited: float, delay: float) -> None:
+        if waited + delay > self.max_wait_seconds:
+            raise RateLimitExceededError(
+                f"GitHub rate limit would need a {waited + delay:.1f}s wait "
+                f"(max {self.max_wait_seconds:.1f}s)"
+            )
+
+    def _track_wait(self, key: str, priority: str, delta: int) -> None:
+        with self._lock:
+            budget = self._budget(key, self.clock())
+            if delta > 0:
+                budget.stats["delayed"] += 1
+            if priority == WRITE:
+                budget.waiting_writes += delta
+
+    def acquire(
+        self, key: str, priority: str = READ, sleep: Callable[[float], None] | None = None
+    ) -> float:
+        """Block until a slot is free; return the seconds spent waiting."""
+        waited = 0.0
+        delay = self.try_acquire(key, priority)
+        if delay == 0:
+            return 0.0
+        self._track_wait(key, priority, 1)
+        try:
+            while delay > 0:
+                self._check_wait(waited, delay)
+                (sleep or time.sleep)(delay)
+                waited += delay
+                delay = self.try_acquire(key, priority)
+        finally:
+            self._track_wait(key, priority, -1)
+        return waited
+
+    async def acquire_async(self, key: str, priority: str = READ) -> float:
+        waited = 0.0
+        delay = self.try_acquire(key, priority)
+        if delay == 0:
+            return 0.0
+        self._track_wait(key, priority, 1)
+        try:
+            while delay > 0:
+                self._check_wait(waited, delay)
+                await asyncio.sleep(delay)
+                waited += delay
+                delay = self.try_acquire(key, priority)
+        finally:
+            self._track_wait(key, priority, -1)
+        return waited
+
+    def observe(self, key: str, response: httpx.Response) -> None:
+        """Update the token's budget from a GitHub response."""
+        now = self.clock()
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        with self._lock:
+            budget = self._budget(key, now)
+            if remaining is not None and remaining.isdigit() and reset and reset.isdigit():
+                budget.remaining = int(remaining)
+                budget.reset_at = float(reset)
+            if is_rate_limited(response):
+                budget.stats["rate_limited"] += 1
+                wait = retry_after_seconds(response, now)
+                if wait is not None:
+                    budget.blocked_until = max(budget.blocked_until, now + wait)
+
+    def stats(self) -> dict[str, dict[str, object]]:
+        with self._lock:
+            return {
+                key: {
+                    **budget.stats,
+                    "remaining": budget.remaining,
+                    "reset_at": budget.reset_at or None,
+                    "blocked_until": budget.blocked_until or None,
+                }
+                for key, budget in self._budgets.items()
+            }
+
+
+def jittered_backoff(attempt: int, base_ms: int, max_ms: int) -> float:
+    """Full-jitter exponential backoff in seconds: uniform(0, min(max, base * 2**n))."""
+    ceiling = min(max_ms, base_ms * 2 ** max(attempt - 1, 0)) / 1000.0
+    return random.uniform(0, ceiling)
+
+
+def build_rate_limit_scheduler(
+    *,
+    enabled: bool,
+    requests_per_second: float,
+    burst: int,
+    write_reserve: int,
+    max_wait_seconds: float,
+) -> RateLimitScheduler | None:
+    if not enabled:
+        return None
+    return RateLimitScheduler(
+        requests_per_second=requests_per_second,
+        burst=burst,
+        write_reserve=write_reserve,
+        max_wait_seconds=max_wait_seconds,
+    )
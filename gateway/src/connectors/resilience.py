@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a host whose circuit breaker is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"circuit open for {host}; retry in {retry_in:.1f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+@dataclass
+class _Circuit:
+    state: str = CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+    probes: int = 0
+    probing_since: float = 0.0
+    rejected: int = 0
+    opened: int = 0
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker: closed, open, half-open.
+
+    ``failure_threshold`` consecutive failures (5xx or transport errors) open the
+    circuit. While it is open, calls fail at once with :class:`CircuitOpenError`
+    and no request is made. After ``recovery_seconds`` the circuit is half-open
+    and lets ``half_open_max_calls`` probe calls through. A success closes it; a
+    failure reopens it for another ``recovery_seconds``. Probes that never report
+    back free their slots after another ``recovery_seconds``, so a lost probe
+    cannot hold the circuit half-open forever.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold <= 0:
+            raise ValueError("circuit breaker failure threshold must be positive")
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.clock = clock
+        self._circuits: dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def before_call(self, host: str) -> None:
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            if circuit.state == OPEN:
+                retry_in = circuit.opened_at + self.recovery_seconds - self.clock()
+                if retry_in > 0:
+                    circuit.rejected += 1
+                    raise CircuitOpenError(host, retry_in)
+                circuit.state, circuit.probes, circuit.probing_since = HALF_OPEN, 0, self.clock()
+            if circuit.state == HALF_OPEN:
+                if (
+                    circuit.probes >= self.half_open_max_calls
+                    and self.clock() - circuit.probing_since >= self.recovery_seconds
+                ):
+                    circuit.probes, circuit.probing_since = 0, self.clock()
+                if circuit.probes >= self.half_open_max_calls:
+                    circuit.rejected += 1
+                    raise CircuitOpenError(host, 0.0)
+                circuit.probes += 1
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            circuit.state, circuit.failures = CLOSED, 0
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                if circuit.state != OPEN:
+                    circuit.opened += 1
+                circuit.state, circuit.opened_at = OPEN, self.clock()
+
+    def state(self, host: str) -> str:
+        with self._lock:
+            return self._circuits.get(host, _Circuit()).state
+
+    def stats(self) -> dict[str, dict[str, object]]:
+        with self._lock:
+            return {
+                host: {
+                    "state": circuit.state,
+                    "consecutive_failures": circuit.failures,
+                    "opened": circuit.opened,
+                    "rejected": circuit.rejected,
+                }
+                for host, circuit in self._circuits.items()
+            }
+
+
+class RetryBudget:
+    """Caps retries at a fraction of recent traffic across all connector calls.
+
+    Over a sliding ``window_seconds``, retries may not exceed ``ratio`` times the
+    number of first attempts, or ``min_retries`` if that is higher, so low
+    traffic can still retry. A degraded upstream then sees at most
+    ``1 + ratio`` times normal load instead of ``retry_attempts`` times.
+    """
+
+    def __init__(
+        self,
+        *,
+        ratio: float = 0.2,
+        min_retries: int = 10,
+        window_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self.exhausted = 0
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        for events in (self._requests, self._retries):
+            while events and events[0] <= cutoff:
+                events.popleft()
+
+    def record_request(self) -> None:
+        now = self.clock()
+        with self._lock:
+            self._prune(now)
+            self._requests.append(now)
+
+    def try_retry(self) -> bool:
+        now = self.clock()
+        with self._lock:
+            self._prune(now)
+            allowed = max(self.min_retries, int(len(self._requests) * self.ratio))
+            if len(self._retries) >= allowed:
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            self._prune(self.clock())
+            return {
+                "ratio": self.ratio,
+                "requests": len(self._requests),
+                "retries": len(self._retries),
+                "exhausted": self.exhausted,
+            }
+
+
+def build_circuit_breaker(
+    *, enabled: bool, failure_threshold: int, recovery_seconds: float, half_open_max_calls: int
+) -> CircuitBreaker | None:
+    if not enabled:
+        return None
+    return CircuitBreaker(
+        failure_threshold=failure_threshold,
+        recovery_seconds=recovery_seconds,
+        half_open_max_calls=half_open_max_calls,
+    )
+
+
+def build_retry_budget(
+    *, enabled: bool, ratio: float, min_retries: int, window_seconds: float
+) -> RetryBudget | None:
+    if not enabled:
+        return None
+    return RetryBudget(ratio=ratio, min_retries=min_retries, window_seconds=window_seconds)
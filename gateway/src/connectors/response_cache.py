@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str | None
+    expires_at: float
+    link: str | None = None
+
+
+def parse_ttls(value: str) -> dict[str, float]:
+    """Parse ``"list_issues=60,other=5"`` into per-method TTLs in seconds."""
+    ttls: dict[str, float] = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, sep, seconds = item.partition("=")
+        if not sep:
+            raise ValueError(f"invalid response cache TTL {item.strip()!r}; expected name=seconds")
+        ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+class ResponseCache:
+    """LRU of GitHub read responses, bounded by entry count and total body bytes.
+
+    Entries are keyed on ``(method, repo, path, params)`` and stay fresh for the
+    method's TTL. A stale entry that has an ETag is kept: the connector sends the
+    ETag back as ``If-None-Match``. A 304 reply does not count against GitHub's
+    rate limit, and it refreshes the entry. Writes invalidate every entry for
+    their repository. A per-repository generation keeps a read that was in
+    flight during the write from storing the old response afterwards.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: dict[str, float],
+        max_entries: int = 1000,
+        max_bytes: int = 16 * 1024 * 1024,
+        clock=time.monotonic,
+    ):
+        if max_entries <= 0 or max_bytes <= 0:
+            raise ValueError("response cache limits must be positive")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._bytes = 0
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def caches(self, method: str) -> bool:
+        return method in self.ttl_seconds
+
+    def lookup(self, key: tuple) -> tuple[CachedResponse | None, bool, int]:
+        """Return ``(entry, fresh, generation)``.
+
+        A stale entry is returned for revalidation; pass ``generation`` back to
+        ``store`` or ``refresh``.
+        """
+        with self._lock:
+            generation = self._generations.get(key[1], 0)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False, generation
+            self._entries.move_to_end(key)
+            if entry.expires_at > self.clock():
+                self.hits += 1
+                return entry, True, generation
+            self.misses += 1
+            return entry, False, generation
+
+    def store(
+        self, key: tuple, body: bytes, etag: str | None, generation: int, link: str | None = None
+    ) -> None:
+        method, repo = key[0], key[1]
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if self._generations.get(repo, 0) != generation:
+                return
+            self._discard(key)
+            self._entries[key] = CachedResponse(
+                body=body,
+                etag=etag,
+                expires_at=self.clock() + self.ttl_seconds[method],
+                link=link,
+            )
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self.evictions += 1
+
+    def refresh(self, key: tuple, generation: int) -> None:
+        """Record a 304: the entry is fresh again for another TTL."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._generations.get(key[1], 0) == generation:
+                entry.expires_at = self.clock() + self.ttl_seconds[key[0]]
+                self.revalidated += 1
+
+    def invalidate(self, repo: str) -> int:
+        with self._lock:
+            self._generations[repo] = self._generations.get(repo, 0) + 1
+            keys = [key for key in self._entries if key[1] == repo]
+            for key in keys:
+                self._discard(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def _discard(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.body)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def build_response_cache(
+    *, enabled: bool, ttls: str, max_entries: int, max_bytes: int
+) -> ResponseCache | None:
+    if not enabled:
+        return None
+    return ResponseCache(
+        ttl_seconds=parse_ttls(ttls), max_entries=max_entries, max_bytes=max_bytes
+    )
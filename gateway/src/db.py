@@ -1,8 +1,12 @@
+from collections.abc import Mapping
 from pathlib import Path
+from typing import Any
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import Delete, Engine, Insert, Update, create_engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
+from .migrations import run_migrations
 from .settings import settings
 
 if settings.database_url.startswith("sqlite:///"):
@@ -10,17 +14,198 @@ if settings.database_url.startswith("sqlite:///"):
     if db_path.startswith("./"):
         Path(db_path[2:]).parent.mkdir(parents=True, exist_ok=True)
 
-engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+def sqlite_pragmas_from_settings() -> dict[str, str | int]:
+    if not settings.sqlite_tuning_enabled:
+        return {}
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "mmap_size": settings.sqlite_mmap_size_bytes,
+        "cache_size": settings.sqlite_cache_size,
+        "temp_store": settings.sqlite_temp_store,
+    }
 
-def run_startup_migrations() -> None:
-    if not settings.database_url.startswith("sqlite:///"):
+
+def pool_options_from_settings() -> dict[str, Any]:
+    return {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout_seconds,
+        "pool_recycle": settings.database_pool_recycle_seconds,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+    }
+
+
+def server_connect_args(url: str, statement_timeout_ms: int | None) -> dict[str, Any]:
+    """Driver ``connect_args`` that set PostgreSQL's ``statement_timeout`` per connection."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql" or not statement_timeout_ms:
+        return {}
+    if parsed.get_driver_name() == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(statement_timeout_ms)}}
+    # libpq drivers (psycopg, psycopg2) accept startup options.
+    return {"options": f"-c statement_timeout={statement_timeout_ms}"}
+
+
+def install_sqlite_pragmas(engine: Engine, pragmas: Mapping[str, str | int]) -> None:
+    """Apply ``PRAGMA name=value`` to every new DBAPI connection of ``engine``."""
+    if not pragmas:
         return
-    with engine.begin() as connection:
-        result = connection.exec_driver_sql("PRAGMA table_info(audit_logs)")
-        columns = {row[1] for row in result.fetchall()}
-        if "schema_version" not in columns:
-            connection.exec_driver_sql(
-                "ALTER TABLE audit_logs ADD COLUMN schema_version INTEGER NOT NULL DEFAULT 1"
-            )
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, _connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+# A bare ``postgresql://`` would pick psycopg2 (sync) and asyncpg (async), neither of
+# which requirements.txt installs; psycopg 3 serves both engines.
+SYNC_DRIVERS = {"postgresql": "postgresql+psycopg"}
+
+
+def sync_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    driver = SYNC_DRIVERS.get(scheme)
+    return f"{driver}://{rest}" if sep and driver else url
+
+
+def _is_sqlite_file(url: str) -> bool:
+    return url.startswith("sqlite:///") and ":memory:" not in url
+
+
+def create_engines(
+    url: str,
+    *,
+    sqlite_pragmas: Mapping[str, str | int] | None = None,
+    single_writer: bool = False,
+    pool_options: Mapping[str, Any] | None = None,
+    statement_timeout_ms: int | None = None,
+) -> tuple[Engine, Engine | None]:
+    """Create the read engine and, for SQLite files with ``single_writer``, a writer engine.
+
+    The writer engine holds exactly one connection, so concurrent writers queue in
+    the pool instead of contending for SQLite's database lock. Server databases get
+    one pooled engine sized by ``pool_options``.
+    """
+    if not url.startswith("sqlite"):
+        url = sync_database_url(url)
+        engine = create_engine(
+            url,
+            connect_args=server_connect_args(url, statement_timeout_ms),
+            **(pool_options or {}),
+        )
+        return engine, None
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    if not _is_sqlite_file(url):
+        return engine, None
+    install_sqlite_pragmas(engine, sqlite_pragmas or {})
+    if not single_writer:
+        return engine, None
+    busy_timeout_ms = int((sqlite_pragmas or {}).get("busy_timeout", 30_000))
+    writer = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=max(busy_timeout_ms / 1000.0, 1.0),
+    )
+    install_sqlite_pragmas(writer, sqlite_pragmas or {})
+    return engine, writer
+
+
+class WriterRoutingSession(Session):
+    """Session that sends flushes and DML to ``writer_bind`` and plain reads to ``bind``."""
+
+    def __init__(self, *args, writer_bind: Engine | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer_bind = writer_bind
+
+    def _holds_writer(self) -> bool:
+        transaction = self._transaction
+        return transaction is not None and self.writer_bind in transaction._connections
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        # Once a session holds the writer it keeps using it: asking the read pool for
+        # another connection while other sessions hold readers and queue on the
+        # writer would deadlock both pools.
+        if self.writer_bind is not None and (
+            self._flushing
+            or isinstance(clause, Insert | Update | Delete)
+            or self._holds_writer()
+        ):
+            return self.writer_bind
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+def build_session_factory(
+    engine: Engine, writer_engine: Engine | None = None
+) -> sessionmaker[Session]:
+    if writer_engine is None:
+        return sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    return sessionmaker(
+        bind=engine,
+        class_=WriterRoutingSession,
+        writer_bind=writer_engine,
+        autoflush=False,
+        autocommit=False,
+    )
+
+
+engine, writer_engine = create_engines(
+    settings.database_url,
+    sqlite_pragmas=sqlite_pragmas_from_settings(),
+    single_writer=settings.sqlite_single_writer,
+    pool_options=pool_options_from_settings(),
+    statement_timeout_ms=settings.database_statement_timeout_ms,
+)
+SessionLocal = build_session_factory(engine, writer_engine)
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+psycopg_async",
+    "postgresql+psycopg": "postgresql+psycopg_async",
+}
+# Async drivers used as given; asyncpg is supported but not installed by default.
+ASYNC_SCHEMES = {*ASYNC_DRIVERS.values(), "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        raise ValueError(f"invalid database url: {url}")
+    if scheme in ASYNC_SCHEMES:
+        return url
+    driver = ASYNC_DRIVERS.get(scheme) or ASYNC_DRIVERS.get(scheme.split("+", 1)[0])
+    if driver is None:
+        raise ValueError(f"no async driver known for database url scheme: {scheme}")
+    return f"{driver}://{rest}"
+
+
+def build_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    url = async_database_url(settings.database_url)
+    options: dict[str, Any] = {}
+    if not url.startswith("sqlite"):
+        options = {
+            "connect_args": server_connect_args(url, settings.database_statement_timeout_ms),
+            **pool_options_from_settings(),
+        }
+    try:
+        async_engine = create_async_engine(url, **options)
+    except ImportError as exc:
+        raise RuntimeError(
+            "execution_mode=async requires aiosqlite (SQLite) or asyncpg/psycopg (PostgreSQL)"
+        ) from exc
+    if _is_sqlite_file(settings.database_url):
+        install_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas_from_settings())
+    # Objects stay usable after commit: lazy refreshes cannot run outside the event loop.
+    return async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def run_startup_migrations() -> list[int]:
+    return run_migrations(writer_engine or engine)
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any
+
+
+class Subscription:
+    """One subscriber's queue of bus events, consumed on the event loop it was made on."""
+
+    def __init__(self, bus: "EventBus", loop: asyncio.AbstractEventLoop, max_queue_size: int):
+        self.bus = bus
+        self.loop = loop
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(max_queue_size)
+        # True when events were lost: the resume point fell out of the history, or
+        # the queue overflowed. The consumer should reload state instead of trusting
+        # deltas.
+        self.missed = False
+
+    def _put(self, event: dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.missed = True
+            self.bus._count_dropped()
+
+    def deliver(self, event: dict[str, Any]) -> None:
+        """Hand ``event`` to the subscriber's loop; safe from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The subscriber's loop is closed; nobody is listening any more.
+            self.close()
+
+    async def get(self, timeout: float | None = None) -> dict[str, Any] | None:
+        """Next event, or None when ``timeout`` runs out first."""
+        if not self.queue.empty():
+            return self.queue.get_nowait()
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.bus._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+class EventBus:
+    """In-process pub/sub for state changes, with a bounded replay history.
+
+    ``publish`` may be called from any thread, such as request threads, worker
+    pools or the event loop itself. Subscribers are asyncio queues bound to their
+    loop. Every event gets a monotonically increasing ``seq``. A subscriber that
+    passes the last ``seq`` it saw gets the newer events still in the history
+    first, so a reconnect does not miss events. Events live only in this
+    process: each gateway replica has its own bus.
+    """
+
+    def __init__(self, history_size: int = 1000, max_queue_size: int = 1000):
+        if history_size <= 0 or max_queue_size <= 0:
+            raise ValueError("event bus sizes must be positive")
+        self.max_queue_size = max_queue_size
+        self.published = 0
+        self.dropped = 0
+        self._seq = 0
+        self._history: deque[dict[str, Any]] = deque(maxlen=history_size)
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event_type: str, data: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            self._seq += 1
+            self.published += 1
+            event = {"seq": self._seq, "type": event_type, "data": data}
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return event
+
+    def subscribe(self, after: int | None = None) -> Subscription:
+        """Subscribe on the running loop, replaying history newer than ``after``."""
+        subscription = Subscription(self, asyncio.get_running_loop(), self.max_queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if after is not None:
+                oldest = self._history[0]["seq"] if self._history else self._seq + 1
+                if after + 1 < oldest or after > self._seq:
+                    # Evicted from history, or a seq from before a restart.
+                    subscription.missed = True
+                for event in self._history:
+                    if event["seq"] > after:
+                        subscription._put(event)
+        return subscription
+
+    @property
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._seq
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _count_dropped(self) -> None:
+        with self._lock:
+            self.dropped += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "last_seq": self._seq,
+                "history": len(self._history),
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "dropped": self.dropped,
+            }
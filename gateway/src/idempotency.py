@@ -0,0 +1,204 @@
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from .models import IdempotencyRecord
+
+logger = logging.getLogger(__name__)
+
+
+def expiry_cutoff(ttl_seconds: int, now: datetime | None = None) -> datetime | None:
+    """Naive-UTC ``created_at`` before which a record has expired, or None without a TTL."""
+    if ttl_seconds <= 0:
+        return None
+    now = (now or datetime.now(UTC)).astimezone(UTC).replace(tzinfo=None)
+    return now - timedelta(seconds=ttl_seconds)
+
+
+def _stored(value: datetime) -> datetime:
+    return value.astimezone(UTC).replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+class IdempotencyCache:
+    """Bounded LRU of committed idempotency records keyed on the idempotency key.
+
+    Committed records never change, so an entry stays valid until the TTL runs out.
+    A hit replays the stored response without reading ``idempotency_records``.
+    Only records whose transaction has committed are put here.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int = 0):
+        if max_entries <= 0:
+            raise ValueError("idempotency cache size must be positive")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[str, str, datetime]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> IdempotencyRecord | None:
+        cutoff = expiry_cutoff(self.ttl_seconds)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and cutoff is not None and entry[2] < cutoff:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        request_hash, response_payload, created_at = entry
+        # Transient and never added to a session; _stage_replay only reads it.
+        return IdempotencyRecord(
+            key=key,
+            request_hash=request_hash,
+            response_payload=response_payload,
+            created_at=created_at,
+        )
+
+    def put(self, key: str, request_hash: str, response_payload: str, created_at: datetime) -> None:
+        with self._lock:
+            self._entries[key] = (request_hash, response_payload, _stored(created_at))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "max_entries": self.max_entries,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class IdempotencySweeper:
+    """Deletes expired idempotency records on a background thread.
+
+    Each pass deletes at most ``batch_size`` rows per transaction, through the
+    ``created_at`` index. Locks stay short, and the table size stays near the
+    request rate times the TTL.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        ttl_seconds: int,
+        interval_seconds: float,
+        batch_size: int = 5000,
+    ):
+        if ttl_seconds <= 0:
+            raise ValueError("idempotency sweeper needs a positive TTL")
+        if interval_seconds <= 0:
+            raise ValueError("idempotency sweep interval must be positive")
+        if batch_size <= 0:
+            raise ValueError("idempotency sweep batch size must be positive")
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.runs = 0
+        self.failed_runs = 0
+        self.deleted = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="agent2allow-idempotency-sweeper", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def sweep(self, now: datetime | None = None) -> int:
+        cutoff = expiry_cutoff(self.ttl_seconds, now)
+        expired_ids = (
+            select(IdempotencyRecord.id)
+            .where(IdempotencyRecord.created_at < cutoff)
+            .limit(self.batch_size)
+        )
+        statement = (
+            delete(IdempotencyRecord)
+            .where(IdempotencyRecord.id.in_(expired_ids))
+            .execution_options(synchronize_session=False)
+        )
+        total = 0
+        while not self._stop.is_set():
+            with self.session_factory() as db:
+                deleted = db.execute(statement).rowcount
+                db.commit()
+            total += deleted
+            if deleted < self.batch_size:
+                break
+        self.deleted += total
+        return total
+
+    def run_once(self, now: datetime | None = None) -> int:
+        try:
+            deleted = self.sweep(now)
+        except Exception as exc:
+            self.failed_runs += 1
+            logger.warning("idempotency sweep failed: %s", exc)
+            return 0
+        self.runs += 1
+        return deleted
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "deleted": self.deleted,
+        }
+
+    def _run(self) -> None:
+        self.run_once()
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+
+def build_idempotency_cache(*, max_entries: int, ttl_seconds: int) -> IdempotencyCache | None:
+    if max_entries <= 0:
+        return None
+    return IdempotencyCache(max_entries, ttl_seconds)
+
+
+def build_idempotency_sweeper(
+    session_factory: Callable[[], Session],
+    *,
+    ttl_seconds: int,
+    interval_seconds: float,
+    batch_size: int,
+) -> IdempotencySweeper | None:
+    if ttl_seconds <= 0 or interval_seconds <= 0:
+        return None
+    return IdempotencySweeper(
+        session_factory,
+        ttl_seconds=ttl_seconds,
+        interval_seconds=interval_seconds,
+        batch_size=batch_size,
+    )
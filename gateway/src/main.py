@@ -1,26 +1,61 @@
+import asyncio
 import json
+import zlib
+from collections.abc import AsyncIterator, Iterator
 from contextlib import asynccontextmanager
+from datetime import datetime
 from pathlib import Path
+from typing import Annotated
 
-from fastapi import FastAPI, Header, HTTPException, Response
-from sqlalchemy import text
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy import Row, text
 
 from .api_auth import ApprovalApiKeyAuth
+from .approval_queue import build_approval_job_queue, build_approval_worker_pool
+from .async_service import AsyncAgent2AllowService
+from .audit_partitions import build_audit_maintenance, build_audit_partition_manager
+from .audit_query import (
+    AUDIT_PAGE_DEFAULT_LIMIT,
+    AUDIT_PAGE_MAX_LIMIT,
+    AuditLogFilter,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
 from .audit_sink import build_audit_sink
-from .connectors.github_client import GithubClient
-from .db import SessionLocal, engine, run_startup_migrations
-from .models import Base
+from .audit_writer import build_audit_writer
+from .coalescing import build_request_coalescer
+from .connectors.github_client import AsyncGithubClient, GithubClient
+from .connectors.rate_limit import build_rate_limit_scheduler
+from .connectors.resilience import build_circuit_breaker, build_retry_budget
+from .connectors.response_cache import build_response_cache
+from .db import (
+    SessionLocal,
+    build_async_session_factory,
+    engine,
+    run_startup_migrations,
+    writer_engine,
+)
+from .event_bus import EventBus
+from .idempotency import build_idempotency_cache, build_idempotency_sweeper
+from .metrics import GatewayMetrics, build_metrics
 from .policy import PolicyEngine
+from .policy_watcher import build_policy_watcher
 from .rbac import ApprovalRBAC
 from .schemas import (
     ApprovalDecisionRequest,
+    ApprovalOutcomeView,
     ApprovalView,
     AuditLogView,
     BulkApprovalRequest,
+    ToolCallBatchRequest,
+    ToolCallBatchResponse,
     ToolCallRequest,
     ToolCallResponse,
 )
-from .service import Agent2AllowService, IdempotencyConflictError
+from .service import Agent2AllowService, IdempotencyConflictError, ToolCallRejectedError
 from .settings import settings
 
 
@@ -29,34 +64,211 @@ def build_service() -> Agent2AllowService:
     if not policy_path.exists() and Path("gateway").exists():
         policy_path = Path("gateway") / settings.policy_path
 
-    return Agent2AllowService(
-        session_factory=SessionLocal,
-        policy_engine=PolicyEngine(str(policy_path)),
-        github_client=GithubClient(
-            settings.github_base_url,
-            settings.github_token,
-            retry_attempts=settings.github_retry_attempts,
-            retry_backoff_ms=settings.github_retry_backoff_ms,
+    audit_sink = build_audit_sink(
+        sink_type=settings.audit_sink,
+        syslog_host=settings.audit_sink_syslog_host,
+        syslog_port=settings.audit_sink_syslog_port,
+        syslog_facility=settings.audit_sink_syslog_facility,
+        s3_bucket=settings.audit_sink_s3_bucket,
+        s3_prefix=settings.audit_sink_s3_prefix,
+        blob_container=settings.audit_sink_blob_container,
+        blob_prefix=settings.audit_sink_blob_prefix,
+        blob_connection_string=settings.audit_sink_blob_connection_string,
+    )
+    github_options = {
+        "retry_attempts": settings.github_retry_attempts,
+        "retry_backoff_ms": settings.github_retry_backoff_ms,
+        "timeout_seconds": settings.github_http_timeout_seconds,
+        "connect_timeout_seconds": settings.github_http_connect_timeout_seconds,
+        "max_connections": settings.github_http_max_connections,
+        "max_keepalive_connections": settings.github_http_max_keepalive_connections,
+        "keepalive_expiry_seconds": settings.github_http_keepalive_expiry_seconds,
+        "http2": settings.github_http2,
+        "retry_max_backoff_ms": settings.github_retry_max_backoff_ms,
+        # Caching, rate limiting, the breaker and the retry budget are shared by the
+        # sync and async clients.
+        "circuit_breaker": build_circuit_breaker(
+            enabled=settings.github_circuit_breaker_enabled,
+            failure_threshold=settings.github_circuit_failure_threshold,
+            recovery_seconds=settings.github_circuit_recovery_seconds,
+            half_open_max_calls=settings.github_circuit_half_open_max_calls,
+        ),
+        "retry_budget": build_retry_budget(
+            enabled=settings.github_retry_budget_enabled,
+            ratio=settings.github_retry_budget_ratio,
+            min_retries=settings.github_retry_budget_min_retries,
+            window_seconds=settings.github_retry_budget_window_seconds,
         ),
-        audit_sink=build_audit_sink(
-            sink_type=settings.audit_sink,
-            syslog_host=settings.audit_sink_syslog_host,
-            syslog_port=settings.audit_sink_syslog_port,
-            syslog_facility=settings.audit_sink_syslog_facility,
-            s3_bucket=settings.audit_sink_s3_bucket,
-            s3_prefix=settings.audit_sink_s3_prefix,
-            blob_container=settings.audit_sink_blob_container,
-            blob_prefix=settings.audit_sink_blob_prefix,
-            blob_connection_string=settings.audit_sink_blob_connection_string,
+        "rate_limiter": build_rate_limit_scheduler(
+            enabled=settings.github_rate_limit_enabled,
+            requests_per_second=settings.github_rate_limit_requests_per_second,
+            burst=settings.github_rate_limit_burst,
+            write_reserve=settings.github_rate_limit_write_reserve,
+            max_wait_seconds=settings.github_rate_limit_max_wait_seconds,
+        ),
+        "response_cache": build_response_cache(
+            enabled=settings.github_response_cache_enabled,
+            ttls=settings.github_response_cache_ttls,
+            max_entries=settings.github_response_cache_max_entries,
+            max_bytes=settings.github_response_cache_max_bytes,
+        ),
+    }
+    common = {
+        "session_factory": SessionLocal,
+        "policy_engine": PolicyEngine(
+            str(policy_path),
+            decision_cache_size=settings.policy_decision_cache_size,
         ),
+        "github_client": GithubClient(
+            settings.github_base_url, settings.github_token, **github_options
+        ),
+        "audit_sink": audit_sink,
+        "coalescer": build_request_coalescer(enabled=settings.tool_call_coalescing_enabled),
+        "event_bus": EventBus(history_size=settings.event_history_size),
+        "metrics": build_metrics(enabled=settings.metrics_enabled),
+        "approval_queue": build_approval_job_queue(
+            mode=settings.approval_execution_mode,
+            lease_seconds=settings.approval_queue_lease_seconds,
+            max_attempts=settings.approval_queue_max_attempts,
+        ),
+        "idempotency_ttl_seconds": settings.idempotency_ttl_seconds,
+        "idempotency_cache": build_idempotency_cache(
+            max_entries=settings.idempotency_cache_size,
+            ttl_seconds=settings.idempotency_ttl_seconds,
+        ),
+        "audit_partitions": build_audit_partition_manager(
+            writer_engine or engine,
+            database_url=settings.database_url,
+            interval=settings.audit_partition_interval,
+            premake=settings.audit_partitions_premake,
+            partition_dir=settings.audit_partition_dir,
+            retention_days=settings.audit_retention_days,
+            retention_action=settings.audit_retention_action,
+            archive_dir=settings.audit_archive_dir,
+        ),
+        "audit_writer": build_audit_writer(
+            SessionLocal,
+            mode=settings.audit_write_mode,
+            audit_sink=audit_sink,
+            max_queue_size=settings.audit_queue_max_size,
+            batch_size=settings.audit_batch_size,
+            flush_interval_ms=settings.audit_flush_interval_ms,
+            enqueue_timeout_ms=settings.audit_enqueue_timeout_ms,
+            retry_attempts=settings.audit_write_retry_attempts,
+            retry_backoff_ms=settings.audit_write_retry_backoff_ms,
+        ),
+    }
+
+    execution_mode = settings.execution_mode.lower().strip()
+    if execution_mode == "sync":
+        return Agent2AllowService(**common)
+    if execution_mode == "async":
+        return AsyncAgent2AllowService(
+            **common,
+            async_session_factory=build_async_session_factory(),
+            async_github_client=AsyncGithubClient(
+                settings.github_base_url, settings.github_token, **github_options
+            ),
+        )
+    raise ValueError(f"unsupported execution mode: {settings.execution_mode}")
+
+
+def _register_metric_sources(metrics: GatewayMetrics, service: Agent2AllowService) -> None:
+    """Gauges and connector counters read from existing state when ``/metrics`` is scraped."""
+    metrics.add_callback(
+        "agent2allow_pending_approvals",
+        "Approvals waiting for a human decision.",
+        lambda: [((), service.count_pending_approvals())],
+    )
+    if service.approval_queue is not None:
+
+        def _approval_jobs() -> list[tuple[tuple[str, ...], float]]:
+            with service.session_factory() as db:
+                depth = service.approval_queue.depth(db)
+            return [((status,), count) for status, count in sorted(depth.items())]
+
+        metrics.add_callback(
+            "agent2allow_approval_jobs",
+            "Approval jobs by status.",
+            _approval_jobs,
+            labelnames=("status",),
+        )
+    if service.audit_writer is not None:
+        metrics.add_callback(
+            "agent2allow_audit_queue_depth",
+            "Audit row batches waiting for the write-behind writer.",
+            lambda: [((), service.audit_writer.stats()["queue_depth"])],
+        )
+        metrics.add_callback(
+            "agent2allow_audit_rows_dropped_total",
+            "Audit rows the write-behind writer dropped after their own insert failed.",
+            lambda: [((), service.audit_writer.stats()["failed_rows"])],
+            kind="counter",
+        )
+    metrics.add_callback(
+        "agent2allow_event_subscribers",
+        "Open event streams and approval waits.",
+        lambda: [((), service.event_bus.stats()["subscribers"])],
     )
+    clients = [service.github_client, getattr(service, "async_github_client", None)]
+    clients = [client for client in clients if hasattr(client, "request_stats")]
+    for name, help_text in (
+        ("retries", "GitHub requests retried after a transient failure."),
+        ("timeouts", "GitHub requests that timed out."),
+    ):
+        metrics.add_callback(
+            f"agent2allow_github_{name}_total",
+            help_text,
+            lambda name=name: [((), sum(client.request_stats()[name] for client in clients))],
+            kind="counter",
+        )
+
+
+async def _call_service(method: str, *args):
+    """Run a service method on the event loop when async, otherwise in the threadpool."""
+    service = app.state.service
+    if isinstance(service, AsyncAgent2AllowService):
+        return await getattr(service, f"{method}_async")(*args)
+    return await run_in_threadpool(getattr(service, method), *args)
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    Base.metadata.create_all(bind=engine)
     run_startup_migrations()
     app.state.service = build_service()
+    if app.state.service.audit_writer is not None:
+        app.state.service.audit_writer.start()
+    app.state.policy_watcher = build_policy_watcher(
+        app.state.service.policy_engine,
+        mode=settings.policy_reload_mode,
+        poll_interval_seconds=settings.policy_watch_poll_interval_seconds,
+    )
+    if app.state.policy_watcher is not None:
+        app.state.policy_watcher.start()
+    app.state.audit_maintenance = build_audit_maintenance(
+        app.state.service.audit_partitions,
+        interval_seconds=settings.audit_maintenance_interval_seconds,
+    )
+    if app.state.audit_maintenance is not None:
+        app.state.audit_maintenance.start()
+    app.state.idempotency_sweeper = build_idempotency_sweeper(
+        SessionLocal,
+        ttl_seconds=settings.idempotency_ttl_seconds,
+        interval_seconds=settings.idempotency_sweep_interval_seconds,
+        batch_size=settings.idempotency_sweep_batch_size,
+    )
+    if app.state.idempotency_sweeper is not None:
+        app.state.idempotency_sweeper.start()
+    app.state.approval_workers = build_approval_worker_pool(
+        app.state.service,
+        workers=settings.approval_queue_workers,
+        per_repo_concurrency=settings.approval_queue_per_repo_concurrency,
+        poll_interval_seconds=settings.approval_queue_poll_interval_seconds,
+    )
+    if app.state.approval_workers is not None:
+        app.state.approval_workers.start()
+    if app.state.service.metrics is not None:
+        _register_metric_sources(app.state.service.metrics, app.state.service)
     app.state.approval_rbac = ApprovalRBAC(
         enabled=settings.approval_rbac_enabled,
         role_bindings_json=settings.approval_role_bindings,
@@ -69,6 +281,22 @@ async def lifespan(_: FastAPI):
         keys_json=settings.approval_api_keys,
     )
     yield
+    if app.state.approval_workers is not None:
+        app.state.approval_workers.stop()
+    if app.state.idempotency_sweeper is not None:
+        app.state.idempotency_sweeper.stop()
+    if app.state.audit_maintenance is not None:
+        app.state.audit_maintenance.stop()
+    if app.state.policy_watcher is not None:
+        app.state.policy_watcher.stop()
+    if app.state.service.audit_writer is not None:
+        app.state.service.audit_writer.close()
+    close_connector = getattr(app.state.service.github_client, "close", None)
+    if close_connector is not None:
+        close_connector()
+    if isinstance(app.state.service, AsyncAgent2AllowService):
+        await app.state.service.async_github_client.aclose()
+        await app.state.service.async_session_factory.kw["bind"].dispose()
 
 
 app = FastAPI(title="Agent2Allow", version="0.1.0", lifespan=lifespan)
@@ -107,16 +335,76 @@ def ready(response: Response) -> dict[str, str | bool | dict[str, bool]]:
     return payload
 
 
+@app.get("/v1/policy/cache")
+def policy_cache() -> dict[str, int | bool]:
+    return app.state.service.policy_engine.cache_stats()
+
+
+@app.get("/v1/idempotency/cache")
+def idempotency_cache() -> dict[str, object]:
+    cache = app.state.service.idempotency_cache
+    sweeper = getattr(app.state, "idempotency_sweeper", None)
+    return {
+        "ttl_seconds": app.state.service.idempotency_ttl_seconds,
+        "cache": cache.stats() if cache is not None else None,
+        "sweeper": sweeper.stats() if sweeper is not None else None,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    registry = app.state.service.metrics
+    if registry is None:
+        raise HTTPException(status_code=404, detail="metrics disabled")
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/v1/connectors/github/cache")
+def github_response_cache() -> dict[str, object]:
+    cache = getattr(app.state.service.github_client, "response_cache", None)
+    return {"enabled": cache is not None, "stats": cache.stats() if cache is not None else None}
+
+
+@app.get("/v1/connectors/github/rate-limit")
+def github_rate_limit() -> dict[str, object]:
+    scheduler = getattr(app.state.service.github_client, "rate_limiter", None)
+    return {
+        "enabled": scheduler is not None,
+        "tokens": scheduler.stats() if scheduler is not None else {},
+    }
+
+
+@app.get("/v1/connectors/github/circuit")
+def github_circuit() -> dict[str, object]:
+    breaker = getattr(app.state.service.github_client, "circuit_breaker", None)
+    budget = getattr(app.state.service.github_client, "retry_budget", None)
+    return {
+        "circuit_breaker": breaker.stats() if breaker is not None else None,
+        "retry_budget": budget.stats() if budget is not None else None,
+    }
+
+
+@app.get("/v1/tool-calls/coalescing")
+def tool_call_coalescing() -> dict[str, object]:
+    coalescer = app.state.service.coalescer
+    return {
+        "enabled": coalescer is not None,
+        "stats": coalescer.stats() if coalescer is not None else None,
+    }
+
+
 @app.post("/v1/tool-calls", response_model=ToolCallResponse)
-def tool_calls(
+async def tool_calls(
     request: ToolCallRequest,
     x_idempotency_key: str | None = Header(default=None, alias="X-Idempotency-Key"),
 ) -> ToolCallResponse:
     if x_idempotency_key:
         request = request.model_copy(update={"idempotency_key": x_idempotency_key})
     try:
-        status, message, result, approval_id, idempotent_replay = (
-            app.state.service.handle_tool_call(request)
+        status, message, result, approval_id, idempotent_replay = await _call_service(
+            "handle_tool_call", request
         )
     except IdempotencyConflictError as exc:
         raise HTTPException(status_code=409, detail=str(exc)) from exc
@@ -129,6 +417,83 @@ def tool_calls(
     )
 
 
+@app.post("/v1/tool-calls:batch", response_model=ToolCallBatchResponse)
+async def tool_calls_batch(request: ToolCallBatchRequest) -> ToolCallBatchResponse:
+    if len(request.calls) > settings.tool_call_batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"batch exceeds {settings.tool_call_batch_max_size} tool calls",
+        )
+    outcomes = await _call_service(
+        "handle_tool_calls", request.calls, settings.tool_call_batch_concurrency
+    )
+    return ToolCallBatchResponse(
+        results=[
+            ToolCallResponse(
+                status=status,
+                message=message,
+                result=result,
+                approval_id=approval_id,
+                idempotent_replay=idempotent_replay,
+            )
+            for status, message, result, approval_id, idempotent_replay in outcomes
+        ]
+    )
+
+
+@app.post(
+    "/v1/tool-calls:stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/x-ndjson": {}}},
+        202: {"model": ToolCallResponse, "description": "Approval required"},
+    },
+)
+def tool_calls_stream(request: ToolCallRequest) -> Response:
+    """Stream ``issues.list`` one NDJSON line per page; resume with a page's ``next_cursor``."""
+    try:
+        pages = app.state.service.stream_issue_pages(request)
+    except ToolCallRejectedError as exc:
+        if exc.status == "pending_approval":
+            # Same body as a non-streamed call; stream again once it is approved.
+            return JSONResponse(
+                status_code=202,
+                content=ToolCallResponse(
+                    status=exc.status, message=str(exc), approval_id=exc.approval_id
+                ).model_dump(),
+            )
+        raise HTTPException(
+            status_code=403, detail={"status": exc.status, "message": str(exc)}
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    def _lines() -> Iterator[bytes]:
+        try:
+            for page in pages:
+                yield (json.dumps(page) + "\n").encode("utf-8")
+        finally:
+            # Audits the stream now if the client went away early.
+            pages.close()
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+@app.get("/v1/approvals/queue")
+def approvals_queue() -> dict[str, object]:
+    queue = app.state.service.approval_queue
+    if queue is None:
+        return {"enabled": False, "depth": None, "workers": None}
+    workers = getattr(app.state, "approval_workers", None)
+    with app.state.service.session_factory() as db:
+        depth = queue.depth(db)
+    return {
+        "enabled": True,
+        "depth": depth,
+        "workers": workers.stats() if workers is not None else None,
+    }
+
+
 @app.get("/v1/approvals/pending", response_model=list[ApprovalView])
 def approvals_pending() -> list[ApprovalView]:
     approvals = app.state.service.list_pending_approvals()
@@ -149,8 +514,163 @@ def approvals_pending() -> list[ApprovalView]:
     ]
 
 
+# Approval states that no later decision or execution changes.
+APPROVAL_FINAL_STATES = frozenset({"executed", "failed", "denied"})
+
+
+@app.get("/v1/approvals/{approval_id}/wait", response_model=ApprovalOutcomeView)
+async def approvals_wait(
+    approval_id: int,
+    timeout: Annotated[float, Query(ge=0, description="seconds to wait for a final state")] = 30,
+) -> ApprovalOutcomeView:
+    """Long-poll until the approval is executed, failed or denied, or ``timeout`` passes."""
+    timeout = min(timeout, settings.approval_wait_max_seconds)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    # Subscribe before reading so a change between the read and the wait is not lost.
+    with app.state.service.event_bus.subscribe() as events:
+        approval = await _call_service("get_approval", approval_id)
+        if approval is None:
+            raise HTTPException(status_code=404, detail="approval not found")
+        while approval.status not in APPROVAL_FINAL_STATES:
+            event = await events.get(max(0.0, deadline - loop.time()))
+            if event is None:
+                # Timed out. Re-read, in case another replica decided it.
+                approval = await _call_service("get_approval", approval_id)
+                break
+            data = event["data"]
+            if events.missed or (
+                event["type"] == "approval"
+                and data["approval_id"] == approval_id
+                and data["status"] in APPROVAL_FINAL_STATES
+            ):
+                events.missed = False
+                approval = await _call_service("get_approval", approval_id)
+    final = approval.status in APPROVAL_FINAL_STATES
+    return ApprovalOutcomeView(
+        id=approval.id,
+        status=approval.status,
+        tool=approval.tool,
+        action=approval.action,
+        repo=approval.repo,
+        risk_level=approval.risk_level,
+        request_payload=json.loads(approval.request_payload),
+        reason=approval.reason,
+        created_at=approval.created_at,
+        updated_at=approval.updated_at,
+        result=json.loads(approval.result_payload) if final else None,
+        timed_out=not final,
+    )
+
+
+EVENT_TYPES = frozenset({"approval", "audit"})
+
+
+def _sse_message(event: dict) -> bytes:
+    # Encoded once per event, however many streams are connected.
+    message = event.get("sse")
+    if message is None:
+        data = json.dumps(event["data"])
+        message = f"id: {event['seq']}\nevent: {event['type']}\ndata: {data}\n\n".encode()
+        event["sse"] = message
+    return message
+
+
+def _resume_after(last_event_id: str | None, after: int | None) -> int | None:
+    """Seq to resume after; the browser's ``Last-Event-ID`` wins over ``?after=``."""
+    if last_event_id:
+        if not last_event_id.isdigit():
+            raise HTTPException(status_code=400, detail="invalid Last-Event-ID")
+        return int(last_event_id)
+    return after
+
+
+async def _event_stream(
+    bus: EventBus,
+    after: int | None,
+    heartbeat_seconds: float,
+    *,
+    types: frozenset[str],
+    approval_id: int | None = None,
+) -> AsyncIterator[bytes]:
+    with bus.subscribe(after) as events:
+        # "ready" tells the client it is subscribed, so a snapshot it loads now
+        # cannot miss a change.
+        yield b"retry: 3000\n\nevent: ready\ndata: {}\n\n"
+        while True:
+            if events.missed:
+                # Events were lost; the client should reload its lists before applying more.
+                events.missed = False
+                yield _sse_message({"seq": bus.last_seq, "type": "reset", "data": {}})
+            event = await events.get(heartbeat_seconds)
+            if event is None:
+                yield b": keepalive\n\n"
+            elif event["type"] in types and (
+                approval_id is None or event["data"]["approval_id"] == approval_id
+            ):
+                yield _sse_message(event)
+
+
+def _event_response(stream: AsyncIterator[bytes]) -> StreamingResponse:
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get(
+    "/v1/approvals/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def approvals_events(
+    approval_id: int | None = None,
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """Server-sent events for approval state changes; ``Last-Event-ID`` resumes a stream."""
+    stream = _event_stream(
+        app.state.service.event_bus,
+        _resume_after(last_event_id, None),
+        settings.event_stream_heartbeat_seconds,
+        types=frozenset({"approval"}),
+        approval_id=approval_id,
+    )
+    return _event_response(stream)
+
+
+@app.get(
+    "/v1/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def events_stream(
+    types: Annotated[str, Query(description="comma-separated: approval, audit")] = (
+        "approval,audit"
+    ),
+    after: Annotated[int | None, Query(ge=0, description="resume after this event id")] = None,
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """Server-sent approval and audit deltas for dashboards.
+
+    Each committed approval change is an ``approval`` event and each new audit row an
+    ``audit`` event shaped like ``GET /v1/audit`` items. A ``reset`` event means events
+    were missed and the client should reload its lists.
+    """
+    selected = frozenset(name.strip() for name in types.split(",") if name.strip())
+    if not selected or not selected <= EVENT_TYPES:
+        raise HTTPException(status_code=400, detail=f"types must be among {sorted(EVENT_TYPES)}")
+    stream = _event_stream(
+        app.state.service.event_bus,
+        _resume_after(last_event_id, after),
+        settings.event_stream_heartbeat_seconds,
+        types=selected,
+    )
+    return _event_response(stream)
+
+
 @app.post("/v1/approvals/{approval_id}/approve")
-def approvals_approve(
+async def approvals_approve(
     approval_id: int,
     request: ApprovalDecisionRequest,
     x_approval_api_key: str | None = Header(default=None, alias="X-Approval-Api-Key"),
@@ -161,7 +681,7 @@ def approvals_approve(
             raise HTTPException(status_code=401, detail=identity)
         raise HTTPException(status_code=403, detail=identity)
 
-    approval = app.state.service.get_approval(approval_id)
+    approval = await _call_service("get_approval", approval_id)
     if approval is None:
         raise HTTPException(status_code=404, detail="approval not found")
     if approval.status != "pending":
@@ -178,7 +698,7 @@ def approvals_approve(
     )
     if not allowed:
         raise HTTPException(status_code=403, detail=reason)
-    status, result = app.state.service.approve(approval_id, approver, request.reason)
+    status, result = await _call_service("approve", approval_id, approver, request.reason)
     if status == "not_found":
         raise HTTPException(status_code=404, detail="approval not found")
     if status == "invalid_state":
@@ -187,7 +707,7 @@ def approvals_approve(
 
 
 @app.post("/v1/approvals/{approval_id}/deny")
-def approvals_deny(
+async def approvals_deny(
     approval_id: int,
     request: ApprovalDecisionRequest,
     x_approval_api_key: str | None = Header(default=None, alias="X-Approval-Api-Key"),
@@ -198,7 +718,7 @@ def approvals_deny(
             raise HTTPException(status_code=401, detail=identity)
         raise HTTPException(status_code=403, detail=identity)
 
-    approval = app.state.service.get_approval(approval_id)
+    approval = await _call_service("get_approval", approval_id)
     if approval is None:
         raise HTTPException(status_code=404, detail="approval not found")
     if approval.status != "pending":
@@ -215,7 +735,7 @@ def approvals_deny(
     )
     if not allowed:
         raise HTTPException(status_code=403, detail=reason)
-    status = app.state.service.deny(approval_id, approver, request.reason)
+    status = await _call_service("deny", approval_id, approver, request.reason)
     if status == "not_found":
         raise HTTPException(status_code=404, detail="approval not found")
     if status == "invalid_state":
@@ -224,7 +744,7 @@ def approvals_deny(
 
 
 @app.post("/v1/approvals/bulk")
-def approvals_bulk(
+async def approvals_bulk(
     request: BulkApprovalRequest,
     x_approval_api_key: str | None = Header(default=None, alias="X-Approval-Api-Key"),
 ) -> dict:
@@ -241,46 +761,61 @@ def approvals_bulk(
     if app.state.approval_api_auth.enabled:
         approver = identity
 
-    results: list[dict] = []
-    for approval_id in request.ids:
-        approval = app.state.service.get_approval(approval_id)
-        if approval is None:
-            results.append({"id": approval_id, "status": "not_found"})
-            continue
-        if approval.status != "pending":
-            results.append({"id": approval_id, "status": "invalid_state"})
-            continue
-
-        allowed, reason = app.state.approval_rbac.authorize(
-            decision=request.decision,
-            approver=approver,
-            risk_level=approval.risk_level,
+    def _authorize(risk_level: str) -> tuple[bool, str]:
+        return app.state.approval_rbac.authorize(
+            decision=request.decision, approver=approver, risk_level=risk_level
         )
-        if not allowed:
-            results.append({"id": approval_id, "status": "forbidden", "message": reason})
-            continue
-
-        if request.decision == "approve":
-            status, result = app.state.service.approve(
-                approval_id,
-                approver,
-                request.reason,
-            )
-            if status == "not_found":
-                results.append({"id": approval_id, "status": "not_found"})
-            elif status == "invalid_state":
-                results.append({"id": approval_id, "status": "invalid_state"})
-            else:
-                results.append({"id": approval_id, "status": status, "result": result})
-        else:
-            status = app.state.service.deny(approval_id, approver, request.reason)
-            results.append({"id": approval_id, "status": status})
+
+    results = await _call_service(
+        "decide_approvals",
+        request.ids,
+        request.decision,
+        approver,
+        request.reason,
+        _authorize,
+        settings.approval_bulk_concurrency,
+        settings.approval_bulk_per_repo_concurrency,
+    )
     return {"results": results}
 
 
+def audit_log_filter(
+    agent_id: str | None = None,
+    status: str | None = None,
+    repo: str | None = None,
+    action: str | None = None,
+    risk_level: str | None = None,
+    approval_id: int | None = None,
+    since: Annotated[datetime | None, Query(description="inclusive lower bound")] = None,
+    until: Annotated[datetime | None, Query(description="exclusive upper bound")] = None,
+) -> AuditLogFilter:
+    return AuditLogFilter(
+        agent_id=agent_id,
+        status=status,
+        repo=repo,
+        action=action,
+        risk_level=risk_level,
+        approval_id=approval_id,
+        since=since,
+        until=until,
+    )
+
+
 @app.get("/v1/audit", response_model=list[AuditLogView])
-def audit_logs() -> list[AuditLogView]:
-    rows = app.state.service.list_audit_logs()
+def audit_logs(
+    response: Response,
+    filters: Annotated[AuditLogFilter, Depends(audit_log_filter)],
+    limit: Annotated[int, Query(ge=1, le=AUDIT_PAGE_MAX_LIMIT)] = AUDIT_PAGE_DEFAULT_LIMIT,
+    cursor: str | None = None,
+) -> list[AuditLogView]:
+    try:
+        rows, next_cursor = app.state.service.query_audit_logs(
+            filters, limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [
         AuditLogView(
             id=row.id,
@@ -301,25 +836,98 @@ def audit_logs() -> list[AuditLogView]:
     ]
 
 
-@app.get("/v1/audit/export")
-def audit_export() -> dict:
-    rows = app.state.service.list_audit_logs()
-    lines = []
-    for row in rows:
-        payload = {
-            "id": row.id,
-            "timestamp": row.timestamp.isoformat(),
-            "agent_id": row.agent_id,
-            "tool": row.tool,
-            "action": row.action,
-            "repo": row.repo,
-            "risk_level": row.risk_level,
-            "schema_version": row.schema_version,
-            "status": row.status,
-            "request_payload": json.loads(row.request_payload),
-            "response_payload": json.loads(row.response_payload),
-            "approval_id": row.approval_id,
-            "message": row.message,
-        }
-        lines.append(json.dumps(payload))
-    return {"format": "jsonl", "lines": lines}
+def _audit_export_line(row: Row) -> str:
+    payload = {
+        "id": row.id,
+        "timestamp": row.timestamp.isoformat(),
+        "agent_id": row.agent_id,
+        "tool": row.tool,
+        "action": row.action,
+        "repo": row.repo,
+        "risk_level": row.risk_level,
+        "schema_version": row.schema_version,
+        "status": row.status,
+        "request_payload": json.loads(row.request_payload),
+        "response_payload": json.loads(row.response_payload),
+        "approval_id": row.approval_id,
+        "message": row.message,
+        "cursor": encode_cursor(row),
+    }
+    return json.dumps(payload) + "\n"
+
+
+def _gzip_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+@app.get(
+    "/v1/audit/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+def audit_export(
+    filters: Annotated[AuditLogFilter, Depends(audit_log_filter)],
+    cursor: Annotated[
+        str | None, Query(description="resume after the line carrying this cursor")
+    ] = None,
+    gzip: bool = False,
+) -> StreamingResponse:
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    rows = app.state.service.iter_audit_logs(
+        filters, cursor=cursor, chunk_size=settings.audit_export_chunk_size
+    )
+    chunk_rows = settings.audit_export_chunk_size
+
+    def _lines() -> Iterator[bytes]:
+        buffer: list[str] = []
+        for row in rows:
+            buffer.append(_audit_export_line(row))
+            if len(buffer) >= chunk_rows:
+                yield "".join(buffer).encode("utf-8")
+                buffer.clear()
+        if buffer:
+            yield "".join(buffer).encode("utf-8")
+
+    headers = {"Content-Disposition": 'attachment; filename="audit-export.jsonl"'}
+    body = _lines()
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+        body = _gzip_stream(body)
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+
+@app.get("/v1/audit/partitions")
+def audit_partitions() -> dict[str, object]:
+    manager = app.state.service.audit_partitions
+    maintenance = getattr(app.state, "audit_maintenance", None)
+    partitions = manager.partitions() if manager is not None else []
+    return {
+        "enabled": manager is not None,
+        "partitions": [
+            {
+                "name": partition.name,
+                "start": partition.start.isoformat() if partition.start else None,
+                "end": partition.end.isoformat() if partition.end else None,
+            }
+            for partition in partitions
+        ],
+        "maintenance": (
+            {
+                "runs": maintenance.runs,
+                "failed_runs": maintenance.failed_runs,
+                "last_result": maintenance.last_result,
+            }
+            if maintenance is not None
+            else None
+        ),
+    }
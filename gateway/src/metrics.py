@@ -0,0 +1,238 @@
+import logging
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+# Seconds; spans a cached policy decision (~µs) up to a slow GitHub call.
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+logger = logging.getLogger(__name__)
+
+Labels = tuple[str, ...]
+Sample = tuple[Labels, float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values, strict=True)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Labels = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            samples = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in samples:
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Histogram:
+    """Latency histogram with fixed buckets; ``observe`` is a bisect and two adds."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: per-bucket counts (last slot is +Inf), then sum.
+        self._series: dict[Labels, tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def snapshot(self, *labels: str) -> tuple[int, float]:
+        """``(count, sum)`` for one label set."""
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                return 0, 0.0
+            return sum(series[0]), series[1][0]
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted(
+                (labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()
+            )
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    (*self.labelnames, "le"), (*labels, _format_value(bound))
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {_format_value(total)}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class CallbackMetric:
+    """Gauge or counter read from existing state at scrape time, off the request path."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        kind: str,
+        collect: Callable[[], Iterable[Sample]],
+        labelnames: Labels = (),
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.collect = collect
+        self.labelnames = labelnames
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            samples = list(self.collect())
+        except Exception as exc:
+            # One failing source (e.g. the database) must not hide the other metrics.
+            logger.warning("metric %s collection failed: %s", self.name, exc)
+            return lines
+        for labels, value in samples:
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            )
+        return lines
+
+
+class _StageTimer:
+    __slots__ = ("histogram", "stage", "started")
+
+    def __init__(self, histogram: Histogram, stage: str):
+        self.histogram = histogram
+        self.stage = stage
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *_exc: object) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, self.stage)
+
+
+class GatewayMetrics:
+    """In-process metrics registry rendered in the Prometheus text format.
+
+    Tool-call stages are ``request_hash``, ``policy_decide``, ``idempotency_lookup``,
+    ``connector_execute``, ``db_commit`` and ``audit_emit``. The request path only
+    touches ``time`` and ``count_outcome``: each is a lock, a dict lookup and an add.
+    Gauges such as pending approvals and queue depths are
+    registered with ``add_callback`` and read when ``/metrics`` is scraped.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.stage_seconds = Histogram(
+            "agent2allow_tool_call_stage_seconds",
+            "Time spent in each stage of handling a tool call.",
+            ("stage",),
+            buckets,
+        )
+        self.outcomes = Counter(
+            "agent2allow_tool_call_outcomes_total",
+            "Committed audit rows by status, tool, action and risk level.",
+            ("status", "tool", "action", "risk_level"),
+        )
+        self._metrics: list[Counter | Histogram | CallbackMetric] = [
+            self.stage_seconds,
+            self.outcomes,
+        ]
+        self._lock = threading.Lock()
+
+    def time(self, stage: str) -> _StageTimer:
+        return _StageTimer(self.stage_seconds, stage)
+
+    def count_outcome(self, status: str, tool: str, action: str, risk_level: str) -> None:
+        self.outcomes.inc(status, tool, action, risk_level)
+
+    def add_callback(
+        self,
+        name: str,
+        help_text: str,
+        collect: Callable[[], Iterable[Sample]],
+        *,
+        kind: str = "gauge",
+        labelnames: Labels = (),
+    ) -> None:
+        if kind not in {"gauge", "counter"}:
+            raise ValueError(f"unsupported callback metric type: {kind}")
+        with self._lock:
+            self._metrics.append(CallbackMetric(name, help_text, kind, collect, labelnames))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def build_metrics(*, enabled: bool) -> GatewayMetrics | None:
+    if not enabled:
+        return None
+    return GatewayMetrics()
@@ -0,0 +1,174 @@
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    DateTime,
+    Engine,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    insert,
+    inspect,
+    select,
+    text,
+)
+
+from .models import ApprovalJob, AuditLog, Base, IdempotencyRecord
+
+logger = logging.getLogger(__name__)
+
+# Key for pg_advisory_xact_lock; replicas starting together apply migrations one at a time.
+MIGRATION_LOCK_ID = 0x61326177
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(256), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _create_tables(connection: Connection) -> None:
+    Base.metadata.create_all(bind=connection)
+
+
+def _add_audit_schema_version(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("audit_logs")}
+    if "schema_version" not in columns:
+        connection.execute(
+            text("ALTER TABLE audit_logs ADD COLUMN schema_version INTEGER NOT NULL DEFAULT 1")
+        )
+
+
+def _audit_keyset_indexes(connection: Connection) -> None:
+    # Single-column indexes superseded by the composite (column, timestamp, id) ones.
+    for name in ("ix_audit_logs_timestamp", "ix_audit_logs_agent_id", "ix_audit_logs_status"):
+        connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    # create_all skips indexes on tables that already exist.
+    for index in AuditLog.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+
+def _audit_logs_indexes(connection: Connection) -> None:
+    for index in AuditLog.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+
+def _partition_audit_logs(connection: Connection) -> None:
+    """Formerly converted ``audit_logs`` to a partitioned table on PostgreSQL.
+
+    The conversion is opt-in now: ``PostgresAuditPartitions`` runs it on its first
+    maintenance pass when ``AUDIT_PARTITION_INTERVAL`` is set. Databases that
+    already applied this step stay partitioned.
+    """
+
+
+def _idempotency_created_at_index(connection: Connection) -> None:
+    for index in IdempotencyRecord.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+
+def _create_approval_jobs(connection: Connection) -> None:
+    ApprovalJob.__table__.create(bind=connection, checkfirst=True)
+
+
+def _not_null(column: Column) -> str:
+    """Select ``column`` from a legacy table whose columns were all nullable."""
+    if column.nullable or column.primary_key:
+        return column.name
+    default = column.default.arg if column.default is not None else None
+    if isinstance(column.type, DateTime):
+        # Very old rows without a timestamp sort first.
+        fill = "'1970-01-01 00:00:00.000000'"
+    elif isinstance(column.type, Integer):
+        fill = str(default if isinstance(default, int) else 0)
+    else:
+        fill = "'" + (default if isinstance(default, str) else "").replace("'", "''") + "'"
+    return f"COALESCE({column.name}, {fill})"
+
+
+def _audit_ids_autoincrement(connection: Connection) -> None:
+    """SQLite: rebuild ``audit_logs`` with AUTOINCREMENT so ids are never handed out twice.
+
+    Without it SQLite reuses ids once compaction has emptied the table. PostgreSQL
+    sequences never go backwards, so there is nothing to do there.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    created = connection.scalar(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'audit_logs'")
+    )
+    if created is None or "AUTOINCREMENT" in created.upper():
+        return
+    for index in inspect(connection).get_indexes("audit_logs"):
+        connection.execute(text(f"DROP INDEX IF EXISTS {index['name']}"))
+    connection.execute(text("ALTER TABLE audit_logs RENAME TO _audit_logs_rebuild"))
+    AuditLog.__table__.create(bind=connection)
+    columns = list(AuditLog.__table__.columns)
+    connection.execute(
+        text(
+            f"INSERT INTO audit_logs ({', '.join(column.name for column in columns)}) "
+            f"SELECT {', '.join(_not_null(column) for column in columns)} "
+            "FROM _audit_logs_rebuild"
+        )
+    )
+    connection.execute(text("DROP TABLE _audit_logs_rebuild"))
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "create tables", _create_tables),
+    Migration(2, "audit_logs.schema_version column", _add_audit_schema_version),
+    Migration(3, "audit_logs keyset indexes", _audit_keyset_indexes),
+    Migration(4, "partition audit_logs by timestamp", _partition_audit_logs),
+    Migration(5, "idempotency_records.created_at index", _idempotency_created_at_index),
+    Migration(6, "approval_jobs table", _create_approval_jobs),
+    Migration(7, "audit_logs ids never reused", _audit_ids_autoincrement),
+    Migration(8, "audit_logs risk_level index", _audit_logs_indexes),
+)
+
+
+def run_migrations(
+    engine: Engine, migrations: tuple[Migration, ...] = MIGRATIONS
+) -> list[int]:
+    """Apply pending migrations in version order and return the versions applied.
+
+    Everything runs in one transaction. On PostgreSQL it first takes an advisory
+    lock, so replicas that start together wait for the first one and then find
+    nothing left to do.
+    """
+    applied_now: list[int] = []
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SET LOCAL statement_timeout = 0"))
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID}
+            )
+        schema_migrations.create(bind=connection, checkfirst=True)
+        applied = set(connection.scalars(select(schema_migrations.c.version)))
+        for migration in sorted(migrations, key=lambda m: m.version):
+            if migration.version in applied:
+                continue
+            logger.info("applying migration %d: %s", migration.version, migration.description)
+            migration.apply(connection)
+            connection.execute(
+                insert(schema_migrations).values(
+                    version=migration.version,
+                    description=migration.description,
+                    applied_at=datetime.now(UTC),
+                )
+            )
+            applied_now.append(migration.version)
+    return applied_now
@@ -1,6 +1,6 @@
 from datetime import UTC, datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -28,20 +28,49 @@ class Approval(Base):
     )
 
 
+class ApprovalJob(Base):
+    __tablename__ = "approval_jobs"
+    # Workers claim the oldest queued (or lease-expired running) job.
+    __table_args__ = (Index("ix_approval_jobs_status_id", "status", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    approval_id: Mapped[int] = mapped_column(ForeignKey("approvals.id"), unique=True)
+    repo: Mapped[str] = mapped_column(String(256))
+    status: Mapped[str] = mapped_column(String(16))
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    worker_id: Mapped[str] = mapped_column(String(128), default="")
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str] = mapped_column(Text, default="")
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    # Keyset pagination walks (timestamp, id); each filterable column leads its own
+    # composite index so filtered pages are served in index order without a sort.
+    __table_args__ = (
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_audit_logs_agent_id_timestamp", "agent_id", "timestamp", "id"),
+        Index("ix_audit_logs_status_timestamp", "status", "timestamp", "id"),
+        Index("ix_audit_logs_repo_timestamp", "repo", "timestamp", "id"),
+        Index("ix_audit_logs_action_timestamp", "action", "timestamp", "id"),
+        Index("ix_audit_logs_risk_level_timestamp", "risk_level", "timestamp", "id"),
+        Index("ix_audit_logs_approval_id_timestamp", "approval_id", "timestamp", "id"),
+        # Ids are never reused, even after compaction empties the table: partition
+        # files and keyset cursors rely on an id naming exactly one row.
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    timestamp: Mapped[datetime] = mapped_column(
-        DateTime, default=lambda: datetime.now(UTC), index=True
-    )
-    agent_id: Mapped[str] = mapped_column(String(128), index=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
+    agent_id: Mapped[str] = mapped_column(String(128))
     tool: Mapped[str] = mapped_column(String(128))
     action: Mapped[str] = mapped_column(String(128))
     repo: Mapped[str] = mapped_column(String(256))
     risk_level: Mapped[str] = mapped_column(String(16))
     schema_version: Mapped[int] = mapped_column(Integer, default=1)
-    status: Mapped[str] = mapped_column(String(64), index=True)
+    status: Mapped[str] = mapped_column(String(64))
     request_payload: Mapped[str] = mapped_column(Text)
     response_payload: Mapped[str] = mapped_column(Text, default="{}")
     approval_id: Mapped[int | None] = mapped_column(ForeignKey("approvals.id"), nullable=True)
@@ -55,4 +84,6 @@ class IdempotencyRecord(Base):
     key: Mapped[str] = mapped_column(String(128), unique=True, index=True)
     request_hash: Mapped[str] = mapped_column(String(64), index=True)
     response_payload: Mapped[str] = mapped_column(Text)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(UTC), index=True
+    )
@@ -1,10 +1,14 @@
 import fnmatch
+import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 
 import yaml
 
 RISK_LEVELS_REQUIRING_APPROVAL = {"medium", "high"}
+GLOB_CHARS = frozenset("*?[")
 
 
 @dataclass
@@ -25,54 +29,287 @@ class PolicyRule:
     approval_required: bool | None
 
 
+def _is_literal(pattern: str) -> bool:
+    return not GLOB_CHARS.intersection(pattern)
+
+
+def _compile_glob(pattern: str) -> re.Pattern[str]:
+    return re.compile(fnmatch.translate(pattern))
+
+
+def _repo_owner_key(repo_pattern: str) -> str | None:
+    owner, sep, _ = repo_pattern.partition("/")
+    if sep and _is_literal(owner):
+        return owner
+    return None
+
+
+class _ToolBucket:
+    """Rule index for one tool.
+
+    Every entry carries the position of its rule in the policy file so lookups can
+    return the lowest matching position and keep first-match-wins semantics. Repo
+    globs with a literal owner (``acme/*``) are keyed by that owner so only the
+    globs that can possibly match are evaluated.
+    """
+
+    def __init__(self) -> None:
+        self.exact: dict[tuple[str, str], int] = {}
+        self.by_action: dict[tuple[str, str | None], list[tuple[int, re.Pattern[str]]]] = {}
+        self.by_repo: dict[str, list[tuple[int, re.Pattern[str]]]] = {}
+        self.wildcard: dict[str | None, list[tuple[int, re.Pattern[str], re.Pattern[str]]]] = {}
+
+    def add(self, position: int, action: str, repo: str) -> None:
+        action_literal = _is_literal(action)
+        repo_literal = _is_literal(repo)
+        if action_literal and repo_literal:
+            self.exact.setdefault((action, repo), position)
+        elif action_literal:
+            key = (action, _repo_owner_key(repo))
+            self.by_action.setdefault(key, []).append((position, _compile_glob(repo)))
+        elif repo_literal:
+            self.by_repo.setdefault(repo, []).append((position, _compile_glob(action)))
+        else:
+            self.wildcard.setdefault(_repo_owner_key(repo), []).append(
+                (position, _compile_glob(action), _compile_glob(repo))
+            )
+
+    def first_match(self, action: str, repo: str) -> int | None:
+        owner, sep, _ = repo.partition("/")
+        owner_keys: tuple[str | None, ...] = (owner, None) if sep else (None,)
+
+        best = self.exact.get((action, repo))
+        for owner_key in owner_keys:
+            for position, pattern in self.by_action.get((action, owner_key), ()):
+                if best is not None and position >= best:
+                    break
+                if pattern.match(repo):
+                    best = position
+                    break
+        for position, pattern in self.by_repo.get(repo, ()):
+            if best is not None and position >= best:
+                break
+            if pattern.match(action):
+                best = position
+                break
+        for owner_key in owner_keys:
+            for position, action_pattern, repo_pattern in self.wildcard.get(owner_key, ()):
+                if best is not None and position >= best:
+                    break
+                if action_pattern.match(action) and repo_pattern.match(repo):
+                    best = position
+                    break
+        return best
+
+
+class CompiledRuleSet:
+    """Policy rules indexed for lookup, built once per policy load.
+
+    Literal action/repo pairs resolve through a hash lookup and glob patterns are
+    pre-compiled, so decisions no longer scan and re-match every rule.
+    """
+
+    def __init__(self, rules: list[PolicyRule]):
+        self.rules = rules
+        self._buckets: dict[str, _ToolBucket] = {}
+        for position, rule in enumerate(rules):
+            bucket = self._buckets.setdefault(rule.tool, _ToolBucket())
+            for action in rule.actions:
+                bucket.add(position, action, rule.repo)
+
+    def match(self, tool: str, action: str, repo: str) -> PolicyRule | None:
+        bucket = self._buckets.get(tool)
+        if bucket is None:
+            return None
+        position = bucket.first_match(action, repo)
+        if position is None:
+            return None
+        return self.rules[position]
+
+
+class DecisionCache:
+    """Bounded LRU of policy decisions keyed on ``(tool, action, repo)``.
+
+    Entries are tagged with the policy generation they were computed under and are
+    only served while that generation is current.
+    """
+
+    def __init__(self, max_entries: int):
+        if max_entries <= 0:
+            raise ValueError("decision cache size must be positive")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[str, str, str], tuple[int, PolicyDecision]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str, str], generation: int) -> PolicyDecision | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple[str, str, str], generation: int, decision: PolicyDecision) -> None:
+        with self._lock:
+            self._entries[key] = (generation, decision)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "max_entries": self.max_entries,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+@dataclass(frozen=True)
+class PolicySnapshot:
+    """Fully built policy state, swapped into the engine as a single reference."""
+
+    rules: list[PolicyRule]
+    deny_by_default: bool
+    rule_set: CompiledRuleSet
+    generation: int
+    signature: tuple[int, int, int] | None
+
+
+def file_signature(path: Path) -> tuple[int, int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def parse_policy(text: str) -> tuple[list[PolicyRule], bool]:
+    payload = yaml.safe_load(text) or {}
+    if not isinstance(payload, dict):
+        raise ValueError("policy root must be a mapping")
+    defaults = payload.get("defaults", {}) or {}
+    if not isinstance(defaults, dict):
+        raise ValueError("defaults must be a mapping")
+    items = payload.get("rules", []) or []
+    if not isinstance(items, list):
+        raise ValueError("rules must be a list")
+
+    parsed: list[PolicyRule] = []
+    for idx, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get("tool"), str):
+            raise ValueError(f"rules[{idx}] must be a mapping with a tool")
+        actions = item.get("actions", [])
+        if not isinstance(actions, list):
+            raise ValueError(f"rules[{idx}].actions must be a list")
+        parsed.append(
+            PolicyRule(
+                tool=item["tool"],
+                actions=[str(action) for action in actions],
+                repo=str(item.get("repo", "*")),
+                risk=item.get("risk", "read"),
+                allow=bool(item.get("allow", False)),
+                approval_required=item.get("approval_required"),
+            )
+        )
+    return parsed, bool(defaults.get("deny_by_default", True))
+
+
 class PolicyEngine:
-    def __init__(self, policy_path: str):
+    def __init__(
+        self,
+        policy_path: str,
+        decision_cache_size: int = 0,
+        reload_on_decide: bool = True,
+    ):
         self.policy_path = Path(policy_path)
-        self._loaded_mtime = 0.0
-        self.rules: list[PolicyRule] = []
-        self.deny_by_default = True
+        self.reload_on_decide = reload_on_decide
+        self.decision_cache = DecisionCache(decision_cache_size) if decision_cache_size else None
+        self._snapshot = PolicySnapshot([], True, CompiledRuleSet([]), 0, (0, 0, 0))
+        self._load_lock = threading.Lock()
         self.load()
 
-    def load(self) -> None:
-        if not self.policy_path.exists():
-            self.rules = []
-            self.deny_by_default = True
-            return
-
-        mtime = self.policy_path.stat().st_mtime
-        if mtime == self._loaded_mtime:
-            return
-
-        payload = yaml.safe_load(self.policy_path.read_text(encoding="utf-8")) or {}
-        defaults = payload.get("defaults", {})
-        self.deny_by_default = bool(defaults.get("deny_by_default", True))
-
-        parsed: list[PolicyRule] = []
-        for item in payload.get("rules", []):
-            parsed.append(
-                PolicyRule(
-                    tool=item["tool"],
-                    actions=item.get("actions", []),
-                    repo=item.get("repo", "*"),
-                    risk=item.get("risk", "read"),
-                    allow=bool(item.get("allow", False)),
-                    approval_required=item.get("approval_required"),
+    @property
+    def rules(self) -> list[PolicyRule]:
+        return self._snapshot.rules
+
+    @property
+    def deny_by_default(self) -> bool:
+        return self._snapshot.deny_by_default
+
+    @property
+    def generation(self) -> int:
+        return self._snapshot.generation
+
+    def load(self) -> bool:
+        """Reload the policy file if it changed on disk; returns True when swapped."""
+        signature = file_signature(self.policy_path)
+        if signature == self._snapshot.signature:
+            return False
+
+        with self._load_lock:
+            current = self._snapshot
+            signature = file_signature(self.policy_path)
+            if signature == current.signature:
+                return False
+
+            if signature is None:
+                rules: list[PolicyRule] = []
+                deny_by_default = True
+            else:
+                rules, deny_by_default = parse_policy(
+                    self.policy_path.read_text(encoding="utf-8")
                 )
+            self._snapshot = PolicySnapshot(
+                rules=rules,
+                deny_by_default=deny_by_default,
+                rule_set=CompiledRuleSet(rules),
+                generation=current.generation + 1,
+                signature=signature,
             )
-        self.rules = parsed
-        self._loaded_mtime = mtime
+        if self.decision_cache is not None:
+            self.decision_cache.clear()
+        return True
+
+    def cache_stats(self) -> dict[str, int | bool]:
+        if self.decision_cache is None:
+            return {"enabled": False, "generation": self.generation}
+        return {"enabled": True, "generation": self.generation, **self.decision_cache.stats()}
 
     def decide(self, tool: str, action: str, repo: str) -> PolicyDecision:
-        self.load()
+        if self.reload_on_decide:
+            self.load()
+        snapshot = self._snapshot
+
+        if self.decision_cache is None:
+            return self._evaluate(snapshot, tool, action, repo)
 
-        for rule in self.rules:
-            if rule.tool != tool:
-                continue
-            if not any(fnmatch.fnmatch(action, pattern) for pattern in rule.actions):
-                continue
-            if not fnmatch.fnmatch(repo, rule.repo):
-                continue
+        key = (tool, action, repo)
+        cached = self.decision_cache.get(key, snapshot.generation)
+        if cached is not None:
+            return cached
+        decision = self._evaluate(snapshot, tool, action, repo)
+        self.decision_cache.put(key, snapshot.generation, decision)
+        return decision
 
+    @staticmethod
+    def _evaluate(snapshot: PolicySnapshot, tool: str, action: str, repo: str) -> PolicyDecision:
+        rule = snapshot.rule_set.match(tool, action, repo)
+        if rule is not None:
             if not rule.allow:
                 return PolicyDecision(False, False, rule.risk, "policy denies action")
 
@@ -83,6 +320,6 @@ class PolicyEngine:
 
             return PolicyDecision(True, approval_required, rule.risk, "policy allows action")
 
-        if self.deny_by_default:
+        if snapshot.deny_by_default:
             return PolicyDecision(False, False, "unknown", "no matching allow rule")
         return PolicyDecision(True, False, "low", "default allow")
@@ -0,0 +1,170 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import sys
+import threading
+from pathlib import Path
+
+from .policy import PolicyEngine, file_signature
+
+logger = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+
+
+class _InotifyWaiter:
+    """Blocks until the policy directory changes, using Linux inotify via libc.
+
+    The parent directory is watched rather than the file so atomic rename swaps
+    (editors, Kubernetes ConfigMap ``..data`` symlink flips) are observed.
+    """
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+        self.fd = fd
+
+    def wait(self, timeout: float) -> bool:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _open_inotify(directory: Path) -> _InotifyWaiter | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return _InotifyWaiter(directory)
+    except (OSError, AttributeError) as exc:
+        logger.info("inotify unavailable for %s, falling back to polling: %s", directory, exc)
+        return None
+
+
+class PolicyWatcher:
+    """Reloads the policy off the request path and swaps it into the engine.
+
+    While the watcher runs, ``PolicyEngine.decide`` no longer touches the
+    filesystem. A policy that fails to parse is logged and the previously loaded
+    rule set keeps serving.
+    """
+
+    def __init__(
+        self,
+        engine: PolicyEngine,
+        *,
+        poll_interval_seconds: float = 2.0,
+        use_inotify: bool = True,
+        debounce_seconds: float = 0.05,
+    ):
+        if poll_interval_seconds <= 0:
+            raise ValueError("policy watch poll interval must be positive")
+        self.engine = engine
+        self.poll_interval_seconds = poll_interval_seconds
+        self.use_inotify = use_inotify
+        self.debounce_seconds = debounce_seconds
+        self.reloads = 0
+        self.failed_reloads = 0
+        self._failed_signature: tuple[int, int, int] | None = None
+        self._inotify: _InotifyWaiter | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify is not None else "poll"
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        if self.use_inotify:
+            self._inotify = _open_inotify(self.engine.policy_path.absolute().parent)
+        self.engine.reload_on_decide = False
+        self.reload()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="agent2allow-policy-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def reload(self) -> bool:
+        signature = file_signature(self.engine.policy_path)
+        if signature is not None and signature == self._failed_signature:
+            return False
+        try:
+            swapped = self.engine.load()
+        except Exception as exc:
+            self._failed_signature = signature
+            self.failed_reloads += 1
+            logger.warning(
+                "policy reload failed, keeping generation %s: %s", self.engine.generation, exc
+            )
+            return False
+        self._failed_signature = None
+        if swapped:
+            self.reloads += 1
+        return swapped
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._inotify is not None:
+                changed = self._inotify.wait(self.poll_interval_seconds)
+                if changed and self._stop.wait(self.debounce_seconds):
+                    break
+            elif self._stop.wait(self.poll_interval_seconds):
+                break
+            self.reload()
+
+
+def build_policy_watcher(
+    engine: PolicyEngine,
+    *,
+    mode: str,
+    poll_interval_seconds: float,
+) -> PolicyWatcher | None:
+    normalized = mode.lower().strip()
+    if normalized in {"", "per_request"}:
+        return None
+    if normalized == "watch":
+        return PolicyWatcher(engine, poll_interval_seconds=poll_interval_seconds)
+    if normalized == "poll":
+        return PolicyWatcher(
+            engine,
+            poll_interval_seconds=poll_interval_seconds,
+            use_inotify=False,
+        )
+    raise ValueError(f"unsupported policy reload mode: {mode}")
@@ -21,6 +21,14 @@ class ToolCallResponse(BaseModel):
     idempotent_replay: bool = False
 
 
+class ToolCallBatchRequest(BaseModel):
+    calls: list[ToolCallRequest] = Field(min_length=1)
+
+
+class ToolCallBatchResponse(BaseModel):
+    results: list[ToolCallResponse]
+
+
 class ApprovalDecisionRequest(BaseModel):
     approver: str = "human"
     reason: str = ""
@@ -46,6 +54,12 @@ class ApprovalView(BaseModel):
     updated_at: datetime
 
 
+class ApprovalOutcomeView(ApprovalView):
+    result: dict[str, Any] | None = None
+    # True when the wait ended before the approval reached a final state.
+    timed_out: bool = False
+
+
 class AuditLogView(BaseModel):
     id: int
     timestamp: datetime
@@ -1,14 +1,30 @@
 import json
-from collections.abc import Callable
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from hashlib import sha256
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import Delete, Row, Select, delete, func, inspect, select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from .approval_queue import DONE, FAILED, ApprovalJobQueue, ClaimedJob
+from .audit_partitions import AuditPartitionManager
+from .audit_query import AuditLogFilter, audit_log_query, encode_cursor
 from .audit_sink import AuditSinkContract, NoopAuditSink, safe_emit
+from .audit_writer import AuditWriter
+from .coalescing import RequestCoalescer
 from .connectors.contracts import GithubConnectorContract
+from .connectors.resilience import CircuitOpenError
+from .event_bus import EventBus
+from .idempotency import IdempotencyCache, expiry_cutoff
+from .metrics import GatewayMetrics
 from .models import Approval, AuditLog, IdempotencyRecord
 from .policy import PolicyDecision, PolicyEngine
 from .schemas import ToolCallRequest
@@ -18,6 +34,67 @@ class IdempotencyConflictError(ValueError):
     pass
 
 
+class ToolCallRejectedError(Exception):
+    """A streamed call that policy did not let run; it has already been audited.
+
+    ``status`` is ``denied``, or ``pending_approval`` with the new ``approval_id``.
+    """
+
+    def __init__(self, status: str, message: str, approval_id: int | None = None):
+        super().__init__(message)
+        self.status = status
+        self.approval_id = approval_id
+
+
+# Pagination params of issues.list; other params are passed through unchanged.
+PAGE_PARAMS = ("per_page", "max_pages", "cursor")
+
+
+# Actions each connector implements. Outcome metrics count any other tool or action
+# as "other", so request strings cannot add time series.
+CONNECTOR_ACTIONS = {
+    "github": frozenset({"issues.list", "issues.set_labels", "issues.create_comment"}),
+}
+
+# Message of an executed read call that shared another in-flight call's upstream request.
+COALESCED_MESSAGE = "executed (coalesced)"
+
+# Approval state after an audited transition; execution failures leave it "failed".
+_APPROVAL_STATES = {
+    "pending_approval": "pending",
+    "approved": "approved",
+    "denied_by_human": "denied",
+    "executed": "executed",
+}
+
+ToolCallOutcome = tuple[str, str, dict | None, int | None, bool]
+
+# (approval result entry, approval, request payload) for an approval claimed by a bulk decision.
+_ClaimedApproval = tuple[dict, Approval, dict]
+
+
+@dataclass
+class _BatchItem:
+    request: ToolCallRequest
+    request_hash: str
+    decision: PolicyDecision
+    status: str = ""
+    message: str = ""
+    result: dict | None = None
+    approval: Approval | None = None
+    duplicate_of: "_BatchItem | None" = None
+    response: ToolCallOutcome | None = None
+
+    @property
+    def needs_execution(self) -> bool:
+        return (
+            self.response is None
+            and self.duplicate_of is None
+            and self.decision.allowed
+            and not self.decision.approval_required
+        )
+
+
 class Agent2AllowService:
     audit_schema_version = 1
 
@@ -27,6 +104,14 @@ class Agent2AllowService:
         policy_engine: PolicyEngine,
         github_client: GithubConnectorContract,
         audit_sink: AuditSinkContract | None = None,
+        audit_writer: AuditWriter | None = None,
+        audit_partitions: AuditPartitionManager | None = None,
+        idempotency_ttl_seconds: int = 0,
+        idempotency_cache: IdempotencyCache | None = None,
+        coalescer: RequestCoalescer | None = None,
+        approval_queue: ApprovalJobQueue | None = None,
+        event_bus: EventBus | None = None,
+        metrics: GatewayMetrics | None = None,
     ):
         if not isinstance(github_client, GithubConnectorContract):
             raise TypeError("github_client does not satisfy GithubConnectorContract")
@@ -34,6 +119,22 @@ class Agent2AllowService:
         self.policy_engine = policy_engine
         self.github_client = github_client
         self.audit_sink = audit_sink or NoopAuditSink()
+        self.audit_writer = audit_writer
+        self.audit_partitions = audit_partitions
+        self.idempotency_ttl_seconds = idempotency_ttl_seconds
+        self.idempotency_cache = idempotency_cache
+        self.coalescer = coalescer
+        self.approval_queue = approval_queue
+        self.event_bus = event_bus or EventBus()
+        self.metrics = metrics
+
+    def _timed(self, stage: str) -> AbstractContextManager[None]:
+        """Time ``stage`` into the metrics histogram, or do nothing when metrics are off."""
+        return self.metrics.time(stage) if self.metrics is not None else nullcontext()
+
+    def _decide(self, request: ToolCallRequest) -> PolicyDecision:
+        with self._timed("policy_decide"):
+            return self.policy_engine.decide(request.tool, request.action, request.repo)
 
     def _audit(
         self,
@@ -50,65 +151,300 @@ class Agent2AllowService:
         approval_id: int | None = None,
         message: str = "",
     ) -> None:
-        entry = AuditLog(
-            timestamp=datetime.now(UTC),
-            agent_id=agent_id,
-            tool=tool,
-            action=action,
-            repo=repo,
-            risk_level=risk_level,
-            schema_version=self.audit_schema_version,
-            status=status,
-            request_payload=json.dumps(request_payload),
-            response_payload=json.dumps(response_payload or {}),
-            approval_id=approval_id,
-            message=message,
-        )
-        db.add(entry)
-        db.commit()
-        safe_emit(
-            self.audit_sink,
-            {
-                "timestamp": entry.timestamp.isoformat(),
-                "agent_id": entry.agent_id,
-                "tool": entry.tool,
-                "action": entry.action,
-                "repo": entry.repo,
-                "risk_level": entry.risk_level,
-                "schema_version": entry.schema_version,
-                "status": entry.status,
-                "request_payload": request_payload,
-                "response_payload": response_payload or {},
-                "approval_id": approval_id,
-                "message": message,
-            },
-        )
+        row = {
+            "timestamp": datetime.now(UTC),
+            "agent_id": agent_id,
+            "tool": tool,
+            "action": action,
+            "repo": repo,
+            "risk_level": risk_level,
+            "schema_version": self.audit_schema_version,
+            "status": status,
+            "request_payload": json.dumps(request_payload),
+            "response_payload": json.dumps(response_payload or {}),
+            "approval_id": approval_id,
+            "message": message,
+        }
+        log = None
+        if self.audit_writer is None:
+            log = AuditLog(**row)
+            db.add(log)
+        else:
+            db.info.setdefault("audit_rows", []).append(row)
+        event = {
+            **row,
+            "timestamp": row["timestamp"].isoformat(),
+            "request_payload": request_payload,
+            "response_payload": response_payload or {},
+        }
+        db.info.setdefault("audit_events", []).append(event)
+        db.info.setdefault("audit_deltas", []).append((log, event))
+        if approval_id is not None:
+            # Every approval transition is audited; publish it once the commit lands.
+            db.info.setdefault("approval_events", []).append(
+                {
+                    "approval_id": approval_id,
+                    "status": _APPROVAL_STATES.get(status, "failed"),
+                    "audit_status": status,
+                    "tool": tool,
+                    "repo": repo,
+                    "action": action,
+                    "risk_level": risk_level,
+                    "timestamp": row["timestamp"].isoformat(),
+                }
+            )
 
-    def _execute(self, request: ToolCallRequest) -> dict:
+    def _publish_committed_events(self, db: Session | AsyncSession) -> None:
+        for event in db.info.pop("approval_events", []):
+            self.event_bus.publish("approval", event)
+        for log, event in db.info.pop("audit_deltas", []):
+            # The row's key survives the commit's expiry; rows left to the audit
+            # writer have no id until it inserts them.
+            identity = inspect(log).identity if log is not None else None
+            self.event_bus.publish("audit", {"id": identity[0] if identity else None, **event})
+            if self.metrics is not None:
+                tool, action = event["tool"], event["action"]
+                actions = CONNECTOR_ACTIONS.get(tool)
+                if actions is None:
+                    tool, action = "other", "other"
+                elif action not in actions:
+                    action = "other"
+                self.metrics.count_outcome(event["status"], tool, action, event["risk_level"])
+
+    def _cache_committed_keys(self, db: Session | AsyncSession) -> None:
+        committed = db.info.pop("idempotency_records", [])
+        if self.idempotency_cache is not None:
+            for key, request_hash, response_payload, created_at in committed:
+                self.idempotency_cache.put(key, request_hash, response_payload, created_at)
+
+    def _commit(self, db: Session) -> None:
+        """Commit the unit of work, then hand its audit rows to the writer or sink."""
+        with self._timed("db_commit"):
+            db.commit()
+        self._cache_committed_keys(db)
+        self._publish_committed_events(db)
+        rows = db.info.pop("audit_rows", [])
+        events = db.info.pop("audit_events", [])
+        with self._timed("audit_emit"):
+            if self.audit_writer is not None:
+                self.audit_writer.submit(rows, events)
+                return
+            for event in events:
+                safe_emit(self.audit_sink, event)
+
+    def _connector_call(self, request: ToolCallRequest) -> tuple[str, tuple[Any, ...]]:
         if request.tool != "github":
             raise ValueError("unsupported tool")
 
         if request.action == "issues.list":
             state = str(request.params.get("state", "open"))
-            return self.github_client.list_issues(request.repo, state=state)
+            if not any(name in request.params for name in PAGE_PARAMS):
+                return "list_issues", (request.repo, state)
+            return "list_issues", (request.repo, state, *self._page_args(request.params, 1))
 
         if request.action == "issues.set_labels":
             issue_number = int(request.params["issue_number"])
             labels = list(request.params["labels"])
-            return self.github_client.set_labels(request.repo, issue_number, labels)
+            return "set_labels", (request.repo, issue_number, labels)
 
         if request.action == "issues.create_comment":
             issue_number = int(request.params["issue_number"])
             body = str(request.params["body"])
-            return self.github_client.create_comment(request.repo, issue_number, body)
+            return "create_comment", (request.repo, issue_number, body)
 
         raise ValueError("unsupported action")
 
+    @staticmethod
+    def _page_args(
+        params: dict, default_max_pages: int | None
+    ) -> tuple[int | None, int | None, str | None]:
+        """``(per_page, max_pages, cursor)``; an explicit null ``max_pages`` means every page."""
+        per_page = params.get("per_page")
+        max_pages = params.get("max_pages", default_max_pages)
+        cursor = params.get("cursor")
+        return (
+            int(per_page) if per_page is not None else None,
+            int(max_pages) if max_pages is not None else None,
+            str(cursor) if cursor is not None else None,
+        )
+
+    def _execute(self, request: ToolCallRequest) -> dict:
+        method, args = self._connector_call(request)
+        with self._timed("connector_execute"):
+            return getattr(self.github_client, method)(*args)
+
+    def _coalescing_key(
+        self, request: ToolCallRequest, decision: PolicyDecision
+    ) -> tuple[str, str, str, str] | None:
+        """Key shared by identical read calls, or None when the call must run on its own."""
+        if self.coalescer is None or decision.risk_level != "read":
+            return None
+        params = json.dumps(request.params, sort_keys=True, separators=(",", ":"))
+        return request.tool, request.action, request.repo, params
+
+    def _execute_call(self, request: ToolCallRequest, decision: PolicyDecision) -> tuple[dict, str]:
+        """Execute an allowed call; return the result and the outcome message."""
+        key = self._coalescing_key(request, decision)
+        if key is None:
+            return self._execute(request), "executed"
+        result, coalesced = self.coalescer.do(key, lambda: self._execute(request))
+        return result, COALESCED_MESSAGE if coalesced else "executed"
+
+    @staticmethod
+    def _failure_status(exc: Exception) -> str:
+        """Audit status for a failed execution; an open breaker is told apart from errors."""
+        return "circuit_open" if isinstance(exc, CircuitOpenError) else "error"
+
+    def stream_issue_pages(self, request: ToolCallRequest) -> Iterator[dict]:
+        """Check an ``issues.list`` call against policy and return an iterator of its pages.
+
+        Pages are fetched from GitHub as the iterator is consumed, so nothing is
+        buffered beyond one page. Denied calls, and approval-gated calls (which get a
+        pending approval like a non-streamed call), are audited and raise
+        :class:`ToolCallRejectedError` before anything is fetched. An allowed
+        call is audited once when the stream ends, with page and issue counts and
+        the last ``next_cursor`` instead of the issues.
+        """
+        if request.tool != "github" or request.action != "issues.list":
+            raise ValueError("only github issues.list can be streamed")
+        if request.idempotency_key:
+            raise ValueError("idempotency keys are not supported for streamed calls")
+        iter_issue_pages = getattr(self.github_client, "iter_issue_pages", None)
+        if iter_issue_pages is None:
+            raise ValueError("the github connector does not support streaming")
+        per_page, max_pages, cursor = self._page_args(request.params, None)
+        decision = self._decide(request)
+        if not decision.allowed:
+            with self.session_factory() as db:
+                self._stage_outcome(
+                    db, request, decision, status="denied", message=decision.message
+                )
+                self._commit(db)
+            raise ToolCallRejectedError("denied", decision.message)
+        if decision.approval_required:
+            with self.session_factory() as db:
+                approval = self._new_approval(request, decision)
+                db.add(approval)
+                db.flush()
+                approval_id = approval.id
+                self._stage_outcome(
+                    db,
+                    request,
+                    decision,
+                    status="pending_approval",
+                    message="approval required",
+                    approval_id=approval_id,
+                )
+                self._commit(db)
+            raise ToolCallRejectedError("pending_approval", "approval required", approval_id)
+        pages = iter_issue_pages(
+            request.repo,
+            str(request.params.get("state", "open")),
+            per_page=per_page or 100,
+            max_pages=max_pages,
+            cursor=cursor,
+        )
+        return self._audited_pages(request, decision, pages)
+
+    def _audited_pages(
+        self, request: ToolCallRequest, decision: PolicyDecision, pages: Iterator[dict]
+    ) -> Iterator[dict]:
+        summary: dict[str, Any] = {"pages": 0, "issues": 0, "next_cursor": None}
+        status, message = "executed", "executed"
+        try:
+            for page in pages:
+                summary["pages"] += 1
+                summary["issues"] += len(page["issues"])
+                summary["next_cursor"] = page["next_cursor"]
+                yield page
+        except GeneratorExit:
+            message = "stream closed by client"
+            raise
+        except Exception as exc:
+            status, message = self._failure_status(exc), str(exc)
+            yield {"status": status, "error": message}
+        finally:
+            with self.session_factory() as db:
+                self._stage_outcome(
+                    db, request, decision, status=status, message=message, result=summary
+                )
+                self._commit(db)
+
     def _request_hash(self, request: ToolCallRequest) -> str:
-        payload = request.model_dump()
-        payload.pop("idempotency_key", None)
-        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
-        return sha256(serialized.encode("utf-8")).hexdigest()
+        with self._timed("request_hash"):
+            payload = request.model_dump()
+            payload.pop("idempotency_key", None)
+            serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+            return sha256(serialized.encode("utf-8")).hexdigest()
+
+    def _idempotency_lookup(
+        self, keys: set[str]
+    ) -> tuple[dict[str, IdempotencyRecord], Select | None]:
+        """Serve ``keys`` from the front cache; return a query for the ones it missed."""
+        found: dict[str, IdempotencyRecord] = {}
+        if self.idempotency_cache is not None:
+            for key in keys:
+                record = self.idempotency_cache.get(key)
+                if record is not None:
+                    found[key] = record
+        missing = keys - found.keys()
+        if not missing:
+            return found, None
+        return found, select(IdempotencyRecord).where(IdempotencyRecord.key.in_(missing))
+
+    def _live_idempotency_records(
+        self, records: Iterable[IdempotencyRecord]
+    ) -> tuple[dict[str, IdempotencyRecord], Delete | None]:
+        """Split loaded records into live ones and a delete for expired, unswept ones.
+
+        Deleting an expired record in the request's transaction frees its key for
+        reuse before the sweeper gets to it.
+        """
+        cutoff = expiry_cutoff(self.idempotency_ttl_seconds)
+        live: dict[str, IdempotencyRecord] = {}
+        expired_ids: list[int] = []
+        for record in records:
+            if cutoff is not None and record.created_at < cutoff:
+                expired_ids.append(record.id)
+                continue
+            live[record.key] = record
+            if self.idempotency_cache is not None:
+                self.idempotency_cache.put(
+                    record.key, record.request_hash, record.response_payload, record.created_at
+                )
+        if not expired_ids:
+            return live, None
+        purge = (
+            delete(IdempotencyRecord)
+            .where(IdempotencyRecord.id.in_(expired_ids))
+            .execution_options(synchronize_session=False)
+        )
+        return live, purge
+
+    def _load_idempotency(self, db: Session, keys: set[str]) -> dict[str, IdempotencyRecord]:
+        with self._timed("idempotency_lookup"):
+            found, query = self._idempotency_lookup(keys)
+            if query is not None:
+                live, purge = self._live_idempotency_records(db.scalars(query))
+                if purge is not None:
+                    db.execute(purge)
+                found.update(live)
+            return found
+
+    def _new_idempotency_record(
+        self, db: Session | AsyncSession, *, key: str, request_hash: str, response_payload: dict
+    ) -> IdempotencyRecord:
+        row = IdempotencyRecord(
+            key=key,
+            request_hash=request_hash,
+            response_payload=json.dumps(response_payload),
+            created_at=datetime.now(UTC),
+        )
+        # Plain values: after commit the ORM row is expired and reading it would query.
+        db.info.setdefault("idempotency_records", []).append(
+            (key, request_hash, row.response_payload, row.created_at)
+        )
+        return row
 
     def _record_idempotency(
         self,
@@ -118,185 +454,290 @@ class Agent2AllowService:
         request_hash: str,
         response_payload: dict,
     ) -> None:
-        row = IdempotencyRecord(
-            key=key,
-            request_hash=request_hash,
-            response_payload=json.dumps(response_payload),
+        row = self._new_idempotency_record(
+            db, key=key, request_hash=request_hash, response_payload=response_payload
         )
-        db.add(row)
         try:
-            db.commit()
+            # A savepoint keeps a concurrent duplicate key from rolling back the
+            # approval and audit rows written earlier in the same transaction.
+            with db.begin_nested():
+                db.add(row)
         except IntegrityError:
-            db.rollback()
+            db.info["idempotency_records"].pop()
             existing = db.scalar(select(IdempotencyRecord).where(IdempotencyRecord.key == key))
             if existing and existing.request_hash != request_hash:
+                self._commit(db)
                 raise IdempotencyConflictError(
                     "idempotency key already used with a different request payload"
                 ) from None
             if not existing:
                 raise
 
-    def handle_tool_call(
-        self, request: ToolCallRequest
-    ) -> tuple[str, str, dict | None, int | None, bool]:
-        request_hash = self._request_hash(request)
-        decision: PolicyDecision = self.policy_engine.decide(
-            request.tool, request.action, request.repo
+    def _stage_outcome(
+        self,
+        db: Session,
+        request: ToolCallRequest,
+        decision: PolicyDecision,
+        *,
+        status: str,
+        message: str,
+        result: dict | None = None,
+        approval_id: int | None = None,
+    ) -> dict:
+        """Stage the audit row for a tool-call outcome and return its idempotency payload."""
+        self._audit(
+            db,
+            agent_id=request.agent_id,
+            tool=request.tool,
+            action=request.action,
+            repo=request.repo,
+            risk_level=decision.risk_level,
+            status=status,
+            request_payload=request.model_dump(),
+            response_payload=result,
+            approval_id=approval_id,
+            message=message,
+        )
+        return {
+            "status": status,
+            "message": message,
+            "result": result,
+            "approval_id": approval_id,
+        }
+
+    def _stage_replay(
+        self,
+        db: Session,
+        request: ToolCallRequest,
+        decision: PolicyDecision,
+        record: IdempotencyRecord,
+        request_hash: str,
+    ) -> ToolCallOutcome:
+        if record.request_hash != request_hash:
+            raise IdempotencyConflictError(
+                "idempotency key already used with a different request payload"
+            )
+        cached = json.loads(record.response_payload)
+        self._audit(
+            db,
+            agent_id=request.agent_id,
+            tool=request.tool,
+            action=request.action,
+            repo=request.repo,
+            risk_level=decision.risk_level,
+            status="idempotent_replay",
+            request_payload=request.model_dump(),
+            response_payload={"cached_status": cached["status"]},
+            message=f"replayed response for key {request.idempotency_key}",
+        )
+        return (
+            cached["status"],
+            cached["message"],
+            cached.get("result"),
+            cached.get("approval_id"),
+            True,
         )
 
+    @staticmethod
+    def _new_approval(request: ToolCallRequest, decision: PolicyDecision) -> Approval:
+        return Approval(
+            status="pending",
+            tool=request.tool,
+            action=request.action,
+            repo=request.repo,
+            risk_level=decision.risk_level,
+            request_payload=json.dumps(request.model_dump()),
+            result_payload="{}",
+            reason="",
+        )
+
+    def handle_tool_call(self, request: ToolCallRequest) -> ToolCallOutcome:
+        request_hash = self._request_hash(request)
+        decision: PolicyDecision = self._decide(request)
+
         with self.session_factory() as db:
-            request_payload = request.model_dump()
             idempotency_key = request.idempotency_key
 
             if idempotency_key:
-                record = db.scalar(
-                    select(IdempotencyRecord).where(IdempotencyRecord.key == idempotency_key)
-                )
+                record = self._load_idempotency(db, {idempotency_key}).get(idempotency_key)
                 if record:
-                    if record.request_hash != request_hash:
-                        raise IdempotencyConflictError(
-                            "idempotency key already used with a different request payload"
-                        )
-                    cached = json.loads(record.response_payload)
-                    self._audit(
-                        db,
-                        agent_id=request.agent_id,
-                        tool=request.tool,
-                        action=request.action,
-                        repo=request.repo,
-                        risk_level=decision.risk_level,
-                        status="idempotent_replay",
-                        request_payload=request_payload,
-                        response_payload={"cached_status": cached["status"]},
-                        message=f"replayed response for key {idempotency_key}",
-                    )
-                    return (
-                        cached["status"],
-                        cached["message"],
-                        cached.get("result"),
-                        cached.get("approval_id"),
-                        True,
-                    )
+                    replayed = self._stage_replay(db, request, decision, record, request_hash)
+                    self._commit(db)
+                    return replayed
 
+            approval_id: int | None = None
+            result: dict | None = None
             if not decision.allowed:
-                self._audit(
-                    db,
-                    agent_id=request.agent_id,
-                    tool=request.tool,
-                    action=request.action,
-                    repo=request.repo,
-                    risk_level=decision.risk_level,
-                    status="denied",
-                    request_payload=request_payload,
-                    message=decision.message,
-                )
-                if idempotency_key:
-                    self._record_idempotency(
-                        db,
-                        key=idempotency_key,
-                        request_hash=request_hash,
-                        response_payload={
-                            "status": "denied",
-                            "message": decision.message,
-                            "result": None,
-                            "approval_id": None,
-                        },
-                    )
-                return "denied", decision.message, None, None, False
-
-            if decision.approval_required:
-                approval = Approval(
-                    status="pending",
-                    tool=request.tool,
-                    action=request.action,
-                    repo=request.repo,
-                    risk_level=decision.risk_level,
-                    request_payload=json.dumps(request_payload),
-                    result_payload="{}",
-                    reason="",
-                )
+                status, message = "denied", decision.message
+            elif decision.approval_required:
+                approval = self._new_approval(request, decision)
                 db.add(approval)
-                db.commit()
-                db.refresh(approval)
+                db.flush()
+                approval_id = approval.id
+                status, message = "pending_approval", "approval required"
+            else:
+                try:
+                    result, message = self._execute_call(request, decision)
+                    status = "executed"
+                except Exception as exc:  # pragma: no cover
+                    status, message = self._failure_status(exc), str(exc)
 
-                self._audit(
+            outcome = self._stage_outcome(
+                db,
+                request,
+                decision,
+                status=status,
+                message=message,
+                result=result,
+                approval_id=approval_id,
+            )
+            if idempotency_key:
+                self._record_idempotency(
                     db,
-                    agent_id=request.agent_id,
-                    tool=request.tool,
-                    action=request.action,
-                    repo=request.repo,
-                    risk_level=decision.risk_level,
-                    status="pending_approval",
-                    request_payload=request_payload,
-                    approval_id=approval.id,
-                    message="approval required",
+                    key=idempotency_key,
+                    request_hash=request_hash,
+                    response_payload=outcome,
                 )
-                if idempotency_key:
-                    self._record_idempotency(
-                        db,
-                        key=idempotency_key,
-                        request_hash=request_hash,
-                        response_payload={
-                            "status": "pending_approval",
-                            "message": "approval required",
-                            "result": None,
-                            "approval_id": approval.id,
-                        },
-                    )
-                return "pending_approval", "approval required", None, approval.id, False
+            self._commit(db)
+            return status, message, result, approval_id, False
 
-            try:
-                result = self._execute(request)
-                self._audit(
-                    db,
-                    agent_id=request.agent_id,
-                    tool=request.tool,
-                    action=request.action,
-                    repo=request.repo,
-                    risk_level=decision.risk_level,
-                    status="executed",
-                    request_payload=request_payload,
-                    response_payload=result,
-                    message="executed",
-                )
-                if idempotency_key:
-                    self._record_idempotency(
-                        db,
-                        key=idempotency_key,
-                        request_hash=request_hash,
-                        response_payload={
-                            "status": "executed",
-                            "message": "executed",
-                            "result": result,
-                            "approval_id": None,
-                        },
+    def _plan_batch(self, requests: list[ToolCallRequest]) -> list[_BatchItem]:
+        return [
+            _BatchItem(
+                request=request,
+                request_hash=self._request_hash(request),
+                decision=self._decide(request),
+            )
+            for request in requests
+        ]
+
+    @staticmethod
+    def _batch_keys(items: list[_BatchItem]) -> set[str]:
+        return {item.request.idempotency_key for item in items if item.request.idempotency_key}
+
+    def _stage_batch_replays(
+        self, db: Session, items: list[_BatchItem], records: dict[str, IdempotencyRecord]
+    ) -> None:
+        """Resolve stored and in-batch idempotency keys and stage new approvals."""
+        first_by_key: dict[str, _BatchItem] = {}
+        for item in items:
+            key = item.request.idempotency_key
+            if key and key in records:
+                try:
+                    item.response = self._stage_replay(
+                        db, item.request, item.decision, records[key], item.request_hash
                     )
-                return "executed", "executed", result, None, False
-            except Exception as exc:  # pragma: no cover
-                self._audit(
-                    db,
-                    agent_id=request.agent_id,
-                    tool=request.tool,
-                    action=request.action,
-                    repo=request.repo,
-                    risk_level=decision.risk_level,
-                    status="error",
-                    request_payload=request_payload,
-                    message=str(exc),
-                )
-                if idempotency_key:
+                except IdempotencyConflictError as exc:
+                    item.response = ("idempotency_conflict", str(exc), None, None, False)
+                continue
+            if key and key in first_by_key:
+                first = first_by_key[key]
+                if first.request_hash != item.request_hash:
+                    item.response = (
+                        "idempotency_conflict",
+                        "idempotency key already used with a different request payload",
+                        None,
+                        None,
+                        False,
+                    )
+                else:
+                    item.duplicate_of = first
+                continue
+            if key:
+                first_by_key[key] = item
+            if not item.decision.allowed:
+                item.status, item.message = "denied", item.decision.message
+            elif item.decision.approval_required:
+                item.approval = self._new_approval(item.request, item.decision)
+                db.add(item.approval)
+                item.status, item.message = "pending_approval", "approval required"
+
+    def _stage_batch_outcomes(
+        self, db: Session, items: list[_BatchItem]
+    ) -> list[tuple[str, str, dict]]:
+        """Stage audit rows for every new outcome; return idempotency rows to record."""
+        pending_keys: list[tuple[str, str, dict]] = []
+        for item in items:
+            if item.response is not None or item.duplicate_of is not None:
+                continue
+            approval_id = item.approval.id if item.approval is not None else None
+            outcome = self._stage_outcome(
+                db,
+                item.request,
+                item.decision,
+                status=item.status,
+                message=item.message,
+                result=item.result,
+                approval_id=approval_id,
+            )
+            item.response = (item.status, item.message, item.result, approval_id, False)
+            if item.request.idempotency_key:
+                pending_keys.append((item.request.idempotency_key, item.request_hash, outcome))
+        for item in items:
+            if item.duplicate_of is None:
+                continue
+            status, message, result, approval_id, _ = item.duplicate_of.response
+            record = IdempotencyRecord(
+                key=item.request.idempotency_key,
+                request_hash=item.request_hash,
+                response_payload=json.dumps(
+                    {
+                        "status": status,
+                        "message": message,
+                        "result": result,
+                        "approval_id": approval_id,
+                    }
+                ),
+            )
+            item.response = self._stage_replay(
+                db, item.request, item.decision, record, item.request_hash
+            )
+        return pending_keys
+
+    def _execute_batch_item(self, item: _BatchItem) -> None:
+        try:
+            item.result, item.message = self._execute_call(item.request, item.decision)
+            item.status = "executed"
+        except Exception as exc:
+            item.status, item.message = self._failure_status(exc), str(exc)
+
+    def handle_tool_calls(
+        self, requests: list[ToolCallRequest], max_concurrency: int = 8
+    ) -> list[ToolCallOutcome]:
+        """Handle a batch of tool calls in one transaction, returning outcomes in order.
+
+        Policy decisions and idempotency lookups are done once for the whole batch,
+        allowed calls run on up to ``max_concurrency`` threads, and every approval,
+        audit and idempotency row is committed together. A key reused inside the
+        batch replays the first item's outcome; a conflicting key yields an
+        ``idempotency_conflict`` item instead of failing the batch.
+        """
+        items = self._plan_batch(requests)
+        with self.session_factory() as db:
+            records = self._load_idempotency(db, self._batch_keys(items))
+            self._stage_batch_replays(db, items, records)
+
+            to_execute = [item for item in items if item.needs_execution]
+            if len(to_execute) == 1 or max_concurrency <= 1:
+                for item in to_execute:
+                    self._execute_batch_item(item)
+            elif to_execute:
+                workers = min(max_concurrency, len(to_execute))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    list(pool.map(self._execute_batch_item, to_execute))
+
+            db.flush()
+            for key, request_hash, outcome in self._stage_batch_outcomes(db, items):
+                try:
                     self._record_idempotency(
-                        db,
-                        key=idempotency_key,
-                        request_hash=request_hash,
-                        response_payload={
-                            "status": "error",
-                            "message": str(exc),
-                            "result": None,
-                            "approval_id": None,
-                        },
+                        db, key=key, request_hash=request_hash, response_payload=outcome
                     )
-                return "error", str(exc), None, None, False
+                except IdempotencyConflictError as exc:
+                    for item in items:
+                        if item.request.idempotency_key == key:
+                            item.response = ("idempotency_conflict", str(exc), None, None, False)
+            self._commit(db)
+            return [item.response for item in items]
 
     def list_pending_approvals(self) -> list[Approval]:
         with self.session_factory() as db:
@@ -307,10 +748,71 @@ class Agent2AllowService:
             ).all()
             return rows
 
+    def count_pending_approvals(self) -> int:
+        with self.session_factory() as db:
+            return db.scalar(
+                select(func.count()).select_from(Approval).where(Approval.status == "pending")
+            )
+
     def get_approval(self, approval_id: int) -> Approval | None:
         with self.session_factory() as db:
             return db.get(Approval, approval_id)
 
+    def _stage_decision(
+        self, db: Session, approval: Approval, *, decision: str, approver: str, reason: str
+    ) -> dict:
+        """Move a pending approval to its human decision and stage the audit row."""
+        approval.status = "approved" if decision == "approve" else "denied"
+        approval.reason = reason
+        request_payload = json.loads(approval.request_payload)
+        self._audit(
+            db,
+            agent_id=approver,
+            tool=approval.tool,
+            action=approval.action,
+            repo=approval.repo,
+            risk_level=approval.risk_level,
+            status="approved" if decision == "approve" else "denied_by_human",
+            request_payload=request_payload,
+            approval_id=approval.id,
+            message=reason or ("approved" if decision == "approve" else "denied"),
+        )
+        return request_payload
+
+    def _stage_execution(
+        self,
+        db: Session,
+        approval: Approval,
+        request_payload: dict,
+        *,
+        result: dict | None = None,
+        error: Exception | None = None,
+    ) -> tuple[str, dict | None]:
+        """Record the outcome of running an approved call on the approval and audit log."""
+        if error is None:
+            approval.status = "executed"
+            approval.result_payload = json.dumps(result)
+            status, message, outcome = "executed", "executed after approval", result
+        else:
+            approval.status = "failed"
+            approval.result_payload = json.dumps({"error": str(error)})
+            status, message = self._failure_status(error), str(error)
+            outcome = {"error": str(error)}
+        self._audit(
+            db,
+            agent_id=request_payload["agent_id"],
+            tool=approval.tool,
+            action=approval.action,
+            repo=approval.repo,
+            risk_level=approval.risk_level,
+            status=status,
+            request_payload=request_payload,
+            response_payload=result,
+            approval_id=approval.id,
+            message=message,
+        )
+        return status, outcome
+
     def approve(self, approval_id: int, approver: str, reason: str) -> tuple[str, dict | None]:
         with self.session_factory() as db:
             approval = db.get(Approval, approval_id)
@@ -319,62 +821,26 @@ class Agent2AllowService:
             if approval.status != "pending":
                 return "invalid_state", None
 
-            approval.status = "approved"
-            approval.reason = reason
-            db.commit()
-
-            request_payload = json.loads(approval.request_payload)
-            request = ToolCallRequest(**request_payload)
-
-            self._audit(
-                db,
-                agent_id=approver,
-                tool=approval.tool,
-                action=approval.action,
-                repo=approval.repo,
-                risk_level=approval.risk_level,
-                status="approved",
-                request_payload=request_payload,
-                approval_id=approval.id,
-                message=reason or "approved",
+            request_payload = self._stage_decision(
+                db, approval, decision="approve", approver=approver, reason=reason
             )
+            if self.approval_queue is not None:
+                self.approval_queue.enqueue(db, approval)
+                self._commit(db)
+                self.approval_queue.notify()
+                return "approved", None
+            self._commit(db)
 
             try:
-                result = self._execute(request)
-                approval.status = "executed"
-                approval.result_payload = json.dumps(result)
-                db.commit()
-                self._audit(
-                    db,
-                    agent_id=request.agent_id,
-                    tool=approval.tool,
-                    action=approval.action,
-                    repo=approval.repo,
-                    risk_level=approval.risk_level,
-                    status="executed",
-                    request_payload=request_payload,
-                    response_payload=result,
-                    approval_id=approval.id,
-                    message="executed after approval",
-                )
-                return "executed", result
+                result = self._execute(ToolCallRequest(**request_payload))
             except Exception as exc:  # pragma: no cover
-                approval.status = "failed"
-                approval.result_payload = json.dumps({"error": str(exc)})
-                db.commit()
-                self._audit(
-                    db,
-                    agent_id=request.agent_id,
-                    tool=approval.tool,
-                    action=approval.action,
-                    repo=approval.repo,
-                    risk_level=approval.risk_level,
-                    status="error",
-                    request_payload=request_payload,
-                    approval_id=approval.id,
-                    message=str(exc),
+                status, outcome = self._stage_execution(db, approval, request_payload, error=exc)
+            else:
+                status, outcome = self._stage_execution(
+                    db, approval, request_payload, result=result
                 )
-                return "error", {"error": str(exc)}
+            self._commit(db)
+            return status, outcome
 
     def deny(self, approval_id: int, approver: str, reason: str) -> str:
         with self.session_factory() as db:
@@ -384,26 +850,252 @@ class Agent2AllowService:
             if approval.status != "pending":
                 return "invalid_state"
 
-            approval.status = "denied"
-            approval.reason = reason
-            db.commit()
+            self._stage_decision(db, approval, decision="deny", approver=approver, reason=reason)
+            self._commit(db)
+            return "denied"
+
+    @staticmethod
+    def _approvals_query(approval_ids: Iterable[int]) -> Select:
+        return select(Approval).where(Approval.id.in_(set(approval_ids)))
+
+    def _stage_bulk_decisions(
+        self,
+        db: Session | AsyncSession,
+        approval_ids: list[int],
+        approvals: dict[int, Approval],
+        *,
+        decision: str,
+        approver: str,
+        reason: str,
+        authorize: Callable[[str], tuple[bool, str]],
+    ) -> tuple[list[dict], list[_ClaimedApproval]]:
+        """Authorize and stage each decision; return per-id results and approvals to run.
+
+        With an approval queue, approved calls are enqueued here instead of returned.
+        Results follow ``approval_ids`` order. A repeated id finds its approval already
+        decided and is reported ``invalid_state``, as it would be in separate requests.
+        """
+        results: list[dict] = []
+        claimed: list[_ClaimedApproval] = []
+        for approval_id in approval_ids:
+            approval = approvals.get(approval_id)
+            if approval is None:
+                results.append({"id": approval_id, "status": "not_found"})
+                continue
+            if approval.status != "pending":
+                results.append({"id": approval_id, "status": "invalid_state"})
+                continue
+            allowed, message = authorize(approval.risk_level)
+            if not allowed:
+                results.append({"id": approval_id, "status": "forbidden", "message": message})
+                continue
+            request_payload = self._stage_decision(
+                db, approval, decision=decision, approver=approver, reason=reason
+            )
+            entry = {"id": approval_id, "status": "denied"}
+            results.append(entry)
+            if decision != "approve":
+                continue
+            if self.approval_queue is not None:
+                self.approval_queue.enqueue(db, approval)
+                entry.update(status="approved", result=None)
+            else:
+                claimed.append((entry, approval, request_payload))
+        return results, claimed
+
+    def _stage_bulk_executions(
+        self,
+        db: Session | AsyncSession,
+        claimed: list[_ClaimedApproval],
+        outcomes: list[tuple[dict | None, Exception | None]],
+    ) -> None:
+        for (entry, approval, request_payload), (result, error) in zip(
+            claimed, outcomes, strict=True
+        ):
+            status, outcome = self._stage_execution(
+                db, approval, request_payload, result=result, error=error
+            )
+            entry.update(status=status, result=outcome)
+
+    @staticmethod
+    def _interleave_by_repo(requests: list[ToolCallRequest]) -> list[int]:
+        """Indexes of ``requests`` in round-robin order across repos.
+
+        Workers then spread over repos instead of queueing on one repo's limit.
+        """
+        seen: Counter[str] = Counter()
+        rounds: list[int] = []
+        for request in requests:
+            rounds.append(seen[request.repo])
+            seen[request.repo] += 1
+        return sorted(range(len(requests)), key=rounds.__getitem__)
+
+    def _execute_approved(
+        self, requests: list[ToolCallRequest], max_concurrency: int, per_repo_concurrency: int
+    ) -> list[tuple[dict | None, Exception | None]]:
+        limits = {
+            repo: threading.BoundedSemaphore(max(1, per_repo_concurrency))
+            for repo in {request.repo for request in requests}
+        }
+
+        def _run(index: int) -> tuple[dict | None, Exception | None]:
+            request = requests[index]
+            with limits[request.repo]:
+                try:
+                    return self._execute(request), None
+                except Exception as exc:
+                    return None, exc
+
+        order = self._interleave_by_repo(requests)
+        if len(order) == 1 or max_concurrency <= 1:
+            finished = [_run(index) for index in order]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(order))) as pool:
+                finished = list(pool.map(_run, order))
+        outcomes: list[tuple[dict | None, Exception | None]] = [(None, None)] * len(order)
+        for index, outcome in zip(order, finished, strict=True):
+            outcomes[index] = outcome
+        return outcomes
+
+    def _notify_queued(self, results: list[dict]) -> None:
+        if self.approval_queue is not None:
+            queued = sum(1 for entry in results if entry["status"] == "approved")
+            if queued:
+                self.approval_queue.notify(queued)
+
+    def run_approval_job(self, job: ClaimedJob) -> str:
+        """Run a claimed approval job and commit its outcome with the job's final status.
+
+        No session is held while the connector runs. An approval that is no longer
+        ``approved`` (already run by an earlier attempt that committed) is skipped.
+        """
+        with self.session_factory() as db:
+            approval = db.get(Approval, job.approval_id)
+            runnable = approval is not None and approval.status == "approved"
+            request_payload = json.loads(approval.request_payload) if runnable else {}
+            if not runnable:
+                self.approval_queue.finish(db, job.id, DONE, "approval is not approved")
+                db.commit()
+                return "skipped"
+
+        result: dict | None = None
+        error: Exception | None = None
+        if job.attempts > self.approval_queue.max_attempts:
+            error = RuntimeError(f"approval job abandoned after {job.attempts - 1} attempts")
+        else:
+            try:
+                result = self._execute(ToolCallRequest(**request_payload))
+            except Exception as exc:
+                error = exc
+
+        with self.session_factory() as db:
+            approval = db.get(Approval, job.approval_id)
+            status, _ = self._stage_execution(
+                db, approval, request_payload, result=result, error=error
+            )
+            self.approval_queue.finish(
+                db, job.id, DONE if error is None else FAILED, "" if error is None else str(error)
+            )
+            self._commit(db)
+            return status
+
+    def decide_approvals(
+        self,
+        approval_ids: list[int],
+        decision: str,
+        approver: str,
+        reason: str,
+        authorize: Callable[[str], tuple[bool, str]],
+        max_concurrency: int = 8,
+        per_repo_concurrency: int = 4,
+    ) -> list[dict]:
+        """Approve or deny many approvals; return one result per id, in order.
 
-            request_payload = json.loads(approval.request_payload)
-            self._audit(
+        All approvals are loaded in one query and authorized in memory with
+        ``authorize(risk_level) -> (allowed, reason)``. The decisions are committed
+        in one transaction before anything runs, so a concurrent decision cannot
+        claim the same approvals. With an approval queue, approved calls are
+        enqueued in that transaction and reported ``approved``. Approved calls then run on up to
+        ``max_concurrency`` threads, at most ``per_repo_concurrency`` per repo,
+        and their outcomes are committed together in a second transaction.
+        """
+        with self.session_factory() as db:
+            approvals = {
+                approval.id: approval
+                for approval in db.scalars(self._approvals_query(approval_ids))
+            }
+            results, claimed = self._stage_bulk_decisions(
                 db,
-                agent_id=approver,
-                tool=approval.tool,
-                action=approval.action,
-                repo=approval.repo,
-                risk_level=approval.risk_level,
-                status="denied_by_human",
-                request_payload=request_payload,
-                approval_id=approval.id,
-                message=reason or "denied",
+                approval_ids,
+                approvals,
+                decision=decision,
+                approver=approver,
+                reason=reason,
+                authorize=authorize,
             )
-            return "denied"
+            self._commit(db)
+            self._notify_queued(results)
+            if not claimed:
+                return results
+
+            # The commit expired the claimed approvals; reload them in one query.
+            db.scalars(self._approvals_query(entry["id"] for entry, _, _ in claimed)).all()
+            outcomes = self._execute_approved(
+                [ToolCallRequest(**payload) for _, _, payload in claimed],
+                max_concurrency,
+                per_repo_concurrency,
+            )
+            self._stage_bulk_executions(db, claimed, outcomes)
+            self._commit(db)
+            return results
 
     def list_audit_logs(self) -> list[AuditLog]:
         with self.session_factory() as db:
             rows = db.scalars(select(AuditLog).order_by(AuditLog.timestamp.desc())).all()
             return rows
+
+    def _audit_read_sources(self) -> list[Callable[[], Session]]:
+        if self.audit_partitions is None:
+            return [self.session_factory]
+        return self.audit_partitions.read_session_factories(self.session_factory)
+
+    def query_audit_logs(
+        self,
+        filters: AuditLogFilter | None = None,
+        *,
+        limit: int,
+        cursor: str | None = None,
+    ) -> tuple[list[AuditLog], str | None]:
+        """Return one newest-first page of audit rows and the cursor for the next page.
+
+        Partition sources hold disjoint time ranges, newest first, so a page that
+        runs past one source continues into the next with the same keyset query.
+        """
+        rows: list[AuditLog] = []
+        for session_factory in self._audit_read_sources():
+            with session_factory() as db:
+                query = audit_log_query(filters, cursor=cursor).limit(limit + 1 - len(rows))
+                rows.extend(db.scalars(query))
+            if len(rows) > limit:
+                break
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    def iter_audit_logs(
+        self,
+        filters: AuditLogFilter | None = None,
+        *,
+        cursor: str | None = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Row]:
+        """Yield audit rows oldest first, fetching ``chunk_size`` rows at a time.
+
+        Rows are plain column tuples rather than ORM objects, so nothing accumulates
+        in the session and memory stays flat for any table size.
+        """
+        query = audit_log_query(filters, cursor=cursor, descending=False).with_only_columns(
+            *AuditLog.__table__.c
+        )
+        for session_factory in reversed(self._audit_read_sources()):
+            with session_factory() as db:
+                yield from db.execute(query.execution_options(yield_per=chunk_size))
@@ -5,18 +5,96 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
     database_url: str = "sqlite:///./data/agent2allow.db"
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_timeout_seconds: float = 30.0
+    database_pool_recycle_seconds: int = 1800
+    database_pool_pre_ping: bool = True
+    database_statement_timeout_ms: int = 30000
+    sqlite_tuning_enabled: bool = True
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size_bytes: int = 268435456
+    sqlite_cache_size: int = -65536
+    sqlite_temp_store: str = "memory"
+    sqlite_single_writer: bool = True
+    execution_mode: str = "sync"
+    tool_call_batch_max_size: int = 100
+    tool_call_batch_concurrency: int = 8
+    tool_call_coalescing_enabled: bool = False
     policy_path: str = "config/default-policy.yml"
+    policy_decision_cache_size: int = 0
+    policy_reload_mode: str = "per_request"
+    policy_watch_poll_interval_seconds: float = 2.0
     github_base_url: str = "http://mock-github:8081"
     github_token: str | None = None
     github_retry_attempts: int = 3
     github_retry_backoff_ms: int = 200
+    github_retry_max_backoff_ms: int = 10000
+    github_circuit_breaker_enabled: bool = False
+    github_circuit_failure_threshold: int = 5
+    github_circuit_recovery_seconds: float = 30.0
+    github_circuit_half_open_max_calls: int = 1
+    github_retry_budget_enabled: bool = False
+    github_retry_budget_ratio: float = 0.2
+    github_retry_budget_min_retries: int = 10
+    github_retry_budget_window_seconds: float = 10.0
+    github_rate_limit_enabled: bool = False
+    github_rate_limit_requests_per_second: float = 0.0
+    github_rate_limit_burst: int = 10
+    github_rate_limit_write_reserve: int = 50
+    github_rate_limit_max_wait_seconds: float = 60.0
+    github_http_timeout_seconds: float = 10.0
+    github_http_connect_timeout_seconds: float = 10.0
+    github_http_max_connections: int = 100
+    github_http_max_keepalive_connections: int = 20
+    github_http_keepalive_expiry_seconds: float = 30.0
+    github_http2: bool = False
+    github_response_cache_enabled: bool = False
+    github_response_cache_ttls: str = "list_issues=60"
+    github_response_cache_max_entries: int = 1000
+    github_response_cache_max_bytes: int = 16 * 1024 * 1024
     approval_rbac_enabled: bool = False
     approval_role_bindings: str = ""
     approval_roles_for_approve: str = "reviewer,admin"
     approval_roles_for_deny: str = "reviewer,admin"
     approval_roles_for_high_risk_approve: str = "admin"
+    approval_bulk_concurrency: int = 8
+    approval_bulk_per_repo_concurrency: int = 4
+    # inline: approve runs the call in the request; queue: a worker pool runs it.
+    approval_execution_mode: str = "inline"
+    approval_queue_workers: int = 4
+    approval_queue_per_repo_concurrency: int = 2
+    approval_queue_poll_interval_seconds: float = 1.0
+    approval_queue_lease_seconds: float = 300.0
+    approval_queue_max_attempts: int = 3
+    approval_wait_max_seconds: float = 60.0
+    event_history_size: int = 1000
+    event_stream_heartbeat_seconds: float = 15.0
+    metrics_enabled: bool = True
     approval_api_key_enabled: bool = False
     approval_api_keys: str = ""
+    # 0 keeps idempotency keys forever; a positive TTL lets expired keys execute again.
+    idempotency_ttl_seconds: int = 0
+    idempotency_cache_size: int = 10000
+    idempotency_sweep_interval_seconds: float = 300.0
+    idempotency_sweep_batch_size: int = 5000
+    audit_write_mode: str = "sync"
+    audit_queue_max_size: int = 10000
+    audit_batch_size: int = 500
+    audit_flush_interval_ms: int = 50
+    audit_enqueue_timeout_ms: int = 1000
+    audit_write_retry_attempts: int = 5
+    audit_write_retry_backoff_ms: int = 100
+    audit_export_chunk_size: int = 1000
+    audit_partition_interval: str = "none"
+    audit_partitions_premake: int = 2
+    audit_partition_dir: str = ""
+    audit_retention_days: int = 0
+    audit_retention_action: str = "drop"
+    audit_archive_dir: str = ""
+    audit_maintenance_interval_seconds: float = 3600.0
     audit_sink: str = "none"
     audit_sink_syslog_host: str = "localhost"
     audit_sink_syslog_port: int = 514
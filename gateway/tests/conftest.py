@@ -49,3 +49,11 @@ def client(tmp_path: Path):
             os.environ.pop(k, None)
         else:
             os.environ[k] = v
+
+
+@pytest.fixture()
+def db_module(client):
+    # src.db reads settings on import; import it only once the client fixture set the env.
+    import src.db
+
+    return src.db
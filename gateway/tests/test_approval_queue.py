@@ -0,0 +1,173 @@
+import time
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+
+from src.approval_queue import (
+    ApprovalJobQueue,
+    ApprovalWorkerPool,
+    _utcnow,
+    build_approval_job_queue,
+    build_approval_worker_pool,
+)
+from src.models import Approval, ApprovalJob, AuditLog, Base
+from src.policy import PolicyEngine
+from src.service import Agent2AllowService
+from tests.test_service_transactions import StubGithub, _approve_all, _label_request
+
+
+class CountingGithub(StubGithub):
+    def __init__(self):
+        self.calls: list[tuple[str, int]] = []
+
+    def set_labels(self, repo: str, issue_number: int, labels: list[str]) -> dict:
+        self.calls.append((repo, issue_number))
+        return {"labels": labels}
+
+
+@pytest.fixture()
+def service(tmp_path):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(
+        "version: 1\nrules:\n  - tool: github\n    actions: [issues.set_labels]\n"
+        "    repo: acme/*\n    risk: medium\n    allow: true\n"
+    )
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    return Agent2AllowService(
+        session_factory=sessionmaker(bind=engine, autoflush=False),
+        policy_engine=PolicyEngine(str(policy)),
+        github_client=CountingGithub(),
+        approval_queue=ApprovalJobQueue(lease_seconds=60, max_attempts=2),
+    )
+
+
+def _pending(service: Agent2AllowService, repo: str = "acme/roadrunner", number: int = 1) -> int:
+    request = _label_request().model_copy(
+        update={"repo": repo, "params": {"issue_number": number, "labels": ["bug"]}}
+    )
+    return service.handle_tool_call(request)[3]
+
+
+def _jobs(service: Agent2AllowService) -> list[ApprovalJob]:
+    with service.session_factory() as db:
+        return db.scalars(select(ApprovalJob).order_by(ApprovalJob.id)).all()
+
+
+def _approval_status(service: Agent2AllowService, approval_id: int) -> str:
+    with service.session_factory() as db:
+        return db.get(Approval, approval_id).status
+
+
+def test_approve_enqueues_and_a_worker_executes(service):
+    approval_id = _pending(service)
+
+    assert service.approve(approval_id, "alice", "ok") == ("approved", None)
+    assert service.github_client.calls == []
+    assert [(job.approval_id, job.status) for job in _jobs(service)] == [(approval_id, "queued")]
+
+    pool = ApprovalWorkerPool(service, workers=1)
+    assert pool.run_once() is True
+    assert pool.run_once() is False
+
+    assert service.github_client.calls == [("acme/roadrunner", 1)]
+    assert _approval_status(service, approval_id) == "executed"
+    assert [(job.status, job.attempts) for job in _jobs(service)] == [("done", 1)]
+    with service.session_factory() as db:
+        audited = db.scalars(select(AuditLog.status).where(AuditLog.approval_id == approval_id))
+        assert list(audited) == ["pending_approval", "approved", "executed"]
+    assert pool.stats()["executed"] == 1
+
+
+def test_expired_leases_are_reclaimed_until_max_attempts(service):
+    first, second = _pending(service, number=1), _pending(service, number=2)
+    service.decide_approvals([first, second], "approve", "alice", "ok", _approve_all)
+    queue = service.approval_queue
+
+    # Two workers crash after claiming; their leases run out.
+    with service.session_factory() as db:
+        assert queue.claim(db, "crashed").approval_id == first
+    with service.session_factory() as db:
+        assert queue.claim(db, "crashed").approval_id == second
+    expired = _utcnow() - timedelta(seconds=1)
+    with service.session_factory() as db:
+        db.execute(update(ApprovalJob).values(lease_expires_at=expired))
+        db.execute(update(ApprovalJob).where(ApprovalJob.approval_id == second).values(attempts=2))
+        db.commit()
+
+    pool = ApprovalWorkerPool(service, workers=1)
+    assert pool.run_once() and pool.run_once()
+
+    assert service.github_client.calls == [("acme/roadrunner", 1)]
+    assert _approval_status(service, first) == "executed"
+    assert _approval_status(service, second) == "failed"
+    assert [(job.status, job.attempts) for job in _jobs(service)] == [("done", 2), ("failed", 3)]
+    assert "abandoned after 2 attempts" in _jobs(service)[1].last_error
+
+
+def test_claims_skip_repos_at_their_concurrency_limit(service):
+    ids = [_pending(service, "acme/roadrunner", 1), _pending(service, "acme/coyote", 2)]
+    service.decide_approvals(ids, "approve", "alice", "ok", _approve_all)
+    pool = ApprovalWorkerPool(service, workers=2, per_repo_concurrency=1)
+    pool._running["acme/roadrunner"] = 1
+
+    job = pool._claim("w")
+
+    assert (job.approval_id, job.repo) == (ids[1], "acme/coyote")
+    assert pool._claim("w") is None
+
+
+
+def test_claim_that_loses_the_repos_last_slot_is_handed_back(service):
+    ids = [_pending(service, "acme/roadrunner", 1), _pending(service, "acme/coyote", 2)]
+    service.decide_approvals(ids, "approve", "alice", "ok", _approve_all)
+    pool = ApprovalWorkerPool(service, workers=2, per_repo_concurrency=1)
+    claim = pool.queue.claim
+
+    def _racing_claim(db, worker_id, *, exclude_repos=None):
+        job = claim(db, worker_id, exclude_repos=exclude_repos)
+        if job is not None and job.repo == "acme/roadrunner":
+            # Another worker takes the repo's only slot during this claim.
+            pool._running["acme/roadrunner"] = 1
+        return job
+
+    pool.queue.claim = _racing_claim
+    job = pool._claim("w")
+
+    assert (job.approval_id, job.repo) == (ids[1], "acme/coyote")
+    assert pool._running == {"acme/roadrunner": 1, "acme/coyote": 1}
+    assert [(j.status, j.attempts, j.worker_id) for j in _jobs(service)] == [
+        ("queued", 0, ""),
+        ("running", 1, "w"),
+    ]
+
+def test_worker_pool_drains_bulk_approvals(service):
+    ids = [_pending(service, f"acme/repo{n % 3}", n) for n in range(9)]
+    results = service.decide_approvals(ids, "approve", "alice", "ok", _approve_all)
+    assert {row["status"] for row in results} == {"approved"}
+
+    pool = ApprovalWorkerPool(service, workers=3, poll_interval_seconds=0.01)
+    pool.start()
+    deadline = time.monotonic() + 5
+    while pool.stats()["executed"] < 9 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pool.stop()
+
+    assert sorted(number for _, number in service.github_client.calls) == list(range(9))
+    assert {_approval_status(service, approval_id) for approval_id in ids} == {"executed"}
+
+
+def test_builders(service):
+    assert build_approval_job_queue(mode="inline", lease_seconds=1, max_attempts=1) is None
+    with pytest.raises(ValueError):
+        build_approval_job_queue(mode="celery", lease_seconds=1, max_attempts=1)
+    assert (
+        build_approval_worker_pool(
+            service, workers=0, per_repo_concurrency=1, poll_interval_seconds=1
+        )
+        is None
+    )
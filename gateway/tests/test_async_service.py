@@ -0,0 +1,221 @@
+import asyncio
+
+import pytest
+import respx
+from httpx import Response
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.async_service import AsyncAgent2AllowService
+from src.connectors.github_client import AsyncGithubClient
+from src.models import Approval, AuditLog, Base
+from src.policy import PolicyEngine
+from src.schemas import ToolCallRequest
+from src.service import IdempotencyConflictError
+from tests.test_service_transactions import RecordingSink, StubGithub
+
+
+class AsyncStubGithub:
+    def __init__(self):
+        self.calls: list[tuple] = []
+
+    async def list_issues(self, repo: str, state: str = "open") -> dict:
+        self.calls.append(("list_issues", repo, state))
+        return {"issues": [{"number": 1}]}
+
+    async def set_labels(self, repo: str, issue_number: int, labels: list[str]) -> dict:
+        self.calls.append(("set_labels", repo, issue_number, labels))
+        return {"labels": labels}
+
+    async def create_comment(self, repo: str, issue_number: int, body: str) -> dict:
+        self.calls.append(("create_comment", repo, issue_number, body))
+        return {"comment": {"id": 1, "body": body}}
+
+
+@pytest.fixture()
+async def service(tmp_path):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(
+        """
+version: 1
+defaults:
+  deny_by_default: true
+rules:
+  - tool: github
+    actions: [issues.list]
+    repo: acme/*
+    risk: low
+    allow: true
+    approval_required: false
+  - tool: github
+    actions: [issues.set_labels]
+    repo: acme/roadrunner
+    risk: medium
+    allow: true
+""".strip(),
+        encoding="utf-8",
+    )
+    db_path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    service = AsyncAgent2AllowService(
+        session_factory=sessionmaker(bind=engine, autoflush=False, autocommit=False),
+        async_session_factory=async_sessionmaker(async_engine, expire_on_commit=False),
+        policy_engine=PolicyEngine(str(policy)),
+        github_client=StubGithub(),
+        async_github_client=AsyncStubGithub(),
+        audit_sink=RecordingSink(),
+    )
+    yield service
+    await async_engine.dispose()
+
+
+def _request(action: str, params: dict, key: str | None = None) -> ToolCallRequest:
+    return ToolCallRequest(
+        agent_id="triage-agent",
+        tool="github",
+        action=action,
+        repo="acme/roadrunner",
+        params=params,
+        idempotency_key=key,
+    )
+
+
+async def test_async_read_call_executes_on_async_connector(service):
+    status, _, result, approval_id, replay = await service.handle_tool_call_async(
+        _request("issues.list", {"state": "open"})
+    )
+
+    assert (status, approval_id, replay) == ("executed", None, False)
+    assert result == {"issues": [{"number": 1}]}
+    assert service.async_github_client.calls == [("list_issues", "acme/roadrunner", "open")]
+    assert [e["status"] for e in service.audit_sink.events] == ["executed"]
+
+
+async def test_async_approval_flow_and_idempotent_replay(service):
+    request = _request("issues.set_labels", {"issue_number": 7, "labels": ["bug"]}, key="k-1")
+    status, _, _, approval_id, _ = await service.handle_tool_call_async(request)
+    assert status == "pending_approval"
+
+    replayed = await service.handle_tool_call_async(request)
+    assert replayed[0] == "pending_approval"
+    assert replayed[3] == approval_id
+    assert replayed[4] is True
+
+    with pytest.raises(IdempotencyConflictError):
+        await service.handle_tool_call_async(
+            _request("issues.set_labels", {"issue_number": 7, "labels": ["other"]}, key="k-1")
+        )
+
+    status, result = await service.approve_async(approval_id, "alice", "ok")
+    assert status == "executed"
+    assert result == {"labels": ["bug"]}
+    assert await service.approve_async(approval_id, "alice", "again") == ("invalid_state", None)
+
+    with service.session_factory() as db:
+        assert db.get(Approval, approval_id).status == "executed"
+        assert db.scalar(select(func.count()).select_from(AuditLog)) == 4
+
+
+async def test_async_deny_and_missing_approval(service):
+    request = _request("issues.set_labels", {"issue_number": 3, "labels": ["wontfix"]})
+    _, _, _, approval_id, _ = await service.handle_tool_call_async(request)
+
+    assert await service.deny_async(approval_id, "bob", "no") == "denied"
+    assert await service.deny_async(approval_id, "bob", "no") == "invalid_state"
+    assert await service.deny_async(999, "bob", "no") == "not_found"
+    assert (await service.get_approval_async(approval_id)).status == "denied"
+    assert service.async_github_client.calls == []
+
+
+@respx.mock
+async def test_async_github_client_retries_on_500():
+    route = respx.get("https://api.github.test/repos/acme/road/issues")
+    route.side_effect = [
+        Response(500, json={"message": "upstream error"}),
+        Response(200, json=[{"number": 1}]),
+    ]
+
+    client = AsyncGithubClient("https://api.github.test", retry_attempts=3, retry_backoff_ms=1)
+    try:
+        payload = await client.list_issues("acme/road")
+    finally:
+        await client.aclose()
+
+    assert payload == {"issues": [{"number": 1}]}
+    assert route.call_count == 2
+
+
+async def test_async_batch_runs_reads_concurrently_up_to_limit(service):
+    in_flight = 0
+    peak = 0
+
+    async def slow_list_issues(repo: str, state: str = "open") -> dict:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"issues": []}
+
+    service.async_github_client.list_issues = slow_list_issues
+    requests = [_request("issues.list", {"state": f"s{i}"}) for i in range(6)]
+    requests.append(_request("issues.set_labels", {"issue_number": 1, "labels": ["bug"]}))
+
+    outcomes = await service.handle_tool_calls_async(requests, max_concurrency=3)
+
+    assert [o[0] for o in outcomes] == ["executed"] * 6 + ["pending_approval"]
+    assert peak == 3
+    with service.session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(AuditLog)) == 7
+
+
+async def test_async_bulk_approval_keeps_order_and_commits_decisions_first(service):
+    ids = []
+    for number in (1, 2):
+        request = _request("issues.set_labels", {"issue_number": number, "labels": ["bug"]})
+        ids.append((await service.handle_tool_call_async(request))[3])
+
+    results = await service.decide_approvals_async(
+        [ids[1], 999, ids[0]], "approve", "alice", "ok", lambda _risk: (True, "")
+    )
+
+    assert [(row["id"], row["status"]) for row in results] == [
+        (ids[1], "executed"),
+        (999, "not_found"),
+        (ids[0], "executed"),
+    ]
+    assert [call[2] for call in service.async_github_client.calls] == [2, 1]
+    with service.session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(AuditLog)) == 6
+
+
+async def test_async_connector_failures_are_audited(service):
+    async def broken(*args, **kwargs) -> dict:
+        raise RuntimeError("upstream down")
+
+    service.async_github_client.list_issues = broken
+    service.async_github_client.set_labels = broken
+    read = _request("issues.list", {"state": "open"})
+    ids = []
+    for number in (1, 2, 3):
+        request = _request("issues.set_labels", {"issue_number": number, "labels": ["bug"]})
+        ids.append((await service.handle_tool_call_async(request))[3])
+
+    single = await service.handle_tool_call_async(read)
+    batch = await service.handle_tool_calls_async([read])
+    approved = await service.approve_async(ids[0], "alice", "ok")
+    bulk = await service.decide_approvals_async(
+        ids[1:], "approve", "alice", "ok", lambda _risk: (True, "")
+    )
+
+    assert (single[0], single[1]) == ("error", "upstream down")
+    assert (batch[0][0], batch[0][1]) == ("error", "upstream down")
+    assert approved == ("error", {"error": "upstream down"})
+    assert [row["status"] for row in bulk] == ["error", "error"]
+    with service.session_factory() as db:
+        assert [a.status for a in db.scalars(select(Approval).order_by(Approval.id))] == [
+            "failed"
+        ] * 3
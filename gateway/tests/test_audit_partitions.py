@@ -0,0 +1,225 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from src.audit_partitions import (
+    AuditMaintenance,
+    AuditPartition,
+    AuditPartitionManager,
+    SqlitePartitionFiles,
+    _free_range,
+    build_audit_partition_manager,
+    next_period,
+    partition_name,
+    period_start,
+)
+from src.audit_query import AuditLogFilter
+from src.migrations import run_migrations
+from src.models import AuditLog
+from src.policy import PolicyEngine
+from src.service import Agent2AllowService
+from tests.test_audit_writer import _row
+from tests.test_service_transactions import StubGithub
+
+NOW = datetime(2026, 3, 15, 12, 0, 0)
+
+
+def test_period_helpers():
+    assert period_start(NOW, "month") == datetime(2026, 3, 1)
+    assert period_start(NOW, "day") == datetime(2026, 3, 15)
+    assert next_period(datetime(2026, 12, 1), "month") == datetime(2027, 1, 1)
+    assert next_period(datetime(2026, 2, 28), "day") == datetime(2026, 3, 1)
+    assert partition_name(datetime(2026, 3, 1), "month") == "audit_logs_p202603"
+    assert partition_name(datetime(2026, 3, 15), "month") == "audit_logs_p20260315"
+    assert partition_name(datetime(2026, 3, 1), "day") == "audit_logs_p20260301"
+
+
+def test_free_range_skips_existing_partitions():
+    existing = [
+        AuditPartition("audit_logs_legacy", None, datetime(2026, 3, 10)),
+        AuditPartition("audit_logs_default"),
+    ]
+    assert _free_range(datetime(2026, 3, 1), datetime(2026, 4, 1), existing) == (
+        datetime(2026, 3, 10),
+        datetime(2026, 4, 1),
+    )
+    assert _free_range(datetime(2026, 2, 1), datetime(2026, 3, 1), existing) is None
+
+
+def test_partial_manager_fails_at_construction():
+    class CompactOnly(AuditPartitionManager):
+        def compact(self, now):
+            return []
+
+    with pytest.raises(TypeError, match="abstract"):
+        CompactOnly(create_engine("sqlite://"))
+
+
+@pytest.fixture()
+def partitioned(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'main.db'}", connect_args={"check_same_thread": False}
+    )
+    run_migrations(engine)
+    manager = SqlitePartitionFiles(
+        engine,
+        partition_dir=tmp_path / "partitions",
+        archive_dir=tmp_path / "archive",
+        retention_days=40,
+    )
+    policy = tmp_path / "policy.yml"
+    policy.write_text("version: 1\nrules: []\n")
+    service = Agent2AllowService(
+        session_factory=sessionmaker(bind=engine, autoflush=False),
+        policy_engine=PolicyEngine(str(policy)),
+        github_client=StubGithub(),
+        audit_partitions=manager,
+    )
+    rows = []
+    for day in range(60):
+        row = _row(day)
+        row["timestamp"] = datetime(2026, 1, 15) + timedelta(days=day)
+        row["agent_id"] = "even" if day % 2 == 0 else "odd"
+        rows.append(row)
+    with engine.begin() as connection:
+        connection.execute(insert(AuditLog), rows)
+    return engine, manager, service
+
+
+def test_compaction_rolls_closed_periods_into_files(partitioned, tmp_path):
+    engine, manager, _ = partitioned
+
+    assert manager.compact(NOW) == ["audit_logs_p202601", "audit_logs_p202602"]
+    assert manager.compact(NOW) == []
+
+    assert sorted(p.name for p in (tmp_path / "partitions").glob("*.db")) == [
+        "audit_logs_p202601.db",
+        "audit_logs_p202602.db",
+    ]
+    with engine.connect() as connection:
+        oldest = connection.scalar(select(func.min(AuditLog.timestamp)))
+    assert oldest == datetime(2026, 3, 1)
+    assert [p.name for p in manager.partitions()] == [
+        "audit_logs",
+        "audit_logs_p202602",
+        "audit_logs_p202601",
+    ]
+
+
+def test_late_row_in_a_rolled_period_is_not_lost(partitioned):
+    engine, manager, service = partitioned
+    # Empty the main table entirely: ids must still not start over.
+    manager.compact(datetime(2026, 6, 1))
+    late = _row(99)
+    late["timestamp"] = datetime(2026, 1, 20, 8, 0)
+    with engine.begin() as connection:
+        late_id = connection.execute(insert(AuditLog).values(**late)).inserted_primary_key[0]
+
+    assert late_id == 61
+    assert manager.compact(datetime(2026, 6, 1)) == ["audit_logs_p202601"]
+    rows, _ = service.query_audit_logs(limit=100)
+    assert sorted(row.id for row in rows) == list(range(1, 62))
+    assert [row.message for row in rows if row.id == late_id] == ["call 99"]
+
+
+def test_compaction_keeps_rows_whose_id_clashes_with_a_file(partitioned):
+    engine, manager, _ = partitioned
+    manager.compact(NOW)
+    clash = {**_row(99), "id": 5, "timestamp": datetime(2026, 1, 20, 8, 0)}
+    with engine.begin() as connection:
+        connection.execute(insert(AuditLog).values(**clash))
+
+    with pytest.raises(RuntimeError, match="clash"):
+        manager.compact(NOW)
+    with engine.connect() as connection:
+        assert connection.scalar(select(AuditLog.message).where(AuditLog.id == 5)) == "call 99"
+
+
+def test_ensure_partitions_reserves_ids_held_by_files(partitioned):
+    engine, manager, _ = partitioned
+    manager.compact(datetime(2026, 6, 1))
+    with engine.begin() as connection:
+        # A database that predates AUTOINCREMENT has no sequence to start from.
+        connection.execute(text("DELETE FROM sqlite_sequence WHERE name = 'audit_logs'"))
+
+    manager.ensure_partitions(NOW)
+    with engine.begin() as connection:
+        assert connection.execute(insert(AuditLog).values(**_row(1))).inserted_primary_key[0] == 61
+
+
+def test_reads_span_partitions(partitioned):
+    _, manager, service = partitioned
+    manager.compact(NOW)
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        rows, cursor = service.query_audit_logs(limit=7, cursor=cursor)
+        seen.extend(row.id for row in rows)
+        if cursor is None:
+            break
+    assert seen == list(range(60, 0, -1))
+
+    even, _ = service.query_audit_logs(AuditLogFilter(agent_id="even"), limit=100)
+    assert len(even) == 30
+    exported = [row.id for row in service.iter_audit_logs(chunk_size=8)]
+    assert exported == list(range(1, 61))
+
+
+def test_retention_drops_or_archives_whole_partitions(partitioned, tmp_path):
+    _, manager, service = partitioned
+    manager.compact(NOW)
+
+    # Cutoff is 2026-02-03: January (ends 2026-02-01) expires, February stays.
+    assert manager.apply_retention(NOW) == ["audit_logs_p202601"]
+    assert not (tmp_path / "partitions" / "audit_logs_p202601.db").exists()
+    rows, _ = service.query_audit_logs(limit=100)
+    assert min(row.timestamp for row in rows) == datetime(2026, 2, 1)
+
+    manager.retention_action = "archive"
+    assert manager.apply_retention(NOW + timedelta(days=40)) == ["audit_logs_p202602"]
+    assert (tmp_path / "archive" / "audit_logs_p202602.db").exists()
+
+
+def test_maintenance_job_runs_and_survives_failures(partitioned):
+    _, manager, _ = partitioned
+    maintenance = AuditMaintenance(manager, interval_seconds=60)
+
+    assert maintenance.run_once(NOW) == {
+        "created": [],
+        "compacted": ["audit_logs_p202601", "audit_logs_p202602"],
+        "expired": ["audit_logs_p202601"],
+    }
+
+    def _fail(now):
+        raise RuntimeError("disk full")
+
+    manager.compact = _fail
+    assert maintenance.run_once(NOW) == {}
+    assert (maintenance.runs, maintenance.failed_runs) == (1, 1)
+
+
+def test_build_manager_by_backend(tmp_path):
+    engine = create_engine("sqlite://")
+    options = {
+        "interval": "month",
+        "premake": 2,
+        "partition_dir": "",
+        "retention_days": 0,
+        "retention_action": "drop",
+        "archive_dir": "",
+    }
+    assert build_audit_partition_manager(engine, database_url="sqlite://", **options) is None
+    options["interval"] = "none"
+    url = f"sqlite:///{tmp_path / 'db.sqlite'}"
+    assert build_audit_partition_manager(engine, database_url=url, **options) is None
+    options["interval"] = "day"
+    manager = build_audit_partition_manager(engine, database_url=url, **options)
+    assert isinstance(manager, SqlitePartitionFiles)
+    assert manager.partition_dir == tmp_path / "audit-partitions"
+    with pytest.raises(ValueError):
+        build_audit_partition_manager(
+            engine, database_url=url, **{**options, "retention_action": "truncate"}
+        )
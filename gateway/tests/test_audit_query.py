@@ -0,0 +1,120 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.audit_query import (
+    AuditLogFilter,
+    InvalidCursorError,
+    audit_log_query,
+    decode_cursor,
+    encode_cursor,
+)
+from src.models import AuditLog, Base
+from src.policy import PolicyEngine
+from src.service import Agent2AllowService
+from tests.test_service_transactions import StubGithub
+
+BASE_TIME = datetime(2026, 3, 1, 12, 0, 0)
+
+
+@pytest.fixture()
+def service(tmp_path):
+    policy = tmp_path / "policy.yml"
+    policy.write_text("version: 1\ndefaults:\n  deny_by_default: true\nrules: []\n")
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    rows = []
+    for idx in range(25):
+        rows.append(
+            {
+                # Pairs of rows share a timestamp so the id tiebreaker is exercised.
+                "timestamp": BASE_TIME + timedelta(seconds=idx // 2),
+                "agent_id": "agent-a" if idx % 2 == 0 else "agent-b",
+                "tool": "github",
+                "action": "issues.list",
+                "repo": "acme/roadrunner",
+                "risk_level": "low",
+                "status": "executed" if idx % 3 else "denied",
+                "request_payload": "{}",
+                "response_payload": "{}",
+                "approval_id": None,
+                "message": f"row {idx}",
+            }
+        )
+    with session_factory() as db:
+        db.execute(insert(AuditLog), rows)
+        db.commit()
+    return Agent2AllowService(
+        session_factory=session_factory,
+        policy_engine=PolicyEngine(str(policy)),
+        github_client=StubGithub(),
+    )
+
+
+def _walk(service, filters=None, limit=4):
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = service.query_audit_logs(filters, limit=limit, cursor=cursor)
+        seen.extend(row.message for row in rows)
+        pages += 1
+        if cursor is None:
+            return seen, pages
+
+
+def test_keyset_pages_cover_every_row_once_newest_first(service):
+    seen, pages = _walk(service)
+
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+    assert seen[0] == "row 24"
+    assert seen[-1] == "row 0"
+    assert pages == 7
+
+
+def test_filters_and_time_range_apply_to_every_page(service):
+    filters = AuditLogFilter(
+        agent_id="agent-a",
+        status="executed",
+        since=BASE_TIME + timedelta(seconds=2),
+        until=(BASE_TIME + timedelta(seconds=10)).replace(tzinfo=UTC),
+    )
+    seen, _ = _walk(service, filters, limit=2)
+
+    assert seen == ["row 16", "row 14", "row 10", "row 8", "row 4"]
+
+
+def test_invalid_cursor_is_rejected(service):
+    with pytest.raises(InvalidCursorError):
+        service.query_audit_logs(limit=5, cursor="not-a-cursor")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("")
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [AuditLogFilter(), AuditLogFilter(agent_id="agent-a"), AuditLogFilter(status="denied")],
+)
+def test_filtered_pages_use_composite_index_without_sort(service, filters):
+    engine = service.session_factory.kw["bind"]
+    statement = audit_log_query(filters).limit(10)
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as connection:
+        plan = " ".join(
+            str(row[-1]) for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")
+        )
+
+    assert "USING INDEX ix_audit_logs_" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_iter_audit_logs_streams_oldest_first_in_chunks_and_resumes(service):
+    rows = list(service.iter_audit_logs(chunk_size=4))
+    assert [row.message for row in rows] == [f"row {idx}" for idx in range(25)]
+
+    resumed = service.iter_audit_logs(
+        AuditLogFilter(agent_id="agent-b"), cursor=encode_cursor(rows[10]), chunk_size=3
+    )
+    assert [row.message for row in resumed] == [f"row {idx}" for idx in range(11, 25, 2)]
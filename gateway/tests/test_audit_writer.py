@@ -0,0 +1,161 @@
+import threading
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.audit_sink import NoopAuditSink
+from src.audit_writer import AuditWriter, build_audit_writer
+from src.models import AuditLog, Base
+
+
+class RecordingSink:
+    def __init__(self):
+        self.events: list[dict] = []
+
+    def emit(self, event) -> None:
+        self.events.append(dict(event))
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'audit.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+def _row(idx: int) -> dict:
+    return {
+        "timestamp": datetime.now(UTC),
+        "agent_id": "triage-agent",
+        "tool": "github",
+        "action": "issues.list",
+        "repo": "acme/roadrunner",
+        "risk_level": "read",
+        "schema_version": 1,
+        "status": "executed",
+        "request_payload": "{}",
+        "response_payload": "{}",
+        "approval_id": None,
+        "message": f"call {idx}",
+    }
+
+
+def _count(session_factory) -> int:
+    with session_factory() as db:
+        return db.scalar(select(func.count()).select_from(AuditLog))
+
+
+def test_group_commit_rows_are_durable_when_submit_returns(session_factory):
+    sink = RecordingSink()
+    writer = AuditWriter(session_factory, mode="group_commit", audit_sink=sink)
+    writer.start()
+    try:
+        writer.submit([_row(1)], [{"status": "executed"}])
+        assert _count(session_factory) == 1
+        assert sink.events == [{"status": "executed"}]
+    finally:
+        writer.close()
+
+
+def test_async_mode_batches_rows_and_flushes_on_close(session_factory):
+    writer = AuditWriter(
+        session_factory, mode="async", batch_size=50, flush_interval_ms=1_000
+    )
+    writer.start()
+    for idx in range(120):
+        writer.submit([_row(idx)], [])
+    writer.close()
+
+    assert _count(session_factory) == 120
+    assert writer.rows_written == 120
+    assert writer.batches_written < 120
+
+
+def test_full_queue_falls_back_to_inline_write(session_factory):
+    release = threading.Event()
+    first_write = threading.Event()
+    calls = 0
+
+    def slow_session_factory():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            first_write.set()
+            release.wait(5)
+        return session_factory()
+
+    writer = AuditWriter(
+        slow_session_factory,
+        mode="async",
+        max_queue_size=1,
+        flush_interval_ms=0,
+        enqueue_timeout_ms=0,
+    )
+    writer.start()
+    writer.submit([_row(1)], [])
+    assert first_write.wait(5)
+    writer.submit([_row(2)], [])
+    writer.submit([_row(3)], [])
+
+    assert writer.inline_writes == 1
+    assert _count(session_factory) == 1
+
+    release.set()
+    writer.close()
+    assert _count(session_factory) == 3
+
+
+def test_transient_insert_failures_are_retried(session_factory):
+    failures = 2
+
+    def flaky_session_factory():
+        nonlocal failures
+        if failures:
+            failures -= 1
+            raise RuntimeError("database is locked")
+        return session_factory()
+
+    writer = AuditWriter(flaky_session_factory, mode="async", retry_backoff_ms=0)
+    writer.start()
+    writer.submit([_row(1), _row(2)], [])
+    writer.close()
+
+    assert _count(session_factory) == 2
+    assert writer.stats()["retries"] == 2
+    assert writer.failed_rows == 0
+
+
+def test_only_the_poison_row_of_a_failed_batch_is_dropped(session_factory):
+    sink = RecordingSink()
+    writer = AuditWriter(
+        session_factory, mode="async", audit_sink=sink, retry_attempts=2, retry_backoff_ms=0
+    )
+    poison = {**_row(2), "agent_id": None}
+    writer.start()
+    writer.submit([_row(1), poison, _row(3)], [{"id": 1}, {"id": 2}, {"id": 3}])
+    writer.close()
+
+    assert _count(session_factory) == 2
+    assert (writer.rows_written, writer.failed_rows) == (2, 1)
+    # The sink still receives the dropped row's event.
+    assert sink.events == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+
+def test_build_audit_writer_modes(session_factory):
+    kwargs = {
+        "audit_sink": NoopAuditSink(),
+        "max_queue_size": 10,
+        "batch_size": 10,
+        "flush_interval_ms": 10,
+        "enqueue_timeout_ms": 10,
+    }
+    assert build_audit_writer(session_factory, mode="sync", **kwargs) is None
+    writer = build_audit_writer(session_factory, mode="group-commit", **kwargs)
+    assert isinstance(writer, AuditWriter)
+    assert writer.mode == "group_commit"
+    with pytest.raises(ValueError):
+        build_audit_writer(session_factory, mode="eventually", **kwargs)
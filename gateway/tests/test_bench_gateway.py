@@ -0,0 +1,87 @@
+import json
+import subprocess
+import sys
+import time
+
+from connectors.github import mock_server
+from fastapi.testclient import TestClient
+
+
+def _bench(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "scripts/bench_gateway.py", *args],
+        cwd=".",
+        capture_output=True,
+        text=True,
+        timeout=180,
+    )
+
+
+def test_bench_gateway_writes_comparable_results(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    result = _bench(
+        "--requests",
+        "40",
+        "--warmup",
+        "5",
+        "--concurrency",
+        "4",
+        "--latency-ms",
+        "0",
+        "--jitter-ms",
+        "0",
+        "--micro",
+        "--micro-iterations",
+        "1000",
+        "--output",
+        str(baseline),
+    )
+    assert result.returncode == 0, result.stderr
+
+    results = json.loads(baseline.read_text())
+    assert results["format"] == "agent2allow-bench/1"
+    load = results["load"]
+    assert (load["requests"], load["errors"], load["database"]) == (40, 0, "sqlite")
+    assert set(load["statuses"]) <= {"executed", "denied", "pending_approval"}
+    assert load["db_bytes_after"] >= load["db_bytes_before"] > 0
+    assert "policy_decide" in load["stage_mean_ms"]
+    assert set(results["micro"]) == {"policy_decide_us", "request_hash_us", "audit_row_us"}
+
+    compared = _bench(
+        "--skip-load",
+        "--micro-iterations",
+        "1000",
+        "--compare",
+        str(baseline),
+        "--max-regression",
+        "-100",
+        "--json",
+    )
+    assert compared.returncode == 1
+    rows = json.loads(compared.stdout)["comparison"]
+    assert {row["metric"] for row in rows} == {
+        "micro.policy_decide_us",
+        "micro.request_hash_us",
+        "micro.audit_row_us",
+    }
+
+
+def test_bench_gateway_rejects_unknown_traffic_kinds():
+    result = _bench("--mix", "read=1,bogus=1")
+    assert result.returncode == 2
+    assert "invalid mix entry 'bogus=1'" in result.stderr
+
+
+def test_mock_server_injects_latency_into_github_routes():
+    with TestClient(mock_server.app) as http:
+        http.put("/_mock/latency", json={"delay_ms": 50})
+        try:
+            started = time.perf_counter()
+            assert http.get("/repos/acme/roadrunner/issues").status_code == 200
+            assert time.perf_counter() - started >= 0.05
+            started = time.perf_counter()
+            http.get("/health")
+            assert time.perf_counter() - started < 0.05
+            assert http.put("/_mock/latency", json={"delay_ms": -1}).status_code == 422
+        finally:
+            http.put("/_mock/latency", json={})
@@ -0,0 +1,186 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from src.coalescing import RequestCoalescer, build_request_coalescer
+from src.models import AuditLog, Base
+from src.policy import PolicyEngine
+from src.schemas import ToolCallRequest
+from src.service import COALESCED_MESSAGE, Agent2AllowService
+from tests.test_service_transactions import StubGithub
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+def _run_threads(count: int, target) -> tuple[list[threading.Thread], list]:
+    results: list = []
+    threads = [threading.Thread(target=lambda: results.append(target())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_calls_share_one_execution():
+    coalescer = RequestCoalescer()
+    gate = threading.Event()
+    executions: list[int] = []
+
+    def _fetch() -> dict:
+        executions.append(1)
+        gate.wait(5)
+        return {"issues": []}
+
+    threads, results = _run_threads(5, lambda: coalescer.do("k", _fetch))
+    _wait_for(lambda: coalescer.stats()["coalesced"] == 4)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(executions) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert coalescer.stats() == {
+        "calls": 5,
+        "executions": 1,
+        "coalesced": 4,
+        "coalescing_ratio": 0.8,
+        "in_flight": 0,
+    }
+    # Nothing is cached once the flight lands.
+    assert coalescer.do("k", lambda: {"issues": [1]}) == ({"issues": [1]}, False)
+    assert build_request_coalescer(enabled=False) is None
+
+
+def test_followers_receive_the_leaders_error():
+    coalescer = RequestCoalescer()
+    gate = threading.Event()
+    errors: list[Exception] = []
+
+    def _fail() -> dict:
+        gate.wait(5)
+        raise RuntimeError("upstream 502")
+
+    def _call() -> None:
+        try:
+            coalescer.do("k", _fail)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    threads, _ = _run_threads(3, _call)
+    _wait_for(lambda: coalescer.stats()["coalesced"] == 2)
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert [str(exc) for exc in errors] == ["upstream 502"] * 3
+
+
+async def test_async_calls_share_one_execution():
+    coalescer = RequestCoalescer()
+    executions: list[int] = []
+
+    async def _fetch() -> dict:
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        return {"issues": []}
+
+    results = await asyncio.gather(*(coalescer.do_async("k", _fetch) for _ in range(4)))
+
+    assert len(executions) == 1
+    assert [shared for _, shared in results] == [False, True, True, True]
+    assert coalescer.stats()["in_flight"] == 0
+
+
+async def test_cancelling_the_leader_does_not_fail_followers():
+    coalescer = RequestCoalescer()
+    gate = asyncio.Event()
+
+    async def _fetch() -> dict:
+        await gate.wait()
+        return {"issues": []}
+
+    leader = asyncio.ensure_future(coalescer.do_async("k", _fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(coalescer.do_async("k", _fetch))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    gate.set()
+
+    assert await follower == ({"issues": []}, True)
+    assert leader.cancelled()
+    assert coalescer.stats()["in_flight"] == 0
+
+
+class BlockingGithub(StubGithub):
+    def __init__(self):
+        self.gate = threading.Event()
+        self.list_calls = 0
+
+    def list_issues(self, repo: str, state: str = "open") -> dict:
+        self.list_calls += 1
+        self.gate.wait(5)
+        return {"issues": [{"number": 1}]}
+
+
+@pytest.fixture()
+def service(tmp_path):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(
+        "version: 1\nrules:\n  - tool: github\n    actions: [issues.list]\n"
+        "    repo: acme/roadrunner\n    risk: read\n    allow: true\n"
+    )
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    return Agent2AllowService(
+        session_factory=sessionmaker(bind=engine, autoflush=False),
+        policy_engine=PolicyEngine(str(policy)),
+        github_client=BlockingGithub(),
+        coalescer=RequestCoalescer(),
+    )
+
+
+def _list_request(agent_id: str, state: str = "open") -> ToolCallRequest:
+    return ToolCallRequest(
+        agent_id=agent_id,
+        tool="github",
+        action="issues.list",
+        repo="acme/roadrunner",
+        params={"state": state},
+    )
+
+
+def test_identical_reads_share_one_upstream_call(service):
+    threads, results = _run_threads(
+        4, lambda: service.handle_tool_call(_list_request(threading.current_thread().name))
+    )
+    _wait_for(lambda: service.coalescer.stats()["coalesced"] == 3)
+    service.github_client.gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert service.github_client.list_calls == 1
+    assert {status for status, *_ in results} == {"executed"}
+    assert all(result == {"issues": [{"number": 1}]} for _, _, result, _, _ in results)
+    with service.session_factory() as db:
+        rows = db.scalars(select(AuditLog)).all()
+    assert len(rows) == 4
+    assert sorted(row.message for row in rows) == ["executed"] + [COALESCED_MESSAGE] * 3
+
+
+def test_different_params_are_not_coalesced(service):
+    service.github_client.gate.set()
+    outcomes = service.handle_tool_calls([_list_request("a"), _list_request("b", "closed")])
+
+    assert [message for _, message, *_ in outcomes] == ["executed", "executed"]
+    assert service.github_client.list_calls == 2
@@ -0,0 +1,152 @@
+import threading
+
+import pytest
+from sqlalchemy import event, func, select
+
+from src.models import AuditLog, Base, IdempotencyRecord
+from src.policy import PolicyEngine
+from src.schemas import ToolCallRequest
+from src.service import Agent2AllowService, IdempotencyConflictError
+from tests.test_service_transactions import StubGithub
+
+PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 5000,
+    "mmap_size": 1048576,
+    "cache_size": -2048,
+    "temp_store": "memory",
+}
+
+
+def _engines(db_module, tmp_path, **kwargs):
+    engine, writer = db_module.create_engines(f"sqlite:///{tmp_path / 'db.sqlite'}", **kwargs)
+    Base.metadata.create_all(bind=writer or engine)
+    return engine, writer
+
+
+def test_sqlite_pragmas_applied_on_connect(db_module, tmp_path):
+    engine, _ = _engines(db_module, tmp_path, sqlite_pragmas=PRAGMAS)
+    with engine.connect() as connection:
+        pragma = connection.exec_driver_sql
+        assert pragma("PRAGMA journal_mode").scalar() == "wal"
+        assert pragma("PRAGMA synchronous").scalar() == 1
+        assert pragma("PRAGMA busy_timeout").scalar() == 5000
+        assert pragma("PRAGMA cache_size").scalar() == -2048
+        assert pragma("PRAGMA temp_store").scalar() == 2
+
+
+def test_memory_database_skips_writer_split(db_module):
+    engine, writer = db_module.create_engines(
+        "sqlite://", sqlite_pragmas=PRAGMAS, single_writer=True
+    )
+    assert writer is None
+    engine.dispose()
+
+
+def test_database_urls_use_the_installed_drivers(db_module):
+    plain = "postgresql://u:p@db:5432/agent2allow"
+    assert db_module.sync_database_url(plain) == "postgresql+psycopg://u:p@db:5432/agent2allow"
+    assert db_module.sync_database_url("sqlite:///./x.db") == "sqlite:///./x.db"
+    assert db_module.async_database_url(plain) == (
+        "postgresql+psycopg_async://u:p@db:5432/agent2allow"
+    )
+    assert db_module.async_database_url("postgresql+psycopg://h/d") == (
+        "postgresql+psycopg_async://h/d"
+    )
+    assert db_module.async_database_url("postgresql+asyncpg://h/d") == "postgresql+asyncpg://h/d"
+    assert db_module.async_database_url("sqlite:///./x.db") == "sqlite+aiosqlite:///./x.db"
+    engine, _ = db_module.create_engines(plain)
+    assert engine.dialect.driver == "psycopg"
+    engine.dispose()
+
+
+def test_writes_route_to_single_writer_and_reads_to_pool(db_module, tmp_path):
+    engine, writer = _engines(db_module, tmp_path, sqlite_pragmas=PRAGMAS, single_writer=True)
+    assert writer.pool.size() == 1
+    seen: dict[str, list[str]] = {"reader": [], "writer": []}
+    event.listen(engine, "before_cursor_execute", lambda *a: seen["reader"].append(a[2]))
+    event.listen(writer, "before_cursor_execute", lambda *a: seen["writer"].append(a[2]))
+
+    policy = tmp_path / "policy.yml"
+    policy.write_text(
+        "version: 1\nrules:\n  - tool: github\n    actions: [issues.set_labels]\n"
+        "    repo: acme/roadrunner\n    risk: medium\n    allow: true\n"
+    )
+    service = Agent2AllowService(
+        session_factory=db_module.build_session_factory(engine, writer),
+        policy_engine=PolicyEngine(str(policy)),
+        github_client=StubGithub(),
+    )
+    request = ToolCallRequest(
+        agent_id="a",
+        tool="github",
+        action="issues.set_labels",
+        repo="acme/roadrunner",
+        params={"issue_number": 1, "labels": ["bug"]},
+        idempotency_key="route-key",
+    )
+    status, *_ = service.handle_tool_call(request)
+
+    assert status == "pending_approval"
+    assert any(sql.startswith("SELECT") for sql in seen["reader"])
+    assert not any(sql.startswith("INSERT") for sql in seen["reader"])
+    assert any(sql.startswith("INSERT INTO approvals") for sql in seen["writer"])
+    assert any(sql.startswith("INSERT INTO audit_logs") for sql in seen["writer"])
+
+    with service.session_factory() as db:
+        db.add(IdempotencyRecord(key="taken", request_hash="other", response_payload="{}"))
+        db.commit()
+    with pytest.raises(IdempotencyConflictError):
+        service.handle_tool_call(request.model_copy(update={"idempotency_key": "taken"}))
+
+
+def test_concurrent_writers_do_not_hit_database_locked(db_module, tmp_path):
+    engine, writer = _engines(db_module, tmp_path, sqlite_pragmas=PRAGMAS, single_writer=True)
+    session_factory = db_module.build_session_factory(engine, writer)
+    errors: list[Exception] = []
+
+    def _write(worker: int) -> None:
+        try:
+            for idx in range(25):
+                with session_factory() as db:
+                    db.add(
+                        AuditLog(
+                            agent_id=f"w{worker}",
+                            tool="github",
+                            action="issues.list",
+                            repo="acme/r",
+                            risk_level="low",
+                            status="executed",
+                            request_payload="{}",
+                            message=str(idx),
+                        )
+                    )
+                    db.commit()
+        except Exception as exc:  # pragma: no cover
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_write, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(AuditLog)) == 200
+
+
+def test_session_keeps_writer_after_first_write(db_module, tmp_path):
+    engine, writer = _engines(db_module, tmp_path, sqlite_pragmas=PRAGMAS, single_writer=True)
+    session_factory = db_module.build_session_factory(engine, writer)
+    with session_factory() as db:
+        assert db.get_bind() is engine
+        db.add(IdempotencyRecord(key="k", request_hash="h", response_payload="{}"))
+        db.flush()
+        # Reads after the first write reuse the writer rather than taking a reader.
+        assert db.get_bind() is writer
+        assert db.scalar(select(func.count()).select_from(IdempotencyRecord)) == 1
+        db.commit()
+    with session_factory() as db:
+        assert db.get_bind() is engine
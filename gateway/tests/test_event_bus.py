@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+import respx
+from httpx import Response
+
+from src.event_bus import EventBus
+
+LABELS_URL = "https://api.github.test/repos/acme/roadrunner/issues/1/labels"
+
+
+async def test_events_published_from_threads_reach_subscribers():
+    bus = EventBus()
+    with bus.subscribe() as events:
+        thread = threading.Thread(target=bus.publish, args=("approval", {"approval_id": 1}))
+        thread.start()
+        thread.join()
+
+        event = await events.get(1)
+        assert event == {"seq": 1, "type": "approval", "data": {"approval_id": 1}}
+        assert await events.get(0.01) is None
+    assert bus.stats()["subscribers"] == 0
+
+
+async def test_resume_replays_history_and_flags_gaps():
+    bus = EventBus(history_size=3)
+    for number in range(5):
+        bus.publish("approval", {"approval_id": number})
+
+    with bus.subscribe(after=3) as events:
+        assert (await events.get(0))["seq"] == 4
+        assert (await events.get(0))["seq"] == 5
+        assert events.missed is False
+    with bus.subscribe(after=1) as events:
+        # seq 2 was evicted from the history.
+        assert events.missed is True
+        assert (await events.get(0))["seq"] == 3
+    with bus.subscribe(after=99) as events:
+        assert events.missed is True
+
+
+async def test_slow_subscriber_overflow_is_flagged_not_blocking():
+    bus = EventBus(max_queue_size=2)
+    with bus.subscribe() as events:
+        for number in range(4):
+            bus.publish("approval", {"approval_id": number})
+        await asyncio.sleep(0)
+        assert events.queue.qsize() == 2
+        assert events.missed is True
+    assert bus.stats()["dropped"] == 2
+
+
+def _pending_label_call(client) -> int:
+    response = client.post(
+        "/v1/tool-calls",
+        json={
+            "agent_id": "triage-agent",
+            "tool": "github",
+            "action": "issues.set_labels",
+            "repo": "acme/roadrunner",
+            "params": {"issue_number": 1, "labels": ["bug"]},
+        },
+    )
+    return response.json()["approval_id"]
+
+
+@respx.mock
+def test_wait_returns_when_the_approval_is_executed(client):
+    respx.post(LABELS_URL).mock(return_value=Response(200, json=["bug"]))
+    approval_id = _pending_label_call(client)
+    waited: list = []
+    waiter = threading.Thread(
+        target=lambda: waited.append(client.get(f"/v1/approvals/{approval_id}/wait?timeout=10"))
+    )
+    started = time.monotonic()
+    waiter.start()
+    time.sleep(0.1)
+    client.post(f"/v1/approvals/{approval_id}/approve", json={"approver": "alice"})
+    waiter.join()
+
+    body = waited[0].json()
+    assert (body["status"], body["timed_out"]) == ("executed", False)
+    assert body["result"] == {"labels": ["bug"]}
+    assert time.monotonic() - started < 5
+
+
+def test_wait_times_out_with_the_current_state(client):
+    approval_id = _pending_label_call(client)
+
+    body = client.get(f"/v1/approvals/{approval_id}/wait?timeout=0.05").json()
+    assert (body["status"], body["timed_out"], body["result"]) == ("pending", True, None)
+    assert client.get("/v1/approvals/999/wait?timeout=0").status_code == 404
+
+
+async def test_event_stream_sends_approval_changes_and_resets(client):
+    from src.main import _event_stream
+
+    bus = EventBus(history_size=3)
+    bus.publish("approval", {"approval_id": 1, "status": "pending"})
+    bus.publish("approval", {"approval_id": 2, "status": "pending"})
+    bus.publish("audit", {"id": 7, "approval_id": 2})
+    bus.publish("approval", {"approval_id": 2, "status": "denied"})
+
+    stream = _event_stream(bus, 0, 0.01, types=frozenset({"approval"}), approval_id=2)
+    chunks = [await anext(stream) for _ in range(5)]
+    await stream.aclose()
+
+    assert chunks[0] == b"retry: 3000\n\nevent: ready\ndata: {}\n\n"
+    assert chunks[1].startswith(b"id: 4\nevent: reset\n")
+    assert chunks[2] == b'id: 2\nevent: approval\ndata: {"approval_id": 2, "status": "pending"}\n\n'
+    assert chunks[3].startswith(b"id: 4\nevent: approval\n")
+    assert chunks[4] == b": keepalive\n\n"
+    assert bus.stats()["subscribers"] == 0
+
+
+async def test_committed_audit_rows_are_published_with_their_ids(client):
+    bus = client.app.state.service.event_bus
+    with bus.subscribe() as events:
+        approval_id = _pending_label_call(client)
+        approval, audit = await events.get(1), await events.get(1)
+
+    assert approval["type"] == "approval"
+    assert approval["data"]["approval_id"] == approval_id
+    assert approval["data"]["status"] == "pending"
+    [row] = client.get(f"/v1/audit?approval_id={approval_id}").json()
+    assert audit["type"] == "audit"
+    assert audit["data"]["id"] == row["id"]
+    assert audit["data"]["status"] == row["status"] == "pending_approval"
+    assert audit["data"]["request_payload"] == row["request_payload"]
+
+
+def test_event_stream_rejects_bad_types_and_resume_tokens(client):
+    assert client.get("/v1/events?types=approval,bogus").status_code == 400
+    assert client.get("/v1/events?after=-1").status_code == 422
+    assert client.get("/v1/events", headers={"Last-Event-ID": "x"}).status_code == 400
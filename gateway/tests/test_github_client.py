@@ -1,9 +1,12 @@
+import importlib.util
+
 import httpx
 import pytest
 import respx
 from httpx import Response
 
-from src.connectors.github_client import GithubClient
+from src.connectors.github_client import AsyncGithubClient, GithubClient
+from src.connectors.response_cache import ResponseCache, parse_ttls
 
 
 @respx.mock
@@ -50,3 +53,133 @@ def test_create_comment_raises_after_max_retries(monkeypatch):
         client.create_comment("acme/road", 1, "hi")
 
     assert route.call_count == 2
+
+
+@respx.mock
+def test_retries_and_timeouts_are_counted(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda _: None)
+    route = respx.get("https://api.github.test/repos/acme/road/issues")
+    route.side_effect = [
+        httpx.ReadTimeout("slow"),
+        Response(502, json={"message": "bad gateway"}),
+        Response(200, json=[]),
+    ]
+
+    client = GithubClient("https://api.github.test", retry_attempts=3, retry_backoff_ms=1)
+    client.list_issues("acme/road")
+
+    assert client.request_stats() == {"retries": 2, "timeouts": 1}
+
+
+@respx.mock
+def test_requests_share_one_pooled_http_client():
+    route = respx.get("https://api.github.test/repos/acme/road/issues").mock(
+        return_value=Response(200, json=[])
+    )
+    client = GithubClient("https://api.github.test", max_keepalive_connections=5)
+    pooled = client._client
+
+    client.list_issues("acme/road")
+    client.list_issues("acme/road")
+
+    assert route.call_count == 2
+    assert client._client is pooled
+    assert not pooled.is_closed
+    client.close()
+    assert pooled.is_closed
+
+
+@pytest.mark.skipif(importlib.util.find_spec("h2") is not None, reason="h2 installed")
+def test_http2_requires_h2_package():
+    with pytest.raises(RuntimeError, match="h2 is required"):
+        GithubClient("https://api.github.test", http2=True)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cached_client(clock: FakeClock, **limits) -> GithubClient:
+    cache = ResponseCache(ttl_seconds={"list_issues": 30}, clock=clock, **limits)
+    return GithubClient("https://api.github.test", response_cache=cache)
+
+
+@respx.mock
+def test_response_cache_serves_fresh_entries_and_revalidates_with_etag():
+    clock = FakeClock()
+    route = respx.get("https://api.github.test/repos/acme/road/issues")
+    route.side_effect = [
+        Response(200, json=[{"number": 1}], headers={"ETag": '"v1"'}),
+        Response(304, headers={"ETag": '"v1"'}),
+    ]
+    client = _cached_client(clock)
+
+    assert client.list_issues("acme/road") == {"issues": [{"number": 1}]}
+    assert client.list_issues("acme/road") == {"issues": [{"number": 1}]}
+    assert route.call_count == 1
+
+    clock.now = 31
+    assert client.list_issues("acme/road") == {"issues": [{"number": 1}]}
+    assert route.call_count == 2
+    assert route.calls.last.request.headers["If-None-Match"] == '"v1"'
+    stats = client.response_cache.stats()
+    assert (stats["hits"], stats["revalidated"]) == (1, 1)
+
+
+@respx.mock
+def test_writes_invalidate_cached_reads_for_the_repo():
+    clock = FakeClock()
+    issues = respx.get("https://api.github.test/repos/acme/road/issues").mock(
+        return_value=Response(200, json=[], headers={"ETag": '"v1"'})
+    )
+    respx.post("https://api.github.test/repos/acme/road/issues/1/labels").mock(
+        return_value=Response(200, json=["bug"])
+    )
+    client = _cached_client(clock)
+
+    client.list_issues("acme/road")
+    client.set_labels("acme/road", 1, ["bug"])
+    client.list_issues("acme/road")
+
+    assert issues.call_count == 2
+    assert "If-None-Match" not in issues.calls.last.request.headers
+    assert client.response_cache.stats()["invalidations"] == 1
+
+
+def test_response_cache_bounds_entries_by_bytes_and_skips_stale_writes():
+    cache = ResponseCache(ttl_seconds={"list_issues": 30}, max_bytes=10)
+    key = ("list_issues", "acme/road", "/issues", (("state", "open"),))
+    other = ("list_issues", "acme/road", "/issues", (("state", "closed"),))
+
+    _, _, generation = cache.lookup(key)
+    cache.store(key, b"123456", None, generation)
+    cache.store(other, b"123456", None, generation)
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["evictions"] == 1
+
+    # A read that started before a write must not repopulate the cache afterwards.
+    _, _, generation = cache.lookup(key)
+    cache.invalidate("acme/road")
+    cache.store(key, b"old", None, generation)
+    assert cache.lookup(key)[0] is None
+    assert parse_ttls("list_issues=60, other=5") == {"list_issues": 60.0, "other": 5.0}
+    with pytest.raises(ValueError):
+        parse_ttls("list_issues")
+
+
+@respx.mock
+async def test_async_client_uses_the_response_cache():
+    route = respx.get("https://api.github.test/repos/acme/road/issues").mock(
+        return_value=Response(200, json=[{"number": 2}], headers={"ETag": '"v2"'})
+    )
+    cache = ResponseCache(ttl_seconds={"list_issues": 30})
+    client = AsyncGithubClient("https://api.github.test", response_cache=cache)
+
+    assert await client.list_issues("acme/road") == {"issues": [{"number": 2}]}
+    assert await client.list_issues("acme/road") == {"issues": [{"number": 2}]}
+    assert route.call_count == 1
+    await client.aclose()
@@ -0,0 +1,142 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from src.idempotency import (
+    IdempotencyCache,
+    IdempotencySweeper,
+    build_idempotency_cache,
+    build_idempotency_sweeper,
+)
+from src.models import Base, IdempotencyRecord
+from src.policy import PolicyEngine
+from src.schemas import ToolCallRequest
+from src.service import Agent2AllowService
+from tests.test_service_transactions import StubGithub
+
+NOW = datetime(2026, 3, 15, 12, 0, 0)
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+def _service(session_factory, tmp_path, *, cache: IdempotencyCache | None, ttl: int = 3600):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(
+        "version: 1\nrules:\n  - tool: github\n    actions: [issues.list]\n"
+        "    repo: acme/roadrunner\n    risk: read\n    allow: true\n"
+    )
+    return Agent2AllowService(
+        session_factory=session_factory,
+        policy_engine=PolicyEngine(str(policy)),
+        github_client=StubGithub(),
+        idempotency_ttl_seconds=ttl,
+        idempotency_cache=cache,
+    )
+
+
+def _request(key: str, state: str = "open") -> ToolCallRequest:
+    return ToolCallRequest(
+        agent_id="a",
+        tool="github",
+        action="issues.list",
+        repo="acme/roadrunner",
+        params={"state": state},
+        idempotency_key=key,
+    )
+
+
+def _record(idx: int, created_at: datetime) -> dict:
+    return {
+        "key": f"key-{idx}",
+        "request_hash": "h",
+        "response_payload": "{}",
+        "created_at": created_at,
+    }
+
+
+def test_cache_is_a_bounded_lru_with_ttl():
+    cache = IdempotencyCache(max_entries=2, ttl_seconds=60)
+    now = datetime.now(UTC)
+    cache.put("a", "ha", "{}", now)
+    cache.put("b", "hb", "{}", now)
+    assert cache.get("a").request_hash == "ha"
+    cache.put("c", "hc", "{}", now)
+
+    assert cache.get("b") is None
+    cache.put("old", "ho", "{}", now - timedelta(seconds=120))
+    assert cache.get("old") is None
+    assert cache.stats() == {
+        "max_entries": 2,
+        "entries": 1,
+        "hits": 1,
+        "misses": 2,
+        "evictions": 2,
+    }
+    assert build_idempotency_cache(max_entries=0, ttl_seconds=60) is None
+
+
+def test_replay_is_served_from_cache(session_factory, tmp_path):
+    service = _service(session_factory, tmp_path, cache=IdempotencyCache(100, 3600))
+    statements: list[str] = []
+    engine = session_factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    assert service.handle_tool_call(_request("k1"))[0] == "executed"
+    statements.clear()
+    replayed = service.handle_tool_call(_request("k1"))
+    conflict = service.handle_tool_calls([_request("k1", state="closed")])
+
+    assert replayed[4] is True
+    assert conflict[0][0] == "idempotency_conflict"
+    assert not any("FROM idempotency_records" in sql for sql in statements)
+    assert service.idempotency_cache.stats()["hits"] == 2
+
+
+def test_expired_key_can_be_reused(session_factory, tmp_path):
+    service = _service(session_factory, tmp_path, cache=None, ttl=60)
+    with session_factory.begin() as db:
+        db.execute(
+            insert(IdempotencyRecord),
+            [_record(0, datetime.now(UTC) - timedelta(minutes=5))],
+        )
+
+    status, _, _, _, replayed = service.handle_tool_call(_request("key-0", state="closed"))
+
+    assert (status, replayed) == ("executed", False)
+    with session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(IdempotencyRecord)) == 1
+
+
+def test_sweeper_deletes_expired_records_in_batches(session_factory):
+    with session_factory.begin() as db:
+        db.execute(
+            insert(IdempotencyRecord),
+            [_record(idx, NOW - timedelta(hours=2)) for idx in range(7)]
+            + [_record(idx, NOW) for idx in range(7, 10)],
+        )
+    commits: list[int] = []
+    event.listen(session_factory.kw["bind"], "commit", lambda _conn: commits.append(1))
+    sweeper = IdempotencySweeper(
+        session_factory, ttl_seconds=3600, interval_seconds=60, batch_size=3
+    )
+
+    assert sweeper.run_once(NOW) == 7
+    assert len(commits) == 3
+    with session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(IdempotencyRecord)) == 3
+    assert sweeper.stats() == {"ttl_seconds": 3600, "runs": 1, "failed_runs": 0, "deleted": 7}
+
+
+def test_build_sweeper_disabled_without_ttl(session_factory):
+    options = {"interval_seconds": 60, "batch_size": 10}
+    assert build_idempotency_sweeper(session_factory, ttl_seconds=0, **options) is None
+    assert isinstance(
+        build_idempotency_sweeper(session_factory, ttl_seconds=60, **options), IdempotencySweeper
+    )
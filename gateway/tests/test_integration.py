@@ -1,3 +1,5 @@
+import json
+
 import respx
 from httpx import Response
 
@@ -20,6 +22,14 @@ def test_health_and_ready(client):
     assert payload["checks"]["policy_file"] is True
 
 
+def test_policy_cache_stats_endpoint(client):
+    response = client.get("/v1/policy/cache")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["enabled"] is False
+    assert payload["generation"] >= 1
+
+
 def test_denied_without_matching_repo(client):
     response = client.post(
         "/v1/tool-calls",
@@ -104,11 +114,74 @@ def test_approve_executes_pending_action(client):
 
     exported = client.get("/v1/audit/export")
     assert exported.status_code == 200
-    lines = exported.json()["lines"]
+    assert exported.headers["content-type"] == "application/x-ndjson"
+    lines = exported.text.splitlines()
     assert lines
     assert all('"schema_version": 1' in line for line in lines)
 
 
+def test_audit_list_paginates_with_cursor_header_and_filters(client):
+    for repo in ["other/one", "other/two", "other/three"]:
+        client.post(
+            "/v1/tool-calls",
+            json={
+                "agent_id": "pager-agent",
+                "tool": "github",
+                "action": "issues.list",
+                "repo": repo,
+                "params": {},
+            },
+        )
+
+    first = client.get("/v1/audit", params={"agent_id": "pager-agent", "limit": 2})
+    assert first.status_code == 200
+    assert [row["repo"] for row in first.json()] == ["other/three", "other/two"]
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get(
+        "/v1/audit", params={"agent_id": "pager-agent", "limit": 2, "cursor": cursor}
+    )
+    assert [row["repo"] for row in second.json()] == ["other/one"]
+    assert "X-Next-Cursor" not in second.headers
+
+    assert client.get("/v1/audit", params={"repo": "other/two"}).json()[0]["repo"] == "other/two"
+    assert client.get("/v1/audit", params={"cursor": "bogus"}).status_code == 400
+    assert client.get("/v1/audit", params={"limit": 0}).status_code == 422
+
+
+def test_audit_export_streams_ndjson_with_filters_resume_and_gzip(client):
+    for repo in ["export/one", "export/two", "export/three"]:
+        client.post(
+            "/v1/tool-calls",
+            json={
+                "agent_id": "export-agent",
+                "tool": "github",
+                "action": "issues.list",
+                "repo": repo,
+                "params": {},
+            },
+        )
+
+    full = client.get("/v1/audit/export", params={"agent_id": "export-agent"})
+    rows = [json.loads(line) for line in full.text.splitlines()]
+    assert [row["repo"] for row in rows] == ["export/one", "export/two", "export/three"]
+    assert full.headers["content-disposition"] == 'attachment; filename="audit-export.jsonl"'
+
+    resumed = client.get(
+        "/v1/audit/export", params={"agent_id": "export-agent", "cursor": rows[0]["cursor"]}
+    )
+    assert [json.loads(line)["repo"] for line in resumed.text.splitlines()] == [
+        "export/two",
+        "export/three",
+    ]
+
+    compressed = client.get("/v1/audit/export", params={"agent_id": "export-agent", "gzip": True})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.text == full.text
+
+    assert client.get("/v1/audit/export", params={"cursor": "bogus"}).status_code == 400
+
+
 @respx.mock
 def test_tool_call_idempotency_replays_response(client):
     route = respx.get("https://api.github.test/repos/acme/roadrunner/issues").mock(
@@ -173,6 +246,46 @@ def test_tool_call_idempotency_conflict_returns_409(client):
     assert conflict.status_code == 409
 
 
+@respx.mock
+def test_tool_call_batch_returns_per_item_results_in_order(client):
+    route = respx.get("https://api.github.test/repos/acme/roadrunner/issues").mock(
+        return_value=Response(200, json=[{"number": 1, "title": "bug: crash", "labels": []}])
+    )
+    read = {
+        "agent_id": "triage-agent",
+        "tool": "github",
+        "action": "issues.list",
+        "repo": "acme/roadrunner",
+        "params": {"state": "open"},
+    }
+    calls = [
+        read,
+        {**read, "repo": "other/repo"},
+        {
+            "agent_id": "triage-agent",
+            "tool": "github",
+            "action": "issues.set_labels",
+            "repo": "acme/roadrunner",
+            "params": {"issue_number": 1, "labels": ["bug"]},
+            "idempotency_key": "batch-label-1",
+        },
+    ]
+
+    response = client.post("/v1/tool-calls:batch", json={"calls": calls})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [row["status"] for row in results] == ["executed", "denied", "pending_approval"]
+    assert results[0]["result"] == {"issues": [{"number": 1, "title": "bug: crash", "labels": []}]}
+    assert results[2]["approval_id"] is not None
+    assert route.call_count == 1
+
+    replay = client.post("/v1/tool-calls:batch", json={"calls": [calls[2]]})
+    assert replay.json()["results"][0]["idempotent_replay"] is True
+    assert replay.json()["results"][0]["approval_id"] == results[2]["approval_id"]
+
+    assert client.post("/v1/tool-calls:batch", json={"calls": []}).status_code == 422
+
+
 @respx.mock
 def test_bulk_approval_endpoint_executes_multiple_pending(client):
     route_issue_1 = respx.post("https://api.github.test/repos/acme/roadrunner/issues/1/labels").mock(
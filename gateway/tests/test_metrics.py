@@ -0,0 +1,110 @@
+import re
+
+import respx
+from httpx import Response
+
+from src.metrics import GatewayMetrics, Histogram
+
+ISSUES_URL = "https://api.github.test/repos/acme/roadrunner/issues"
+
+
+def _sample(text: str, name: str, labels: str = "") -> float:
+    match = re.search(rf"^{re.escape(name + labels)} (\S+)$", text, re.MULTILINE)
+    assert match, f"{name}{labels} missing from:\n{text}"
+    return float(match.group(1))
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("op_seconds", "Op time.", ("stage",), buckets=(0.01, 0.1))
+    for value in (0.005, 0.05, 0.05, 3.0):
+        histogram.observe(value, 'say "hi"')
+
+    lines = histogram.render()
+    assert lines[:2] == ["# HELP op_seconds Op time.", "# TYPE op_seconds histogram"]
+    assert lines[2:] == [
+        'op_seconds_bucket{stage="say \\"hi\\"",le="0.01"} 1',
+        'op_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 3',
+        'op_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 4',
+        'op_seconds_sum{stage="say \\"hi\\""} 3.105',
+        'op_seconds_count{stage="say \\"hi\\""} 4',
+    ]
+    assert histogram.snapshot('say "hi"') == (4, 3.105)
+
+
+def test_failing_callback_does_not_hide_other_metrics():
+    metrics = GatewayMetrics()
+    metrics.add_callback("broken", "Fails.", lambda: 1 / 0)
+    metrics.add_callback("depth", "Works.", lambda: [(("a",), 2)], labelnames=("queue",))
+    with metrics.time("policy_decide"):
+        pass
+
+    text = metrics.render()
+    assert "# TYPE broken gauge" in text
+    assert _sample(text, "depth", '{queue="a"}') == 2
+    stage = '{stage="policy_decide"}'
+    assert _sample(text, "agent2allow_tool_call_stage_seconds_count", stage) == 1
+
+
+@respx.mock
+def test_metrics_endpoint_reports_stages_outcomes_and_gauges(client):
+    respx.get(ISSUES_URL).mock(return_value=Response(200, json=[{"number": 1}]))
+    call = {"agent_id": "triage-agent", "tool": "github", "repo": "acme/roadrunner"}
+    read = {**call, "action": "issues.list", "params": {}}
+    client.post("/v1/tool-calls", json=read, headers={"X-Idempotency-Key": "read-1"})
+    client.post(
+        "/v1/tool-calls",
+        json={**call, "action": "issues.set_labels", "params": {"issue_number": 1, "labels": []}},
+    )
+
+    response = client.get("/metrics")
+    text = response.text
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    for stage in (
+        "request_hash",
+        "policy_decide",
+        "idempotency_lookup",
+        "connector_execute",
+        "db_commit",
+        "audit_emit",
+    ):
+        labels = f'{{stage="{stage}"}}'
+        assert _sample(text, "agent2allow_tool_call_stage_seconds_count", labels) >= 1
+    executed = '{status="executed",tool="github",action="issues.list",risk_level="read"}'
+    assert _sample(text, "agent2allow_tool_call_outcomes_total", executed) == 1
+    pending = (
+        '{status="pending_approval",tool="github",action="issues.set_labels",risk_level="medium"}'
+    )
+    assert _sample(text, "agent2allow_tool_call_outcomes_total", pending) == 1
+    pending_approvals = len(client.get("/v1/approvals/pending").json())
+    assert _sample(text, "agent2allow_pending_approvals") == pending_approvals >= 1
+    assert _sample(text, "agent2allow_github_retries_total") == 0
+    assert _sample(text, "agent2allow_github_timeouts_total") == 0
+
+
+def test_unknown_tools_and_actions_share_one_outcome_series(client):
+    call = {"agent_id": "triage-agent", "repo": "acme/roadrunner", "params": {}}
+
+    def _outcome_series() -> list[str]:
+        text = client.get("/metrics").text
+        return [
+            line.rpartition(" ")[0]
+            for line in text.splitlines()
+            if line.startswith("agent2allow_tool_call_outcomes_total{")
+        ]
+
+    for n in range(50):
+        client.post("/v1/tool-calls", json={**call, "tool": "github", "action": f"bogus.{n}"})
+        client.post("/v1/tool-calls", json={**call, "tool": f"tool{n}", "action": "issues.list"})
+    series = _outcome_series()
+    for n in range(50, 100):
+        client.post("/v1/tool-calls", json={**call, "tool": "github", "action": f"bogus.{n}"})
+
+    assert _outcome_series() == series
+    assert not [line for line in series if "bogus" in line or "tool0" in line]
+    other = '{status="denied",tool="other",action="other",risk_level="unknown"}'
+    assert _sample(client.get("/metrics").text, "agent2allow_tool_call_outcomes_total", other) == 50
+
+
+def test_metrics_endpoint_is_404_when_disabled(client):
+    client.app.state.service.metrics = None
+    assert client.get("/metrics").status_code == 404
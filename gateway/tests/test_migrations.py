@@ -0,0 +1,61 @@
+from sqlalchemy import create_engine, func, inspect, select, text
+
+from src.migrations import MIGRATIONS, Migration, run_migrations, schema_migrations
+
+
+def test_migrations_apply_once_in_order(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+
+    assert run_migrations(engine) == [m.version for m in MIGRATIONS]
+    assert run_migrations(engine) == []
+
+    with engine.connect() as connection:
+        versions = list(connection.scalars(select(schema_migrations.c.version)))
+    assert versions == [m.version for m in MIGRATIONS]
+    assert {"approvals", "audit_logs", "idempotency_records"} <= set(
+        inspect(engine).get_table_names()
+    )
+
+
+def test_migrations_upgrade_legacy_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.sqlite'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TABLE audit_logs (id INTEGER PRIMARY KEY, timestamp DATETIME, "
+            "agent_id VARCHAR(128), tool VARCHAR(128), action VARCHAR(128), repo VARCHAR(256), "
+            "risk_level VARCHAR(16), status VARCHAR(64), request_payload TEXT, "
+            "response_payload TEXT, approval_id INTEGER, message TEXT)"
+        )
+        connection.exec_driver_sql("CREATE INDEX ix_audit_logs_status ON audit_logs (status)")
+        connection.exec_driver_sql(
+            "INSERT INTO audit_logs (agent_id, tool, action, repo, risk_level, status, "
+            "request_payload) VALUES ('a', 'github', 'issues.list', 'acme/r', 'low', "
+            "'executed', '{}')"
+        )
+
+    run_migrations(engine)
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("audit_logs")}
+    indexes = {index["name"] for index in inspector.get_indexes("audit_logs")}
+    assert "schema_version" in columns
+    assert "ix_audit_logs_status" not in indexes
+    assert {"ix_audit_logs_status_timestamp", "ix_audit_logs_risk_level_timestamp"} <= indexes
+    with engine.connect() as connection:
+        assert connection.scalar(text("SELECT schema_version FROM audit_logs")) == 1
+        created = connection.scalar(text("SELECT sql FROM sqlite_master WHERE name = 'audit_logs'"))
+    assert "AUTOINCREMENT" in created
+
+
+def test_new_migration_runs_on_existing_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    run_migrations(engine)
+    calls: list[int] = []
+    version = len(MIGRATIONS) + 1
+    extra = Migration(version, "test step", lambda connection: calls.append(version))
+
+    assert run_migrations(engine, (*MIGRATIONS, extra)) == [version]
+    assert run_migrations(engine, (*MIGRATIONS, extra)) == []
+    assert calls == [version]
+    with engine.connect() as connection:
+        assert connection.scalar(select(func.count()).select_from(schema_migrations)) == version
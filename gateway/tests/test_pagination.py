@@ -0,0 +1,173 @@
+import json
+
+import pytest
+from connectors.github import mock_server
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from src.connectors.github_client import GithubClient
+from src.models import AuditLog, Base
+from src.policy import PolicyEngine
+from src.schemas import ToolCallRequest
+from src.service import Agent2AllowService, ToolCallRejectedError
+
+REPO = "acme/roadrunner"
+GATED_REPO = "acme/gated"
+
+
+@pytest.fixture()
+def mock_github():
+    http = TestClient(mock_server.app)
+    original = mock_server.DATA[REPO]
+    http.put("/_mock/issues", json={"repo": REPO, "count": 250})
+    yield http
+    mock_server.DATA[REPO] = original
+    http.close()
+
+
+def _client(http: TestClient, base_url: str = "http://testserver") -> GithubClient:
+    client = GithubClient(base_url)
+    client._client = http
+    return client
+
+
+def _numbers(issues: list[dict]) -> list[int]:
+    return [issue["number"] for issue in issues]
+
+
+def test_iter_issue_pages_follows_link_headers(mock_github):
+    pages = list(_client(mock_github).iter_issue_pages(REPO, per_page=100))
+
+    assert [len(page["issues"]) for page in pages] == [100, 100, 50]
+    assert [page["next_cursor"] is None for page in pages] == [False, False, True]
+    assert _numbers([issue for page in pages for issue in page["issues"]]) == list(
+        range(1, 251)
+    )
+
+
+def test_list_issues_returns_a_cursor_to_resume_from(mock_github):
+    client = _client(mock_github)
+
+    first = client.list_issues(REPO, per_page=100, max_pages=2)
+    rest = client.list_issues(REPO, cursor=first["next_cursor"], max_pages=None)
+
+    assert _numbers(first["issues"]) == list(range(1, 201))
+    assert _numbers(rest["issues"]) == list(range(201, 251))
+    assert "next_cursor" not in rest
+    # Without pagination params only GitHub's first page comes back, as before.
+    assert len(client.list_issues(REPO)["issues"]) == 30
+
+
+def test_cursor_only_carries_the_query(mock_github):
+    client = _client(mock_github)
+    cursor = client.list_issues(REPO, per_page=10)["next_cursor"]
+
+    # A cursor from one repository resumes the same page of another; it cannot
+    # redirect the request elsewhere.
+    assert client.list_issues("acme/other", cursor=cursor) == {"issues": []}
+    with pytest.raises(ValueError, match="invalid page cursor"):
+        client.list_issues(REPO, cursor="not a cursor")
+
+
+@pytest.fixture()
+def service(tmp_path, mock_github):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(
+        "version: 1\nrules:\n  - tool: github\n    actions: [issues.list]\n"
+        f"    repo: {REPO}\n    risk: read\n    allow: true\n"
+        "  - tool: github\n    actions: [issues.list]\n"
+        f"    repo: {GATED_REPO}\n    risk: medium\n    allow: true\n"
+    )
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    return Agent2AllowService(
+        session_factory=sessionmaker(bind=engine, autoflush=False),
+        policy_engine=PolicyEngine(str(policy)),
+        github_client=_client(mock_github),
+    )
+
+
+def _list_request(repo: str = REPO, **params) -> ToolCallRequest:
+    return ToolCallRequest(
+        agent_id="triage", tool="github", action="issues.list", repo=repo, params=params
+    )
+
+
+def _audit_rows(service: Agent2AllowService) -> list[AuditLog]:
+    with service.session_factory() as db:
+        return db.scalars(select(AuditLog)).all()
+
+
+def test_tool_call_passes_pagination_params(service):
+    _, _, first, _, _ = service.handle_tool_call(_list_request(per_page=100))
+    _, _, rest, _, _ = service.handle_tool_call(
+        _list_request(cursor=first["next_cursor"], max_pages=None)
+    )
+
+    assert (len(first["issues"]), len(rest["issues"])) == (100, 150)
+    assert "next_cursor" not in rest
+
+
+def test_stream_audits_one_summary_row(service):
+    pages = service.stream_issue_pages(_list_request(per_page=100, max_pages=2))
+    assert _audit_rows(service) == []
+
+    assert [len(page["issues"]) for page in pages] == [100, 100]
+    [row] = _audit_rows(service)
+    summary = json.loads(row.response_payload)
+    assert (row.status, summary["pages"], summary["issues"]) == ("executed", 2, 200)
+    assert summary["next_cursor"] is not None
+
+
+def test_stream_audits_early_close_and_denials(service):
+    pages = service.stream_issue_pages(_list_request(per_page=50))
+    next(pages)
+    pages.close()
+    with pytest.raises(ToolCallRejectedError):
+        service.stream_issue_pages(_list_request("acme/other"))
+
+    rows = _audit_rows(service)
+    assert [(row.status, row.message) for row in rows] == [
+        ("executed", "stream closed by client"),
+        ("denied", rows[1].message),
+    ]
+    assert json.loads(rows[0].response_payload)["pages"] == 1
+
+
+def test_stream_needing_approval_creates_a_pending_approval(service):
+    with pytest.raises(ToolCallRejectedError) as rejected:
+        service.stream_issue_pages(_list_request(GATED_REPO))
+
+    assert rejected.value.status == "pending_approval"
+    approval = service.get_approval(rejected.value.approval_id)
+    assert (approval.status, approval.repo) == ("pending", GATED_REPO)
+    [row] = _audit_rows(service)
+    assert (row.status, row.approval_id) == ("pending_approval", approval.id)
+
+
+def test_stream_endpoint_answers_202_when_approval_is_required(client, service, monkeypatch):
+    monkeypatch.setattr(client.app.state, "service", service)
+    call = {"agent_id": "triage", "tool": "github", "action": "issues.list", "repo": GATED_REPO}
+
+    response = client.post("/v1/tool-calls:stream", json=call)
+    assert response.status_code == 202
+    body = response.json()
+    assert (body["status"], body["message"]) == ("pending_approval", "approval required")
+    assert service.get_approval(body["approval_id"]).status == "pending"
+
+
+def test_stream_endpoint_writes_one_ndjson_line_per_page(client, mock_github):
+    client.app.state.service.github_client._client = mock_github
+    call = {"agent_id": "triage", "tool": "github", "action": "issues.list", "repo": REPO}
+
+    response = client.post("/v1/tool-calls:stream", json={**call, "params": {"per_page": 100}})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [len(line["issues"]) for line in lines] == [100, 100, 50]
+    denied = client.post("/v1/tool-calls:stream", json={**call, "repo": "acme/other"})
+    assert denied.status_code == 403
+    assert denied.json()["detail"]["status"] == "denied"
+    write = {**call, "action": "issues.create_comment"}
+    assert client.post("/v1/tool-calls:stream", json=write).status_code == 400
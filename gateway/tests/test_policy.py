@@ -1,4 +1,7 @@
-from src.policy import PolicyEngine
+import fnmatch
+import os
+
+from src.policy import CompiledRuleSet, PolicyEngine, PolicyRule
 
 
 def test_policy_allow_and_approval(tmp_path):
@@ -35,3 +38,157 @@ rules:
 
     denied = engine.decide("github", "issues.create_comment", "acme/repo")
     assert denied.allowed is False
+
+
+def test_policy_first_matching_rule_wins_across_literal_and_glob_rules(tmp_path):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(
+        """
+version: 1
+defaults:
+  deny_by_default: true
+rules:
+  - tool: github
+    actions: [issues.*]
+    repo: acme/secret-*
+    risk: high
+    allow: false
+  - tool: github
+    actions: [issues.list]
+    repo: acme/secret-repo
+    risk: read
+    allow: true
+  - tool: github
+    actions: [issues.set_labels]
+    repo: "*"
+    risk: medium
+    allow: true
+    approval_required: false
+  - tool: github
+    actions: [issues.set_labels]
+    repo: acme/roadrunner
+    risk: medium
+    allow: true
+""".strip(),
+        encoding="utf-8",
+    )
+
+    engine = PolicyEngine(str(policy))
+
+    shadowed = engine.decide("github", "issues.list", "acme/secret-repo")
+    assert shadowed.allowed is False
+    assert shadowed.risk_level == "high"
+
+    glob_first = engine.decide("github", "issues.set_labels", "acme/roadrunner")
+    assert glob_first.allowed is True
+    assert glob_first.approval_required is False
+
+    other_tool = engine.decide("jira", "issues.list", "acme/roadrunner")
+    assert other_tool.allowed is False
+    assert other_tool.message == "no matching allow rule"
+
+
+def test_compiled_rule_set_matches_linear_fnmatch_scan():
+    rules = [
+        PolicyRule("github", ["issues.list"], "acme/roadrunner", "read", True, None),
+        PolicyRule("github", ["issues.*"], "acme/*", "medium", True, None),
+        PolicyRule("github", ["issues.create_comment"], "*/docs", "low", True, None),
+        PolicyRule("github", ["issues.set_?abels"], "acme/road[rx]unner", "high", False, None),
+        PolicyRule("github", ["*"], "*", "read", False, None),
+        PolicyRule("jira", ["tickets.list"], "ops/*", "read", True, None),
+        PolicyRule("github", [], "*", "read", True, None),
+    ]
+    rule_set = CompiledRuleSet(rules)
+
+    def linear(tool: str, action: str, repo: str) -> PolicyRule | None:
+        for rule in rules:
+            if rule.tool != tool:
+                continue
+            if not any(fnmatch.fnmatch(action, pattern) for pattern in rule.actions):
+                continue
+            if fnmatch.fnmatch(repo, rule.repo):
+                return rule
+        return None
+
+    tools = ["github", "jira"]
+    actions = ["issues.list", "issues.set_labels", "issues.create_comment", "tickets.list"]
+    repos = ["acme/roadrunner", "acme/roadxunner", "other/docs", "ops/pager", "acme", "x/y/z"]
+    for tool in tools:
+        for action in actions:
+            for repo in repos:
+                assert rule_set.match(tool, action, repo) is linear(tool, action, repo)
+
+
+def test_decision_cache_counts_hits_misses_and_evictions(tmp_path):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(
+        """
+version: 1
+defaults:
+  deny_by_default: true
+rules:
+  - tool: github
+    actions: [issues.list]
+    repo: acme/*
+    risk: read
+    allow: true
+""".strip(),
+        encoding="utf-8",
+    )
+
+    engine = PolicyEngine(str(policy), decision_cache_size=2)
+    first = engine.decide("github", "issues.list", "acme/one")
+    assert engine.decide("github", "issues.list", "acme/one") is first
+    engine.decide("github", "issues.list", "acme/two")
+    engine.decide("github", "issues.list", "acme/three")
+
+    stats = engine.cache_stats()
+    assert stats["enabled"] is True
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+
+
+def test_decision_cache_invalidated_when_policy_reloads(tmp_path):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(
+        """
+version: 1
+defaults:
+  deny_by_default: true
+rules:
+  - tool: github
+    actions: [issues.list]
+    repo: acme/*
+    risk: read
+    allow: true
+""".strip(),
+        encoding="utf-8",
+    )
+
+    engine = PolicyEngine(str(policy), decision_cache_size=16)
+    assert engine.decide("github", "issues.list", "acme/one").allowed is True
+    generation = engine.generation
+
+    policy.write_text(
+        """
+version: 1
+defaults:
+  deny_by_default: true
+rules: []
+""".strip(),
+        encoding="utf-8",
+    )
+    stat = policy.stat()
+    os.utime(policy, (stat.st_atime, stat.st_mtime + 5))
+
+    assert engine.decide("github", "issues.list", "acme/one").allowed is False
+    assert engine.generation == generation + 1
+    assert engine.cache_stats()["hits"] == 0
+
+
+def test_decision_cache_disabled_by_default(tmp_path):
+    engine = PolicyEngine(str(tmp_path / "missing.yml"))
+    assert engine.decision_cache is None
+    assert engine.cache_stats() == {"enabled": False, "generation": 1}
@@ -0,0 +1,90 @@
+import os
+import time
+
+import pytest
+
+from src.policy import PolicyEngine
+from src.policy_watcher import PolicyWatcher, build_policy_watcher
+
+READ_ONLY_POLICY = """
+version: 1
+defaults:
+  deny_by_default: true
+rules:
+  - tool: github
+    actions: [issues.list]
+    repo: acme/*
+    risk: read
+    allow: true
+""".strip()
+
+EMPTY_POLICY = """
+version: 1
+defaults:
+  deny_by_default: true
+rules: []
+""".strip()
+
+
+def _rewrite(path, content: str) -> None:
+    previous = path.stat().st_mtime
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, (previous + 5, previous + 5))
+
+
+def test_watcher_mode_keeps_decide_off_the_filesystem(tmp_path):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(READ_ONLY_POLICY, encoding="utf-8")
+    engine = PolicyEngine(str(policy))
+    watcher = PolicyWatcher(engine, use_inotify=False)
+    engine.reload_on_decide = False
+
+    _rewrite(policy, EMPTY_POLICY)
+    assert engine.decide("github", "issues.list", "acme/one").allowed is True
+
+    assert watcher.reload() is True
+    assert engine.decide("github", "issues.list", "acme/one").allowed is False
+    assert watcher.reloads == 1
+
+
+def test_watcher_keeps_previous_policy_when_reload_fails(tmp_path):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(READ_ONLY_POLICY, encoding="utf-8")
+    engine = PolicyEngine(str(policy), reload_on_decide=False)
+    watcher = PolicyWatcher(engine, use_inotify=False)
+    generation = engine.generation
+
+    _rewrite(policy, "rules: [{actions: [issues.list]}]")
+    assert watcher.reload() is False
+    assert watcher.reload() is False
+    assert watcher.failed_reloads == 1
+    assert engine.generation == generation
+    assert engine.decide("github", "issues.list", "acme/one").allowed is True
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_background_watcher_swaps_in_changed_policy(tmp_path, use_inotify):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(READ_ONLY_POLICY, encoding="utf-8")
+    engine = PolicyEngine(str(policy))
+    watcher = PolicyWatcher(engine, poll_interval_seconds=0.05, use_inotify=use_inotify)
+    watcher.start()
+    try:
+        assert engine.reload_on_decide is False
+        _rewrite(policy, EMPTY_POLICY)
+        deadline = time.monotonic() + 5
+        while engine.decide("github", "issues.list", "acme/one").allowed:
+            assert time.monotonic() < deadline, f"{watcher.mode} watcher missed the change"
+            time.sleep(0.02)
+    finally:
+        watcher.stop()
+
+
+def test_build_policy_watcher_modes(tmp_path):
+    engine = PolicyEngine(str(tmp_path / "missing.yml"))
+    assert build_policy_watcher(engine, mode="per_request", poll_interval_seconds=1) is None
+    poll = build_policy_watcher(engine, mode="poll", poll_interval_seconds=1)
+    assert isinstance(poll, PolicyWatcher)
+    assert poll.use_inotify is False
+    with pytest.raises(ValueError):
+        build_policy_watcher(engine, mode="sometimes", poll_interval_seconds=1)
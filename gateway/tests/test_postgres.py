@@ -0,0 +1,181 @@
+import os
+import threading
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, func, insert, select, text
+from sqlalchemy.exc import OperationalError
+
+from src.audit_partitions import PostgresAuditPartitions, next_period, period_start
+from src.audit_query import audit_log_query
+from src.audit_writer import AuditWriter
+from src.migrations import MIGRATIONS, run_migrations
+from src.models import AuditLog
+from src.policy import PolicyEngine
+from src.schemas import ToolCallRequest
+from src.service import Agent2AllowService
+from tests.test_audit_writer import _row
+from tests.test_service_transactions import StubGithub
+
+pytest.importorskip("psycopg", reason="PostgreSQL tests need psycopg")
+
+POOL_OPTIONS = {"pool_size": 4, "max_overflow": 4, "pool_pre_ping": True}
+
+
+@pytest.fixture(scope="module")
+def postgres_server_url(tmp_path_factory):
+    """``TEST_POSTGRES_URL`` (e.g. the compose ``postgres`` service) or an embedded server."""
+    url = os.getenv("TEST_POSTGRES_URL")
+    if url:
+        yield url
+        return
+    pgserver = pytest.importorskip(
+        "pgserver", reason="set TEST_POSTGRES_URL or pip install pgserver"
+    )
+    server = pgserver.get_server(tmp_path_factory.mktemp("pg"), cleanup_mode="stop")
+    yield server.get_uri().replace("postgresql://", "postgresql+psycopg://", 1)
+    server.cleanup()
+
+
+@pytest.fixture()
+def postgres_url(postgres_server_url):
+    """A fresh database per test on the shared server."""
+    name = f"a2a_test_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(postgres_server_url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as connection:
+        connection.execute(text(f'CREATE DATABASE "{name}"'))
+    base, _, query = postgres_server_url.partition("?")
+    yield f"{base.rsplit('/', 1)[0]}/{name}" + (f"?{query}" if query else "")
+    with admin.connect() as connection:
+        connection.execute(text(f'DROP DATABASE "{name}" WITH (FORCE)'))
+    admin.dispose()
+
+
+def _service(db_module, url, tmp_path, **kwargs):
+    engine, _ = db_module.create_engines(url, pool_options=POOL_OPTIONS, **kwargs)
+    run_migrations(engine)
+    policy = tmp_path / "policy.yml"
+    policy.write_text(
+        "version: 1\nrules:\n  - tool: github\n    actions: [issues.list]\n"
+        "    repo: acme/roadrunner\n    risk: read\n    allow: true\n"
+    )
+    return engine, Agent2AllowService(
+        session_factory=db_module.build_session_factory(engine),
+        policy_engine=PolicyEngine(str(policy)),
+        github_client=StubGithub(),
+    )
+
+
+def test_statement_timeout_and_pool_options(db_module, postgres_url):
+    engine, writer = db_module.create_engines(
+        postgres_url, pool_options=POOL_OPTIONS, statement_timeout_ms=200
+    )
+    assert writer is None
+    assert engine.pool.size() == 4
+    with engine.connect() as connection:
+        assert connection.scalar(text("SHOW statement_timeout")) == "200ms"
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT pg_sleep(2)"))
+    engine.dispose()
+
+
+def test_concurrent_replicas_apply_each_migration_once(postgres_url):
+    results: list[list[int]] = []
+    errors: list[Exception] = []
+
+    def _replica() -> None:
+        engine = create_engine(postgres_url)
+        try:
+            results.append(run_migrations(engine))
+        except Exception as exc:  # pragma: no cover
+            errors.append(exc)
+        finally:
+            engine.dispose()
+
+    threads = [threading.Thread(target=_replica) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(v for applied in results for v in applied) == [m.version for m in MIGRATIONS]
+
+
+def test_audit_writer_uses_copy(db_module, postgres_url, tmp_path):
+    engine, service = _service(db_module, postgres_url, tmp_path)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    writer = AuditWriter(service.session_factory, mode="group_commit")
+    writer.start()
+    try:
+        writer.submit([_row(idx) for idx in range(250)], [])
+    finally:
+        writer.close()
+
+    assert not any(sql.startswith("INSERT INTO audit_logs") for sql in statements)
+    with service.session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(AuditLog)) == 250
+        assert db.scalar(select(AuditLog.message).order_by(AuditLog.id.desc())) == "call 249"
+    engine.dispose()
+
+
+def test_tool_calls_and_audit_pages(db_module, postgres_url, tmp_path):
+    engine, service = _service(db_module, postgres_url, tmp_path, statement_timeout_ms=5000)
+    request = ToolCallRequest(
+        agent_id="a",
+        tool="github",
+        action="issues.list",
+        repo="acme/roadrunner",
+        params={"state": "open"},
+        idempotency_key="pg-key",
+    )
+
+    assert service.handle_tool_call(request)[0] == "executed"
+    assert service.handle_tool_call(request)[4] is True
+    with service.session_factory() as db:
+        rows = db.scalars(audit_log_query().limit(10)).all()
+    assert [row.status for row in rows] == ["idempotent_replay", "executed"]
+    engine.dispose()
+
+
+def test_native_partitions_lifecycle(db_module, postgres_url, tmp_path):
+    engine, _ = db_module.create_engines(postgres_url, pool_options=POOL_OPTIONS)
+    run_migrations(engine, MIGRATIONS[:3])
+    old = _row(0)
+    old["timestamp"] = datetime(2025, 1, 10)
+    with engine.begin() as connection:
+        connection.execute(insert(AuditLog), [old])
+    run_migrations(engine)
+
+    now = datetime.now(UTC).replace(tzinfo=None)
+    next_month = next_period(period_start(now, "month"), "month")
+    manager = PostgresAuditPartitions(engine, premake=1, retention_days=30)
+    # Migrations leave a plain table; partitioning starts with the first maintenance pass.
+    assert manager.partitions() == []
+    assert manager.ensure_partitions(now) == [f"audit_logs_p{next_month:%Y%m}"]
+    assert manager.ensure_partitions(now) == []
+    assert [p.name for p in manager.partitions()] == [
+        "audit_logs_legacy",
+        f"audit_logs_p{next_month:%Y%m}",
+        "audit_logs_default",
+    ]
+
+    future = _row(1)
+    future["timestamp"] = now + timedelta(days=400)
+    with engine.begin() as connection:
+        connection.execute(insert(AuditLog), [future])
+    far_month = period_start(future["timestamp"], "month")
+    assert manager.compact(now) == [f"audit_logs_p{far_month:%Y%m}"]
+    with engine.connect() as connection:
+        assert connection.scalar(text("SELECT count(*) FROM audit_logs_default")) == 0
+        assert connection.scalar(select(func.count()).select_from(AuditLog)) == 2
+
+    expired = manager.apply_retention(now + timedelta(days=90))
+    assert expired == ["audit_logs_legacy", f"audit_logs_p{next_month:%Y%m}"]
+    with engine.begin() as connection:
+        assert connection.scalar(select(func.count()).select_from(AuditLog)) == 1
+        # The id sequence outlives the dropped legacy partition.
+        connection.execute(insert(AuditLog), [_row(2)])
+    engine.dispose()
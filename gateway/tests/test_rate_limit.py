@@ -0,0 +1,119 @@
+import random
+
+import pytest
+from connectors.github import mock_server
+from fastapi.testclient import TestClient
+from httpx import Request, Response
+
+from src.connectors.github_client import GithubClient
+from src.connectors.rate_limit import (
+    READ,
+    WRITE,
+    RateLimitExceededError,
+    RateLimitScheduler,
+    jittered_backoff,
+    token_key,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _response(status: int = 200, **headers: str) -> Response:
+    return Response(status, headers=headers, request=Request("GET", "https://api.github.test"))
+
+
+def test_reserve_keeps_the_last_budget_for_writes():
+    clock = FakeClock()
+    scheduler = RateLimitScheduler(write_reserve=5, clock=clock)
+    scheduler.observe(
+        "t", _response(**{"X-RateLimit-Remaining": "6", "X-RateLimit-Reset": "1000100"})
+    )
+
+    assert scheduler.try_acquire("t", READ) == 0
+    assert scheduler.try_acquire("t", READ) == pytest.approx(100)
+    assert scheduler.try_acquire("t", WRITE) == 0
+    assert scheduler.stats()["t"]["remaining"] == 4
+
+    clock.now = 1_000_100
+    assert scheduler.try_acquire("t", READ) == 0
+
+
+def test_retry_after_blocks_the_token_and_long_waits_fail_fast():
+    clock = FakeClock()
+    scheduler = RateLimitScheduler(max_wait_seconds=1, clock=clock)
+    scheduler.observe("t", _response(403, **{"Retry-After": "30"}))
+
+    assert scheduler.try_acquire("t", WRITE) == pytest.approx(30)
+    assert scheduler.try_acquire("other", READ) == 0
+    with pytest.raises(RateLimitExceededError):
+        scheduler.acquire("t", READ, sleep=lambda _: None)
+    assert scheduler.stats()["t"]["rate_limited"] == 1
+
+
+def test_token_bucket_paces_bursts_and_yields_to_waiting_writes():
+    clock = FakeClock()
+    scheduler = RateLimitScheduler(requests_per_second=10, burst=2, clock=clock)
+
+    assert scheduler.try_acquire("t") == 0
+    assert scheduler.try_acquire("t") == 0
+    assert scheduler.try_acquire("t") == pytest.approx(0.1)
+
+    clock.now += 0.1
+    scheduler._track_wait("t", WRITE, 1)
+    assert scheduler.try_acquire("t", READ) == pytest.approx(0.1)
+    assert scheduler.try_acquire("t", WRITE) == 0
+
+
+def test_jittered_backoff_is_bounded():
+    random.seed(7)
+    for attempt in range(1, 8):
+        assert 0 <= jittered_backoff(attempt, 200, 1000) <= min(1.0, 0.2 * 2 ** (attempt - 1))
+    assert token_key(None) == "anonymous"
+    assert "secret" not in token_key("secret")
+
+
+@pytest.fixture()
+def mock_github(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda _: None)
+    http = TestClient(mock_server.app)
+    yield http
+    http.put("/_mock/rate-limit", json={})
+    http.close()
+
+
+def _client(http: TestClient, scheduler: RateLimitScheduler) -> GithubClient:
+    client = GithubClient("http://testserver", token="t0ken", rate_limiter=scheduler)
+    client._client = http
+    return client
+
+
+def test_client_retries_secondary_limit_after_retry_after(mock_github):
+    mock_github.put(
+        "/_mock/rate-limit",
+        json={"limit": 100, "secondary_limit_hits": 1, "retry_after_seconds": 0},
+    )
+    scheduler = RateLimitScheduler()
+    client = _client(mock_github, scheduler)
+
+    assert len(client.list_issues("acme/roadrunner")["issues"]) == 3
+    stats = scheduler.stats()[token_key("t0ken")]
+    assert (stats["rate_limited"], stats["remaining"]) == (1, 99)
+
+
+def test_client_stops_reads_before_exhaustion_but_lets_writes_through(mock_github):
+    mock_github.put("/_mock/rate-limit", json={"limit": 3})
+    scheduler = RateLimitScheduler(write_reserve=1, max_wait_seconds=5)
+    client = _client(mock_github, scheduler)
+
+    client.list_issues("acme/roadrunner")
+    client.list_issues("acme/roadrunner")
+    with pytest.raises(RateLimitExceededError):
+        client.list_issues("acme/roadrunner")
+    assert client.set_labels("acme/roadrunner", 2, ["question"]) == {"labels": ["question"]}
+    assert scheduler.stats()[token_key("t0ken")]["remaining"] == 0
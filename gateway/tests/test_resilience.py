@@ -0,0 +1,186 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+from httpx import Response
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from src.connectors.github_client import AsyncGithubClient, GithubClient
+from src.connectors.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+)
+from src.models import AuditLog, Base
+from src.policy import PolicyEngine
+from src.schemas import ToolCallRequest
+from src.service import Agent2AllowService
+
+ISSUES_URL = "https://api.github.test/repos/acme/road/issues"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_fails_fast_and_recovers_through_half_open():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=10, clock=clock)
+
+    breaker.before_call("h")
+    breaker.record_failure("h")
+    breaker.record_failure("h")
+    assert breaker.state("h") == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("h")
+    breaker.before_call("other")
+
+    clock.now = 10
+    breaker.before_call("h")
+    assert breaker.state("h") == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("h")
+    breaker.record_failure("h")
+    assert breaker.state("h") == OPEN
+
+    clock.now = 20
+    breaker.before_call("h")
+    breaker.record_success("h")
+    assert breaker.state("h") == CLOSED
+    assert breaker.stats()["h"] == {
+        "state": CLOSED,
+        "consecutive_failures": 0,
+        "opened": 2,
+        "rejected": 2,
+    }
+
+
+def test_lost_half_open_probe_frees_its_slot_after_recovery():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=10, clock=clock)
+    breaker.record_failure("h")
+
+    clock.now = 10
+    breaker.before_call("h")  # this probe never reports back
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("h")
+    clock.now = 20
+    breaker.before_call("h")
+    assert breaker.state("h") == HALF_OPEN
+
+
+def test_retry_budget_caps_retries_to_a_share_of_traffic():
+    clock = FakeClock()
+    budget = RetryBudget(ratio=0.5, min_retries=1, window_seconds=10, clock=clock)
+    for _ in range(4):
+        budget.record_request()
+
+    assert [budget.try_retry() for _ in range(3)] == [True, True, False]
+    clock.now = 11
+    assert budget.try_retry() is True
+    assert budget.stats() == {"ratio": 0.5, "requests": 0, "retries": 1, "exhausted": 1}
+
+
+@respx.mock
+def test_client_stops_calling_a_failing_host(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda _: None)
+    route = respx.get(ISSUES_URL).mock(return_value=Response(503))
+    breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=30)
+    client = GithubClient("https://api.github.test", circuit_breaker=breaker)
+
+    with pytest.raises(CircuitOpenError):
+        client.list_issues("acme/road")
+    assert route.call_count == 2
+    with pytest.raises(CircuitOpenError):
+        client.list_issues("acme/road")
+    assert route.call_count == 2
+    assert breaker.stats()["api.github.test"]["rejected"] == 2
+
+
+@respx.mock
+def test_exhausted_retry_budget_skips_retries(monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda _: None)
+    route = respx.get(ISSUES_URL).mock(return_value=Response(500))
+    budget = RetryBudget(ratio=0.0, min_retries=0)
+    client = GithubClient("https://api.github.test", retry_budget=budget)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        client.list_issues("acme/road")
+    assert route.call_count == 1
+    assert budget.stats()["exhausted"] == 1
+
+
+@respx.mock
+def test_probe_failing_outside_the_transport_reopens_the_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=10, clock=clock)
+    client = GithubClient("https://api.github.test", circuit_breaker=breaker)
+    route = respx.get(ISSUES_URL).mock(side_effect=httpx.DecodingError("bad gzip"))
+    breaker.record_failure("api.github.test")
+
+    clock.now = 10
+    with pytest.raises(httpx.DecodingError):
+        client.list_issues("acme/road")
+    assert breaker.state("api.github.test") == OPEN
+
+    clock.now = 20
+    route.mock(side_effect=None, return_value=Response(200, json=[]))
+    assert client.list_issues("acme/road")["issues"] == []
+    assert breaker.state("api.github.test") == CLOSED
+
+
+@respx.mock
+async def test_cancelled_async_probe_reopens_the_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=10, clock=clock)
+    client = AsyncGithubClient("https://api.github.test", circuit_breaker=breaker)
+
+    def _cancelled(request):
+        raise asyncio.CancelledError
+
+    respx.get(ISSUES_URL).mock(side_effect=_cancelled)
+    breaker.record_failure("api.github.test")
+
+    clock.now = 10
+    with pytest.raises(asyncio.CancelledError):
+        await client.list_issues("acme/road")
+    assert breaker.state("api.github.test") == OPEN
+    await client.aclose()
+
+
+def test_open_circuit_is_audited_as_circuit_open(tmp_path):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(
+        "version: 1\nrules:\n  - tool: github\n    actions: [issues.list]\n"
+        "    repo: acme/road\n    risk: read\n    allow: true\n"
+    )
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30)
+    breaker.record_failure("api.github.test")
+    service = Agent2AllowService(
+        session_factory=sessionmaker(bind=engine, autoflush=False),
+        policy_engine=PolicyEngine(str(policy)),
+        github_client=GithubClient("https://api.github.test", circuit_breaker=breaker),
+    )
+    request = ToolCallRequest(
+        agent_id="a", tool="github", action="issues.list", repo="acme/road", params={}
+    )
+
+    status, message, *_ = service.handle_tool_call(request)
+    batch = service.handle_tool_calls([request])
+
+    assert status == "circuit_open"
+    assert message.startswith("circuit open for api.github.test")
+    assert batch[0][0] == "circuit_open"
+    with service.session_factory() as db:
+        assert db.scalars(select(AuditLog.status)).all() == ["circuit_open", "circuit_open"]
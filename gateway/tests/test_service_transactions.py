@@ -0,0 +1,326 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.audit_writer import AuditWriter
+from src.connectors.resilience import CircuitOpenError
+from src.models import Approval, AuditLog, Base, IdempotencyRecord
+from src.policy import PolicyEngine
+from src.schemas import ToolCallRequest
+from src.service import Agent2AllowService, IdempotencyConflictError
+
+
+class StubGithub:
+    def list_issues(self, repo: str, state: str = "open") -> dict:
+        return {"issues": []}
+
+    def set_labels(self, repo: str, issue_number: int, labels: list[str]) -> dict:
+        return {"labels": labels}
+
+    def create_comment(self, repo: str, issue_number: int, body: str) -> dict:
+        return {"comment": {"id": 1, "body": body}}
+
+
+class RecordingSink:
+    def __init__(self):
+        self.events: list[dict] = []
+
+    def emit(self, event) -> None:
+        self.events.append(dict(event))
+
+
+@pytest.fixture()
+def service(tmp_path):
+    policy = tmp_path / "policy.yml"
+    policy.write_text(
+        """
+version: 1
+defaults:
+  deny_by_default: true
+rules:
+  - tool: github
+    actions: [issues.set_labels]
+    repo: acme/roadrunner
+    risk: medium
+    allow: true
+  - tool: github
+    actions: [issues.list]
+    repo: acme/roadrunner
+    risk: read
+    allow: true
+""".strip(),
+        encoding="utf-8",
+    )
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    return Agent2AllowService(
+        session_factory=session_factory,
+        policy_engine=PolicyEngine(str(policy)),
+        github_client=StubGithub(),
+        audit_sink=RecordingSink(),
+    )
+
+
+def _label_request(key: str | None = None, labels: list[str] | None = None) -> ToolCallRequest:
+    return ToolCallRequest(
+        agent_id="triage-agent",
+        tool="github",
+        action="issues.set_labels",
+        repo="acme/roadrunner",
+        params={"issue_number": 1, "labels": labels or ["bug"]},
+        idempotency_key=key,
+    )
+
+
+def test_approval_required_call_commits_once(service):
+    commits: list[int] = []
+    engine = service.session_factory.kw["bind"]
+    event.listen(engine, "commit", lambda _conn: commits.append(1))
+
+    status, _, _, approval_id, _ = service.handle_tool_call(_label_request("key-1"))
+
+    assert status == "pending_approval"
+    assert len(commits) == 1
+    with service.session_factory() as db:
+        assert db.get(Approval, approval_id) is not None
+        assert db.scalar(select(func.count()).select_from(AuditLog)) == 1
+        assert db.scalar(select(func.count()).select_from(IdempotencyRecord)) == 1
+    assert [e["status"] for e in service.audit_sink.events] == ["pending_approval"]
+
+
+def test_idempotency_race_keeps_audit_row_and_reports_conflict(service):
+    request = _label_request("race-key")
+    with service.session_factory() as db:
+        db.add(IdempotencyRecord(key="race-key", request_hash="other", response_payload="{}"))
+        db.commit()
+
+    with service.session_factory() as db:
+        service._audit(
+            db,
+            agent_id="triage-agent",
+            tool="github",
+            action="issues.set_labels",
+            repo="acme/roadrunner",
+            risk_level="medium",
+            status="executed",
+            request_payload=request.model_dump(),
+        )
+        with pytest.raises(IdempotencyConflictError):
+            service._record_idempotency(
+                db,
+                key="race-key",
+                request_hash=service._request_hash(request),
+                response_payload={"status": "executed"},
+            )
+
+    with service.session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(AuditLog)) == 1
+
+
+def test_write_behind_audit_is_committed_outside_request_transaction(service):
+    writer = AuditWriter(
+        service.session_factory, mode="group_commit", audit_sink=service.audit_sink
+    )
+    service.audit_writer = writer
+    writer.start()
+    try:
+        status, _, _, _, _ = service.handle_tool_call(_label_request("wb-key"))
+    finally:
+        writer.close()
+
+    assert status == "pending_approval"
+    assert writer.rows_written == 1
+    with service.session_factory() as db:
+        row = db.scalars(select(AuditLog)).one()
+        assert row.status == "pending_approval"
+    assert [e["status"] for e in service.audit_sink.events] == ["pending_approval"]
+
+
+def test_batch_commits_once_and_resolves_duplicate_keys(service):
+    commits: list[int] = []
+    engine = service.session_factory.kw["bind"]
+    event.listen(engine, "commit", lambda _conn: commits.append(1))
+
+    outcomes = service.handle_tool_calls(
+        [
+            _label_request("dup-key", ["bug"]),
+            _label_request("dup-key", ["bug"]),
+            _label_request("dup-key", ["other"]),
+            _label_request(None, ["question"]),
+        ]
+    )
+
+    assert len(commits) == 1
+    assert [outcome[0] for outcome in outcomes] == [
+        "pending_approval",
+        "pending_approval",
+        "idempotency_conflict",
+        "pending_approval",
+    ]
+    assert outcomes[1][3] == outcomes[0][3]
+    assert outcomes[1][4] is True
+    assert outcomes[3][3] != outcomes[0][3]
+    with service.session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(Approval)) == 2
+        assert db.scalar(select(func.count()).select_from(AuditLog)) == 3
+        assert db.scalar(select(func.count()).select_from(IdempotencyRecord)) == 1
+
+    replayed = service.handle_tool_calls([_label_request("dup-key", ["bug"])])
+    assert replayed[0][3] == outcomes[0][3]
+    assert replayed[0][4] is True
+
+
+def test_batch_item_failure_keeps_order_and_commits_once(service):
+    def list_issues(repo: str, state: str = "open") -> dict:
+        if state == "broken":
+            raise RuntimeError("upstream 502")
+        return {"issues": [{"state": state}]}
+
+    service.github_client.list_issues = list_issues
+    commits: list[int] = []
+    engine = service.session_factory.kw["bind"]
+    event.listen(engine, "commit", lambda _conn: commits.append(1))
+    reads = [
+        _label_request().model_copy(update={"action": "issues.list", "params": {"state": state}})
+        for state in ("open", "broken", "closed")
+    ]
+
+    outcomes = service.handle_tool_calls(reads)
+
+    assert len(commits) == 1
+    assert [(outcome[0], outcome[2]) for outcome in outcomes] == [
+        ("executed", {"issues": [{"state": "open"}]}),
+        ("error", None),
+        ("executed", {"issues": [{"state": "closed"}]}),
+    ]
+    assert outcomes[1][1] == "upstream 502"
+    with service.session_factory() as db:
+        audited = db.scalars(select(AuditLog.status).order_by(AuditLog.id)).all()
+    assert audited == ["executed", "error", "executed"]
+
+
+def _approve_all(risk_level: str) -> tuple[bool, str]:
+    return True, ""
+
+
+def test_bulk_approval_loads_once_commits_twice_and_keeps_order(service):
+    ids = [service.handle_tool_call(_label_request(labels=[f"l{i}"]))[3] for i in range(3)]
+    commits: list[int] = []
+    statements: list[str] = []
+    engine = service.session_factory.kw["bind"]
+    event.listen(engine, "commit", lambda _conn: commits.append(1))
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    results = service.decide_approvals(
+        [ids[2], 999, ids[0], ids[2], ids[1]], "approve", "alice", "ok", _approve_all
+    )
+
+    assert [(row["id"], row["status"]) for row in results] == [
+        (ids[2], "executed"),
+        (999, "not_found"),
+        (ids[0], "executed"),
+        (ids[2], "invalid_state"),
+        (ids[1], "executed"),
+    ]
+    assert results[0]["result"] == {"labels": ["l2"]}
+    selects = [statement for statement in statements if statement.startswith("SELECT")]
+    assert (len(commits), len(selects)) == (2, 2)
+    with service.session_factory() as db:
+        statuses = db.scalars(select(Approval.status).where(Approval.id.in_(ids))).all()
+        audited = db.scalars(select(AuditLog.status).where(AuditLog.approval_id == ids[0])).all()
+    assert statuses == ["executed"] * 3
+    assert audited == ["pending_approval", "approved", "executed"]
+
+
+def test_bulk_denial_reports_forbidden_items(service):
+    ids = [service.handle_tool_call(_label_request(labels=[f"l{i}"]))[3] for i in range(2)]
+
+    results = service.decide_approvals(
+        ids, "deny", "bob", "no", lambda risk: (risk != "medium", "needs a reviewer")
+    )
+    assert results == [
+        {"id": ids[0], "status": "forbidden", "message": "needs a reviewer"},
+        {"id": ids[1], "status": "forbidden", "message": "needs a reviewer"},
+    ]
+    denied = service.decide_approvals(ids, "deny", "bob", "no", _approve_all)
+    assert [row["status"] for row in denied] == ["denied", "denied"]
+
+
+def test_bulk_approval_runs_concurrently_within_per_repo_limit(service):
+    lock = threading.Lock()
+    in_flight: Counter[str] = Counter()
+    peaks: Counter[str] = Counter()
+
+    def slow_set_labels(repo: str, issue_number: int, labels: list[str]) -> dict:
+        with lock:
+            in_flight[repo] += 1
+            in_flight["total"] += 1
+            for key in (repo, "total"):
+                peaks[key] = max(peaks[key], in_flight[key])
+        time.sleep(0.05)
+        with lock:
+            in_flight[repo] -= 1
+            in_flight["total"] -= 1
+        return {"labels": labels}
+
+    service.github_client.set_labels = slow_set_labels
+    decision = service.policy_engine.decide("github", "issues.set_labels", "acme/roadrunner")
+    with service.session_factory() as db:
+        approvals = [
+            service._new_approval(_label_request().model_copy(update={"repo": repo}), decision)
+            for repo in ["acme/roadrunner"] * 4 + ["acme/coyote"] * 4
+        ]
+        db.add_all(approvals)
+        db.commit()
+        ids = [approval.id for approval in approvals]
+
+    results = service.decide_approvals(
+        ids, "approve", "alice", "ok", _approve_all, max_concurrency=4, per_repo_concurrency=2
+    )
+
+    assert [row["status"] for row in results] == ["executed"] * 8
+    assert peaks == {"acme/roadrunner": 2, "acme/coyote": 2, "total": 4}
+
+
+def test_bulk_approval_reports_a_failing_repo_and_runs_the_rest(service):
+    executed: list[str] = []
+
+    def set_labels(repo: str, issue_number: int, labels: list[str]) -> dict:
+        if repo == "acme/coyote":
+            raise CircuitOpenError("api.github.com", 30)
+        executed.append(labels[0])
+        return {"labels": labels}
+
+    service.github_client.set_labels = set_labels
+    decision = service.policy_engine.decide("github", "issues.set_labels", "acme/roadrunner")
+    with service.session_factory() as db:
+        approvals = [
+            service._new_approval(
+                _label_request(labels=[f"l{n}"]).model_copy(update={"repo": repo}), decision
+            )
+            for n, repo in enumerate(["acme/roadrunner", "acme/coyote", "acme/roadrunner"])
+        ]
+        db.add_all(approvals)
+        db.commit()
+        ids = [approval.id for approval in approvals]
+
+    results = service.decide_approvals(ids, "approve", "alice", "ok", _approve_all)
+
+    assert [(row["id"], row["status"]) for row in results] == [
+        (ids[0], "executed"),
+        (ids[1], "circuit_open"),
+        (ids[2], "executed"),
+    ]
+    assert "circuit open" in results[1]["result"]["error"]
+    assert sorted(executed) == ["l0", "l2"]
+    with service.session_factory() as db:
+        statuses = db.scalars(select(Approval.status).order_by(Approval.id)).all()
+        audited = db.scalars(select(AuditLog.status).order_by(AuditLog.id)).all()
+    assert statuses == ["executed", "failed", "executed"]
+    assert audited[:3] == ["approved"] * 3
+    assert sorted(audited[3:]) == ["circuit_open", "executed", "executed"]
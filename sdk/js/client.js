@@ -1,7 +1,9 @@
 /**
  * @typedef {import("./openapi-types").ToolCallRequest} ToolCallRequest
  * @typedef {import("./openapi-types").ToolCallResponse} ToolCallResponse
+ * @typedef {import("./openapi-types").ToolCallBatchResponse} ToolCallBatchResponse
  * @typedef {import("./openapi-types").ApprovalView} ApprovalView
+ * @typedef {import("./openapi-types").ApprovalOutcomeView} ApprovalOutcomeView
  */
 
 export class Agent2AllowClient {
@@ -24,12 +26,33 @@ export class Agent2AllowClient {
     return response.json();
   }
 
+  /** @returns {Promise<ToolCallBatchResponse>} */
+  async toolCallBatch(calls) {
+    const response = await fetch(`${this.baseUrl}/v1/tool-calls:batch`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ calls })
+    });
+    return response.json();
+  }
+
   /** @returns {Promise<Array<ApprovalView>>} */
   async pendingApprovals() {
     const response = await fetch(`${this.baseUrl}/v1/approvals/pending`);
     return response.json();
   }
 
+  /**
+   * Long-poll until the approval is executed, failed or denied; `timed_out` is set if
+   * `timeoutSeconds` passes first.
+   * @returns {Promise<ApprovalOutcomeView>}
+   */
+  async waitForApproval(approvalId, timeoutSeconds = 30) {
+    const params = new URLSearchParams({ timeout: String(timeoutSeconds) });
+    const response = await fetch(`${this.baseUrl}/v1/approvals/${approvalId}/wait?${params}`);
+    return response.json();
+  }
+
   async approve(approvalId, approver = "human", reason = "") {
     const headers = { "Content-Type": "application/json" };
     if (this.approvalApiKey) {
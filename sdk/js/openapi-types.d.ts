@@ -5,6 +5,21 @@ export type ApprovalDecisionRequest = {
   "reason"?: string;
 };
 
+export type ApprovalOutcomeView = {
+  "action": string;
+  "created_at": string;
+  "id": number;
+  "reason": string;
+  "repo": string;
+  "request_payload": Record<string, unknown>;
+  "result"?: Record<string, unknown> | null;
+  "risk_level": string;
+  "status": string;
+  "timed_out"?: boolean;
+  "tool": string;
+  "updated_at": string;
+};
+
 export type ApprovalView = {
   "action": string;
   "created_at": string;
@@ -45,6 +60,14 @@ export type HTTPValidationError = {
   "detail"?: Array<ValidationError>;
 };
 
+export type ToolCallBatchRequest = {
+  "calls": Array<ToolCallRequest>;
+};
+
+export type ToolCallBatchResponse = {
+  "results": Array<ToolCallResponse>;
+};
+
 export type ToolCallRequest = {
   "action": string;
   "agent_id": string;
@@ -75,10 +98,13 @@ export type ValidationError = {
 export interface OpenAPIComponents {
   schemas: {
     ApprovalDecisionRequest: ApprovalDecisionRequest;
+    ApprovalOutcomeView: ApprovalOutcomeView;
     ApprovalView: ApprovalView;
     AuditLogView: AuditLogView;
     BulkApprovalRequest: BulkApprovalRequest;
     HTTPValidationError: HTTPValidationError;
+    ToolCallBatchRequest: ToolCallBatchRequest;
+    ToolCallBatchResponse: ToolCallBatchResponse;
     ToolCallRequest: ToolCallRequest;
     ToolCallResponse: ToolCallResponse;
     ValidationError: ValidationError;
@@ -1,6 +1,12 @@
 import httpx
 
-from .openapi_types import ApprovalView, ToolCallRequest, ToolCallResponse
+from .openapi_types import (
+    ApprovalOutcomeView,
+    ApprovalView,
+    ToolCallBatchResponse,
+    ToolCallRequest,
+    ToolCallResponse,
+)
 
 class Agent2AllowClient:
     def __init__(self, base_url: str = "http://localhost:8000", approval_api_key: str = ""):
@@ -22,11 +28,33 @@ class Agent2AllowClient:
         response.raise_for_status()
         return response.json()
 
+    def tool_call_batch(self, calls: list[ToolCallRequest]) -> ToolCallBatchResponse:
+        response = httpx.post(
+            f"{self.base_url}/v1/tool-calls:batch",
+            json={"calls": calls},
+            timeout=20.0,
+        )
+        response.raise_for_status()
+        return response.json()
+
     def pending_approvals(self) -> list[ApprovalView]:
         response = httpx.get(f"{self.base_url}/v1/approvals/pending", timeout=20.0)
         response.raise_for_status()
         return response.json()
 
+    def wait_for_approval(self, approval_id: int, timeout: float = 30.0) -> ApprovalOutcomeView:
+        """Long-poll until the approval is executed, failed or denied.
+
+        Returns the current state with ``timed_out`` set if ``timeout`` passes first.
+        """
+        response = httpx.get(
+            f"{self.base_url}/v1/approvals/{approval_id}/wait",
+            params={"timeout": timeout},
+            timeout=timeout + 20.0,
+        )
+        response.raise_for_status()
+        return response.json()
+
     def approve(self, approval_id: int, approver: str = "human", reason: str = "") -> dict:
         headers: dict[str, str] = {}
         if self.approval_api_key:
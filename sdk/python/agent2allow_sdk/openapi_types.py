@@ -7,6 +7,20 @@ class ApprovalDecisionRequest(TypedDict, total=False):
     approver: NotRequired[str]
     reason: NotRequired[str]
 
+class ApprovalOutcomeView(TypedDict, total=False):
+    action: str
+    created_at: str
+    id: int
+    reason: str
+    repo: str
+    request_payload: dict[str, object]
+    result: NotRequired[dict[str, object] | None]
+    risk_level: str
+    status: str
+    timed_out: NotRequired[bool]
+    tool: str
+    updated_at: str
+
 class ApprovalView(TypedDict, total=False):
     action: str
     created_at: str
@@ -43,6 +57,12 @@ class BulkApprovalRequest(TypedDict, total=False):
 class HTTPValidationError(TypedDict, total=False):
     detail: NotRequired[list[ValidationError]]
 
+class ToolCallBatchRequest(TypedDict, total=False):
+    calls: list[ToolCallRequest]
+
+class ToolCallBatchResponse(TypedDict, total=False):
+    results: list[ToolCallResponse]
+
 class ToolCallRequest(TypedDict, total=False):
     action: str
     agent_id: str
@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 
 const apiBase = import.meta.env.VITE_GATEWAY_URL || "http://localhost:8000";
 
@@ -10,6 +10,41 @@ async function fetchJson(path, options) {
   return response.json();
 }
 
+// Live audit rows kept in memory; older ones are a Refresh or export away.
+const auditLimit = 500;
+
+const auditKey = (entry) => entry.id ?? entry.eventKey;
+
+// Deltas are idempotent so replaying one already reflected in a snapshot is harmless.
+function applyApprovalEvent(previous, event) {
+  const exists = previous.some((item) => item.id === event.approval_id);
+  if (event.status !== "pending") {
+    return exists ? previous.filter((item) => item.id !== event.approval_id) : previous;
+  }
+  if (exists) {
+    return previous;
+  }
+  return [
+    ...previous,
+    {
+      id: event.approval_id,
+      status: event.status,
+      tool: event.tool,
+      action: event.action,
+      repo: event.repo,
+      risk_level: event.risk_level
+    }
+  ];
+}
+
+function applyAuditEvent(previous, entry, seq) {
+  // Rows queued for the write-behind audit writer have no id yet.
+  if (entry.id !== null && previous.some((item) => item.id === entry.id)) {
+    return previous;
+  }
+  return [{ ...entry, eventKey: `event-${seq}` }, ...previous].slice(0, auditLimit);
+}
+
 export function App() {
   const reasonPresets = {
     approve: [
@@ -44,7 +79,23 @@ export function App() {
   const [expandedAuditIds, setExpandedAuditIds] = useState([]);
   const [error, setError] = useState("");
 
+  const [live, setLive] = useState(false);
+  const loading = useRef(false);
+  const bufferedDeltas = useRef([]);
+
+  const applyDelta = ({ type, data, seq }) => {
+    if (type === "approval") {
+      setApprovals((previous) => applyApprovalEvent(previous, data));
+      if (data.status !== "pending") {
+        setSelectedApprovalIds((previous) => previous.filter((id) => id !== data.approval_id));
+      }
+    } else if (type === "audit") {
+      setAudit((previous) => applyAuditEvent(previous, data, seq));
+    }
+  };
+
   const load = async () => {
+    loading.current = true;
     try {
       setError("");
       const [pending, logs] = await Promise.all([
@@ -58,6 +109,12 @@ export function App() {
       setAudit(logs);
     } catch (err) {
       setError(err.message);
+    } finally {
+      // Deltas that arrived while the snapshot loaded may be newer than it.
+      loading.current = false;
+      const deltas = bufferedDeltas.current;
+      bufferedDeltas.current = [];
+      deltas.forEach(applyDelta);
     }
   };
 
@@ -89,8 +146,36 @@ export function App() {
   };
 
   useEffect(() => {
-    load();
     loadSystemStatus();
+    if (typeof EventSource === "undefined") {
+      load();
+      return undefined;
+    }
+    // One stream of approval and audit deltas replaces refetching both lists. On
+    // reconnect the browser sends Last-Event-ID and the gateway replays what was
+    // missed, or sends "reset" when it no longer has those events.
+    const source = new EventSource(`${apiBase}/v1/events`);
+    let loaded = false;
+    const onDelta = (type) => (message) => {
+      const delta = { type, data: JSON.parse(message.data), seq: message.lastEventId };
+      if (loading.current) {
+        bufferedDeltas.current.push(delta);
+      } else {
+        applyDelta(delta);
+      }
+    };
+    source.addEventListener("ready", () => {
+      setLive(true);
+      if (!loaded) {
+        loaded = true;
+        load();
+      }
+    });
+    source.addEventListener("reset", () => load());
+    source.addEventListener("approval", onDelta("approval"));
+    source.addEventListener("audit", onDelta("audit"));
+    source.onerror = () => setLive(false);
+    return () => source.close();
   }, []);
 
   const decide = async (id, decision) => {
@@ -102,7 +187,9 @@ export function App() {
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ approver: "ui-operator", reason })
     });
-    await load();
+    if (!live) {
+      await load();
+    }
   };
 
   const decideMany = async (decision) => {
@@ -119,18 +206,18 @@ export function App() {
         reason
       })
     });
-    await load();
+    if (!live) {
+      await load();
+    }
   };
 
-  const exportAudit = async () => {
-    const payload = await fetchJson("/v1/audit/export");
-    const blob = new Blob([payload.lines.join("\n") + "\n"], { type: "application/x-ndjson" });
-    const url = URL.createObjectURL(blob);
+  const exportAudit = () => {
+    // The gateway streams NDJSON with Content-Disposition: attachment, so let the
+    // browser download it directly instead of buffering the export in memory.
     const anchor = document.createElement("a");
-    anchor.href = url;
+    anchor.href = `${apiBase}/v1/audit/export`;
     anchor.download = "audit-export.jsonl";
     anchor.click();
-    URL.revokeObjectURL(url);
   };
 
   const toggleExpanded = (id) => {
@@ -221,6 +308,7 @@ export function App() {
         <span className="pill">Pending approvals: {pendingCount}</span>
         <span className="pill">Audit events: {audit.length}</span>
         <span className="pill">Denied events: {deniedCount}</span>
+        <span className="pill">{live ? "Live updates" : "Not live"}</span>
       </div>
 
       <section>
@@ -349,6 +437,7 @@ export function App() {
             <option value="executed">executed</option>
             <option value="idempotent_replay">idempotent_replay</option>
             <option value="error">error</option>
+            <option value="circuit_open">circuit_open</option>
           </select>
           <select
             value={schemaVersionFilter}
@@ -376,7 +465,7 @@ export function App() {
             </thead>
             <tbody>
               {filteredAudit.map((entry) => (
-                <React.Fragment key={entry.id}>
+                <React.Fragment key={auditKey(entry)}>
                   <tr>
                     <td>{new Date(entry.timestamp).toLocaleString()}</td>
                     <td>
@@ -386,12 +475,12 @@ export function App() {
                     <td>{entry.repo}</td>
                     <td>{entry.agent_id}</td>
                     <td>
-                      <button onClick={() => toggleExpanded(entry.id)}>
-                        {expandedAuditIds.includes(entry.id) ? "Hide" : "Show"}
+                      <button onClick={() => toggleExpanded(auditKey(entry))}>
+                        {expandedAuditIds.includes(auditKey(entry)) ? "Hide" : "Show"}
                       </button>
                     </td>
                   </tr>
-                  {expandedAuditIds.includes(entry.id) && (
+                  {expandedAuditIds.includes(auditKey(entry)) && (
                     <tr className="audit-detail-row">
                       <td colSpan={6}>
                         <pre>
@@ -1,4 +1,4 @@
-import { render, screen, waitFor } from "@testing-library/react";
+import { act, render, screen, waitFor } from "@testing-library/react";
 import React from "react";
 import { App } from "../src/App";
 
@@ -69,6 +69,7 @@ beforeEach(() => {
 
 afterEach(() => {
   vi.restoreAllMocks();
+  vi.unstubAllGlobals();
 });
 
 test("renders approvals and audit sections", async () => {
@@ -90,3 +91,75 @@ test("renders approvals and audit sections", async () => {
     expect(screen.getByText("Export JSONL")).toBeInTheDocument();
   });
 });
+
+test("applies approval and audit deltas from the event stream", async () => {
+  const sources = [];
+  class FakeEventSource {
+    constructor(url) {
+      this.url = url;
+      this.listeners = {};
+      sources.push(this);
+    }
+
+    addEventListener(type, listener) {
+      this.listeners[type] = listener;
+    }
+
+    emit(type, data, lastEventId = "") {
+      this.listeners[type]({ data: JSON.stringify(data), lastEventId });
+    }
+
+    close() {
+      this.closed = true;
+    }
+  }
+  vi.stubGlobal("EventSource", FakeEventSource);
+
+  const { unmount } = render(<App />);
+  const [source] = sources;
+  expect(source.url).toContain("/v1/events");
+  act(() => source.emit("ready", {}));
+  await waitFor(() => {
+    expect(screen.getByText("Live updates")).toBeInTheDocument();
+    expect(screen.getByText("Pending approvals: 1")).toBeInTheDocument();
+    expect(screen.getByText("Audit events: 1")).toBeInTheDocument();
+  });
+
+  const approval = {
+    tool: "github",
+    action: "issues.create_comment",
+    repo: "acme/roadrunner",
+    risk_level: "medium"
+  };
+  act(() => source.emit("approval", { ...approval, approval_id: 2, status: "pending" }, "5"));
+  await waitFor(() => expect(screen.getByText("Pending approvals: 2")).toBeInTheDocument());
+  act(() => source.emit("approval", { ...approval, approval_id: 1, status: "executed" }, "6"));
+  await waitFor(() => expect(screen.getByText("Pending approvals: 1")).toBeInTheDocument());
+
+  const row = {
+    id: 11,
+    timestamp: "2026-02-18T00:01:00Z",
+    agent_id: "triage-agent",
+    tool: "github",
+    action: "issues.list",
+    repo: "acme/other",
+    risk_level: "read",
+    schema_version: 1,
+    status: "denied",
+    request_payload: {},
+    response_payload: {},
+    approval_id: null,
+    message: "no matching rule"
+  };
+  act(() => source.emit("audit", row, "7"));
+  act(() => source.emit("audit", row, "7"));
+  await waitFor(() => {
+    expect(screen.getByText("Audit events: 2")).toBeInTheDocument();
+    expect(screen.getByText("Denied events: 1")).toBeInTheDocument();
+  });
+  const auditFetches = global.fetch.mock.calls.filter(([url]) => url.includes("/v1/audit"));
+  expect(auditFetches).toHaveLength(1);
+
+  unmount();
+  expect(source.closed).toBe(true);
+});